@@ -1,7 +1,13 @@
 # from backend.db.mongo import connect_db, close_db
-from backend.services.GnewsScraper import run_gnews_scraper_job
+from backend.services.EngagementRefresher import run_engagement_refresh_job
+from backend.services.indexer import run_ingest_job
 from backend.services.NewsApiScraper import run_news_api_scraper_job
-from backend.services.RedditScraper import run_reddit_scraper_job
+from backend.services.ParquetExporter import run_parquet_export_job
+from backend.services.RedirectResolver import run_redirect_resolution_job
+from backend.services.RetentionManager import run_retention_job
+from backend.services.RssScraper import run_rss_scraper_job
+from backend.services.StoryClusterer import run_story_clustering_job
+from backend.services.source import merge_source_watermarks, plan_source_shards, run_source_shard
 from datetime import datetime, timedelta
 import os
 import sys
@@ -36,16 +42,29 @@ with DAG(
     tags=["reddit", "NewsApi", "ai", "scraper"],
 ) as dag:
 
-    run_reddit_scraper_task = PythonOperator(
-        task_id="run_reddit_scraper",
-        python_callable=run_reddit_scraper_job,
+    # Reddit and GNews expand at runtime into one mapped task per subreddit /
+    # GNews topic batch. Each shard returns its watermarks instead of writing
+    # them, so a retry only re-runs the failed shard. Shards may run on
+    # different hosts: they only store documents and append raw payloads
+    # (RAW_ARCHIVE_DIR must be a volume every Airflow worker mounts).
+    plan_reddit_shards_task = PythonOperator(
+        task_id="plan_reddit_shards",
+        python_callable=plan_source_shards,
         op_kwargs={
-            "scrape_type": "new",
+            "name": "reddit",
+            "batch_size": 1,
+            "type": "new",
             "limit": 1000,
             "incremental": True,
         },
     )
 
+    run_reddit_shard_tasks = PythonOperator.partial(
+        task_id="run_reddit_shard",
+        python_callable=run_source_shard,
+        pool="reddit_api",
+    ).expand(op_kwargs=plan_reddit_shards_task.output)
+
     run_news_api_scraper_task = PythonOperator(
         task_id="run_news_api_scraper",
         python_callable=run_news_api_scraper_job,
@@ -56,13 +75,106 @@ with DAG(
         },
     )
     
-    run_gnews_scraper_task = PythonOperator(
-        task_id="run_gnews_scraper",
-        python_callable=run_gnews_scraper_job,
+    plan_gnews_shards_task = PythonOperator(
+        task_id="plan_gnews_shards",
+        python_callable=plan_source_shards,
+        op_kwargs={
+            "name": "gnews",
+            "batch_size": 3,
+            "limit": 10,
+            "incremental": True,
+        },
+    )
+
+    run_gnews_shard_tasks = PythonOperator.partial(
+        task_id="run_gnews_shard",
+        python_callable=run_source_shard,
+        pool="gnews_api",
+    ).expand(op_kwargs=plan_gnews_shards_task.output)
+
+    merge_watermarks_task = PythonOperator(
+        task_id="merge_watermarks",
+        python_callable=merge_source_watermarks,
+        op_args=[run_reddit_shard_tasks.output, run_gnews_shard_tasks.output],
+        trigger_rule="all_done",
+    )
+
+    run_parquet_export_task = PythonOperator(
+        task_id="run_parquet_export",
+        python_callable=run_parquet_export_job,
         op_kwargs={
-            "limit": 900,
+            "batch_size": 50_000,
             "incremental": True,
         },
+        trigger_rule="all_done",
+    )
+
+    run_rss_scraper_task = PythonOperator(
+        task_id="run_rss_scraper",
+        python_callable=run_rss_scraper_job,
+        op_kwargs={
+            "limit": 100,
+            "incremental": True,
+        },
+    )
+
+    run_story_clustering_task = PythonOperator(
+        task_id="run_story_clustering",
+        python_callable=run_story_clustering_job,
+        op_kwargs={
+            "threshold": 0.35,
+            "active_days": 3,
+        },
+        trigger_rule="all_done",
+    )
+
+    # Re-reads score / comments of posts from the last 3 days, 100 per API call
+    run_engagement_refresh_task = PythonOperator(
+        task_id="run_engagement_refresh",
+        python_callable=run_engagement_refresh_job,
+        op_kwargs={
+            "window_hours": 72,
+            "history": True,
+        },
+        pool="reddit_api",
+    )
+
+    # Follows the link shorteners queued at ingest and relinks their documents
+    run_redirect_resolution_task = PythonOperator(
+        task_id="run_redirect_resolution",
+        python_callable=run_redirect_resolution_job,
+        op_kwargs={
+            "max_workers": 16,
+            "batch_size": 500,
+        },
+        trigger_rule="all_done",
+    )
+
+    # Single consumer of what the scrapers stored: search index and trend
+    # detector state, which take one writer each (skipped while the k8s
+    # indexer holds the ingest lease)
+    run_ingest_task = PythonOperator(
+        task_id="run_ingest",
+        python_callable=run_ingest_job,
+        op_kwargs={
+            "batch_size": 1000,
+        },
+        trigger_rule="all_done",
+    )
+
+    # Moves documents past their retention age to the *_archive collections,
+    # once they have been clustered and exported
+    run_retention_task = PythonOperator(
+        task_id="run_retention",
+        python_callable=run_retention_job,
+        op_kwargs={
+            "batch_size": 5000,
+        },
     )
 
-    run_reddit_scraper_task, run_news_api_scraper_task, run_gnews_scraper_task
+    [run_reddit_shard_tasks, run_gnews_shard_tasks] >> merge_watermarks_task
+    merge_watermarks_task >> run_engagement_refresh_task
+    scrape_tasks = [merge_watermarks_task, run_news_api_scraper_task, run_rss_scraper_task]
+    scrape_tasks >> run_redirect_resolution_task >> run_story_clustering_task
+    scrape_tasks >> run_ingest_task
+    run_story_clustering_task >> run_parquet_export_task >> run_retention_task
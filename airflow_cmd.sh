@@ -1,3 +1,8 @@
 export PYTHONPATH="$(pwd)"
 export AIRFLOW_HOME="$(pwd)/airflow"
-airflow standalone
\ No newline at end of file
+airflow db migrate
+# Pools bounding the mapped scraper shards to the API limits
+# (Reddit OAuth: 100 requests/min per client, GNews: keep Google News polling gentle)
+airflow pools set reddit_api 4 "Concurrent Reddit API shards"
+airflow pools set gnews_api 2 "Concurrent GNews topic shards"
+airflow standalone
@@ -10,6 +10,18 @@ class Settings(BaseSettings):
     NEWSAPI_KEY: str
     TARGET_SUBS: str = 'Futurology+worldnews+technology+MachineLearning+artificial'
     KEYWORDS: str = "ai+artificial intelligence+machine learning+ml+deep learning+gpt+openai+chatgpt+llm+neural network"
+    RSS_FEEDS: str = (
+        "https://techcrunch.com/category/artificial-intelligence/feed/,"
+        "https://www.theverge.com/rss/ai-artificial-intelligence/index.xml,"
+        "https://venturebeat.com/category/ai/feed/,"
+        "https://www.technologyreview.com/feed/,"
+        "https://feeds.arstechnica.com/arstechnica/technology-lab,"
+        "https://www.wired.com/feed/tag/ai/latest/rss"
+    )
+    # "<collection>=<days>": age after which documents move to <collection>_archive
+    RETENTION_DAYS: str = "reddit_posts=90,articles=180,stories=60"
+    # "<collection>=<days>": TTL of scratch data
+    SCRATCH_TTL_DAYS: str = "trends=90,domain_stats=90"
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,35 @@
+try:
+    import zstandard
+except ImportError:  # zstd is optional, fall back to zlib from the stdlib
+    zstandard = None
+import zlib
+
+ZSTD_LEVEL = 3
+ZLIB_LEVEL = 6
+
+
+def default_codec() -> str:
+    """Return the best codec available in this environment."""
+    return "zstd" if zstandard is not None else "zlib"
+
+
+def compress_text(text: str, codec: str | None = None) -> tuple[str, bytes]:
+    """Compress a text body, returning (codec, payload)."""
+    codec = codec or default_codec()
+    raw = text.encode("utf-8")
+    if codec == "zstd":
+        return codec, zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+    if codec == "zlib":
+        return codec, zlib.compress(raw, ZLIB_LEVEL)
+    raise ValueError(f"Unsupported codec: {codec}")
+
+
+def decompress_text(codec: str, payload: bytes) -> str:
+    """Inverse of compress_text."""
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd bodies")
+        return zstandard.ZstdDecompressor().decompress(payload).decode("utf-8")
+    if codec == "zlib":
+        return zlib.decompress(payload).decode("utf-8")
+    raise ValueError(f"Unsupported codec: {codec}")
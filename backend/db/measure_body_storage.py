@@ -0,0 +1,89 @@
+"""Compare inline vs split/compressed body storage on a seeded corpus.
+
+Usage: python -m backend.db.measure_body_storage --docs 20000
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from backend.db.mongo import client, DB_NAME, split_body
+from backend.db.compression import compress_text
+
+WORDS = (
+    "ai model openai release training data compute chip policy research "
+    "language agent benchmark safety startup funding regulation court "
+    "robot vision cloud open source weights inference latency energy"
+).split()
+
+
+def fake_text(rng: random.Random, mean_words: int) -> str:
+    n = max(1, int(rng.lognormvariate(0, 0.6) * mean_words))
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def fake_article(rng: random.Random, i: int) -> dict:
+    published = datetime(2025, 1, 1) + timedelta(minutes=i)
+    return {
+        "url": f"https://example.com/story/{i}",
+        "title": fake_text(rng, 10),
+        "author": "Jane Doe",
+        "description": fake_text(rng, 30),
+        "content": fake_text(rng, 40),
+        "expanded_content": fake_text(rng, 900),
+        "publishedAt": published.isoformat(),
+        "source_id": None,
+        "source_name": "Example",
+        "saved_utc": published.isoformat(),
+    }
+
+
+def coll_stats(bench_db, name: str) -> dict:
+    stats = bench_db.command("collStats", name)
+    return {k: stats.get(k, 0) for k in ("count", "size", "storageSize", "totalIndexSize", "avgObjSize")}
+
+
+def scan_seconds(coll) -> float:
+    start = time.perf_counter()
+    for _ in coll.find({}, {"title": 1, "publishedAt": 1}):
+        pass
+    return time.perf_counter() - start
+
+
+def main(docs: int, seed: int):
+    bench_db = client[f"{DB_NAME}_bodybench"]
+    client.drop_database(bench_db.name)
+    rng = random.Random(seed)
+    corpus = [fake_article(rng, i) for i in range(docs)]
+
+    bench_db.inline_articles.insert_many([dict(d) for d in corpus])
+
+    mains, bodies = [], []
+    for d in corpus:
+        main, body = split_body("articles", d)
+        mains.append(main)
+        record = {"_id": f"articles:{d['url']}"}
+        for field, text in body.items():
+            codec, payload = compress_text(text)
+            record[field] = {"codec": codec, "data": payload, "size": len(text)}
+        bodies.append(record)
+    bench_db.split_articles.insert_many(mains)
+    bench_db.bodies.insert_many(bodies)
+
+    for name in ("inline_articles", "split_articles", "bodies"):
+        print(f"📊 {name}: {coll_stats(bench_db, name)}")
+    print(f"⏱️ inline scan: {scan_seconds(bench_db.inline_articles):.3f}s")
+    print(f"⏱️ split scan: {scan_seconds(bench_db.split_articles):.3f}s")
+
+    inline = coll_stats(bench_db, "inline_articles")["storageSize"]
+    split = sum(coll_stats(bench_db, n)["storageSize"] for n in ("split_articles", "bodies"))
+    print(f"💾 disk: inline={inline} split+bodies={split} ({split / max(inline, 1):.0%})")
+    client.drop_database(bench_db.name)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    main(args.docs, args.seed)
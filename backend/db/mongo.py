@@ -1,12 +1,18 @@
 import asyncio
 from datetime import datetime
+import hashlib
 import os
-from pymongo import MongoClient, ASCENDING
+from typing import Callable
+from urllib.parse import urlsplit
+from pymongo import MongoClient, ASCENDING, UpdateOne
+from pymongo.errors import CollectionInvalid, DuplicateKeyError, OperationFailure
+from bson import Binary
 from dotenv import load_dotenv
 
-from backend.models.NewsArticleModel import NewsArticleModel
+from backend.db.compression import compress_text, decompress_text
+from backend.models.ArticleModel import ArticleModel
 from backend.models.RedditPostModel import RedditPost
-from backend.models.GnewsArticleModel import GnewsArticleModel
+from backend.urls import canonicalize_url, is_shortened
 
 load_dotenv()
 
@@ -17,23 +23,403 @@ DB_NAME = os.getenv("MONGO_DB", "news")
 client = MongoClient(MONGO_URI)
 db = client[DB_NAME]
 
+# Stored collections: model, natural key, publication date field and source
+# tag (None when each document carries its own `source`)
+COLLECTIONS = {
+    "reddit_posts": {"model": RedditPost, "key": "id", "date_field": "created_utc", "source": "reddit"},
+    "articles": {"model": ArticleModel, "key": "url", "date_field": "publishedAt", "source": None},
+}
+
+# Per-source collections that were merged into `articles`
+LEGACY_ARTICLE_COLLECTIONS = {"newsapi_articles": "newsapi", "gnews_articles": "gnews", "rss_articles": "rss"}
+
+# Large text fields are kept out of the main documents and stored compressed
+# in `bodies`, keyed by "<collection>:<document key>".
+BODY_FIELDS = {
+    "reddit_posts": ("selftext",),
+    "articles": ("content", "expanded_content"),
+}
+
+# Callables run with (collection, document) after each document is stored
+ingest_hooks: list[Callable[[str, dict], None]] = []
+
 
 def connect_db():
     """Initialize MongoDB indexes (id for posts, url for articles)."""
-    db.reddit_posts.create_index([("id", ASCENDING)], unique=True, sparse=True)
-    db.newsapi_articles.create_index([("url", ASCENDING)], unique=True, sparse=True)
-    db.gnews_articles.create_index([("url", ASCENDING)], unique=True, sparse=True)
+    for name, spec in COLLECTIONS.items():
+        db[name].create_index([(spec["key"], ASCENDING)], unique=True, sparse=True)
+        db[name].create_index([("saved_utc", ASCENDING), ("_id", ASCENDING)])
+        db[name].create_index([(spec["date_field"], ASCENDING)])
+    db.articles.create_index([("sources", ASCENDING), ("publishedAt", ASCENDING)])
     db.scrape_meta.create_index(
         [("subreddit", ASCENDING)], unique=True, sparse=True)
+    db.scrape_meta.create_index(
+        [("feed", ASCENDING)], unique=True, sparse=True)
+    db.scrape_meta.create_index(
+        [("source", ASCENDING)], unique=True, sparse=True)
+    db.scrape_meta.create_index(
+        [("export", ASCENDING)], unique=True, sparse=True)
+    db.scrape_meta.create_index(
+        [("clustering", ASCENDING)], unique=True, sparse=True)
+    db.scrape_meta.create_index(
+        [("ingest", ASCENDING)], unique=True, sparse=True)
+    db.reddit_posts.create_index([("refreshed_utc", ASCENDING), ("_id", ASCENDING)])
+    db.stories.create_index([("last_seen", ASCENDING)])
+    for name in COLLECTIONS:
+        db[name].create_index([("canonical_url", ASCENDING)])
+    db.reddit_article_links.create_index([("canonical_url", ASCENDING)])
+    db.reddit_article_links.create_index([("articles", ASCENDING)])
+    db.url_redirects.create_index([("target", ASCENDING)])
     print("✅ Connected to MongoDB!")
 
 
+def ensure_ttl_index(collection: str, field: str, seconds: int):
+    """Create a TTL index on `field`, or change the expiry of an existing index on it."""
+    try:
+        db[collection].create_index([(field, ASCENDING)], expireAfterSeconds=seconds)
+    except OperationFailure:
+        # a plain or differently timed index on the same key already exists
+        db.command("collMod", collection, index={"keyPattern": {field: 1}, "expireAfterSeconds": seconds})
+
+
+def archive_collection(name: str):
+    """Return an archive collection, created with zstd block compression."""
+    try:
+        db.create_collection(name, storageEngine={"wiredTiger": {"configString": "block_compressor=zstd"}})
+    except CollectionInvalid:
+        pass  # already there
+    return db[name]
+
+
 def close_db():
     """Close MongoDB client connection."""
     client.close()
     print("🛑 Closed MongoDB connection!")
 
 
+def body_id(collection: str, key: str) -> str:
+    """Return the `bodies` _id of a document."""
+    return f"{collection}:{key}"
+
+
+def source_of(collection: str, doc: dict) -> str | None:
+    """Source tag of a stored document."""
+    return COLLECTIONS[collection]["source"] or doc.get("source")
+
+
+def upsert_doc(collection: str, main: dict, rebuild_id: str = None) -> UpdateOne:
+    """Upsert of a document by its key.
+
+    An article stored by several sources keeps the source that found it
+    first, lists all of them in `sources`, and empty fields from one source
+    never overwrite what another one filled in. A migrated document keeps
+    its `_id` when it creates the article. Documents written by a
+    rebuild are stamped with its `rebuild_id` and keep their saved_utc, so
+    that exports and clustering do not take them for new ones.
+    """
+    key_field = COLLECTIONS[collection]["key"]
+    shared = COLLECTIONS[collection]["source"] is None
+    if shared:
+        fields = {k: v for k, v in main.items() if k not in ("_id", "source", "sources")}
+        filled = {k: v for k, v in fields.items() if v not in (None, [])}
+        on_insert = {**{k: v for k, v in fields.items() if k not in filled}, "source": main["source"]}
+        if "_id" in main:
+            on_insert["_id"] = main["_id"]
+    else:
+        filled, on_insert = dict(main), {}
+    if rebuild_id is not None:
+        if "saved_utc" in filled:
+            on_insert["saved_utc"] = filled.pop("saved_utc")
+        filled["rebuild_id"] = rebuild_id
+    update = {"$set": filled}
+    if on_insert:
+        update["$setOnInsert"] = on_insert
+    if shared:
+        update["$addToSet"] = {"sources": main["source"]}
+    return UpdateOne({key_field: main[key_field]}, update, upsert=True)
+
+
+def split_body(collection: str, doc: dict) -> tuple[dict, dict]:
+    """Split a document into its main part and its non-empty body fields."""
+    fields = BODY_FIELDS.get(collection, ())
+    main = {k: v for k, v in doc.items() if k not in fields}
+    body = {k: doc[k] for k in fields if doc.get(k)}
+    return main, body
+
+
+def body_update(collection: str, key: str, body: dict) -> UpdateOne | None:
+    """Build the upsert storing the compressed body fields of a document.
+
+    Body fields the document no longer has are removed, except in shared
+    collections, where they may come from another source.
+    """
+    update = {"$set": {"collection": collection, "key": key}}
+    for field, text in body.items():
+        codec, payload = compress_text(text)
+        update["$set"][field] = {"codec": codec, "data": Binary(payload), "size": len(text)}
+    stale = [f for f in BODY_FIELDS.get(collection, ()) if f not in body]
+    if stale and COLLECTIONS.get(collection, {}).get("source") is not None:
+        update["$unset"] = {f: "" for f in stale}
+    if not body and "$unset" not in update:
+        return None
+    return UpdateOne({"_id": body_id(collection, key)}, update, upsert=bool(body))
+
+
+def save_body(collection: str, key: str, body: dict):
+    """Compress and store the body fields of a document."""
+    op = body_update(collection, key, body)
+    if op is not None:
+        db.bodies.bulk_write([op])
+
+
+def load_bodies(collection: str, keys: list[str]) -> dict[str, dict]:
+    """Fetch and decompress the bodies of several documents at once."""
+    bodies = {}
+    ids = [body_id(collection, k) for k in keys]
+    for record in db.bodies.find({"_id": {"$in": ids}}):
+        bodies[record["key"]] = {
+            field: decompress_text(record[field]["codec"], record[field]["data"])
+            for field in BODY_FIELDS.get(collection, ())
+            if field in record
+        }
+    return bodies
+
+
+def with_bodies(collection: str, docs: list[dict], key: str) -> list[dict]:
+    """Return docs with their body fields merged back in."""
+    bodies = load_bodies(collection, [d[key] for d in docs])
+    for d in docs:
+        d.update(bodies.get(d[key], {}))
+    return docs
+
+
+def migrate_inline_bodies(collection: str, key: str, batch_size: int = 1000):
+    """Move body fields still stored inline into `bodies`."""
+    fields = BODY_FIELDS[collection]
+    query = {"$or": [{f: {"$exists": True}} for f in fields]}
+    moved = 0
+    while True:
+        docs = list(db[collection].find(query, {key: 1, **{f: 1 for f in fields}}).limit(batch_size))
+        if not docs:
+            break
+        for d in docs:
+            _, body = split_body(collection, d)
+            save_body(collection, d[key], body)
+        db[collection].update_many(
+            {"_id": {"$in": [d["_id"] for d in docs]}},
+            {"$unset": {f: "" for f in fields}},
+        )
+        moved += len(docs)
+    print(f"📦 Moved {moved} inline bodies out of {collection}")
+
+
+def register_ingest_hook(hook: Callable[[str, dict], None]):
+    """Run `hook(collection, doc)` for every document saved from now on."""
+    if hook not in ingest_hooks:
+        ingest_hooks.append(hook)
+
+
+def run_ingest_hooks(collection: str, doc: dict):
+    for hook in ingest_hooks:
+        try:
+            hook(collection, doc)
+        except Exception as e:
+            print(f"⚠️ Ingest hook {getattr(hook, '__name__', hook)} failed: {e}")
+
+
+def bump_generation(*collections: str):
+    """Invalidate cached reads of collections after a write has been flushed."""
+    for collection in collections:
+        db.cache_generations.update_one({"_id": collection}, {"$inc": {"generation": 1}}, upsert=True)
+
+
+def get_generations(collections: list[str]) -> dict[str, int]:
+    """Current write generation of each collection (0 if never written)."""
+    found = {g["_id"]: g["generation"] for g in db.cache_generations.find({"_id": {"$in": list(collections)}})}
+    return {c: found.get(c, 0) for c in collections}
+
+
+def cached_redirect(short_url: str) -> str | None:
+    """Target of a shortened URL, once RedirectResolver has resolved it."""
+    record = db.url_redirects.find_one({"_id": short_url}, {"target": 1})
+    return record.get("target") if record else None
+
+
+def stored_canonical_url(url: str | None) -> str | None:
+    """Canonical URL from stored data only; unknown shorteners are queued for RedirectResolver."""
+    canonical = canonicalize_url(url, cached_redirect)
+    if is_shortened(canonical):
+        db.url_redirects.update_one(
+            {"_id": canonical}, {"$setOnInsert": {"target": None, "queued_utc": datetime.now()}}, upsert=True)
+    return canonical
+
+
+def with_canonical_url(raw_data: dict) -> dict:
+    """Add the canonical form of the document URL, used to join posts and articles."""
+    if raw_data.get("canonical_url") or not raw_data.get("url"):
+        return raw_data
+    return {**raw_data, "canonical_url": stored_canonical_url(raw_data["url"])}
+
+
+def is_external_link(canonical_url: str | None) -> bool:
+    if not canonical_url:
+        return False
+    host = urlsplit(canonical_url).hostname or ""
+    return bool(host) and not host.endswith(("reddit.com", "redd.it"))
+
+
+def link_reddit_articles(collection: str, docs: list[dict]):
+    """Maintain `reddit_article_links`: one row per link post, with the sources of the articles at its URL."""
+    if collection == "reddit_posts":
+        posts = [d for d in docs if is_external_link(d.get("canonical_url"))]
+        if not posts:
+            return
+        urls = list({p["canonical_url"] for p in posts})
+        found: dict[str, set] = {}
+        for art in db.articles.find({"canonical_url": {"$in": urls}}, {"canonical_url": 1, "sources": 1, "source": 1}):
+            found.setdefault(art["canonical_url"], set()).update(art.get("sources") or [art.get("source")])
+        ops = [
+            UpdateOne(
+                {"_id": p["id"]},
+                {"$set": {
+                    "post_id": p["id"], "subreddit": p.get("subreddit"), "canonical_url": p["canonical_url"],
+                    "created_utc": p.get("created_utc"), "score": p.get("score"),
+                    "num_comments": p.get("num_comments"),
+                },
+                 "$addToSet": {"articles": {"$each": sorted(found.get(p["canonical_url"], ()))}}},
+                upsert=True,
+            )
+            for p in posts
+        ]
+        db.reddit_article_links.bulk_write(ops, ordered=False)
+    else:
+        by_source: dict[str, set] = {}
+        for d in docs:
+            if d.get("canonical_url"):
+                by_source.setdefault(source_of(collection, d), set()).add(d["canonical_url"])
+        for source, urls in by_source.items():
+            db.reddit_article_links.update_many(
+                {"canonical_url": {"$in": list(urls)}}, {"$addToSet": {"articles": source}})
+
+
+def backfill_canonical_urls(batch_size: int = 1000):
+    """Set canonical_url on stored documents that predate it and rebuild their links."""
+    # articles first, so that the posts find them when they are linked
+    for name in sorted(COLLECTIONS, key=lambda c: c == "reddit_posts"):
+        done = 0
+        query = {"canonical_url": None, "url": {"$ne": None}}
+        while True:
+            docs = list(db[name].find(query, {"url": 1, "id": 1, "subreddit": 1, "created_utc": 1,
+                                              "score": 1, "num_comments": 1}).limit(batch_size))
+            if not docs:
+                break
+            for d in docs:
+                d["canonical_url"] = stored_canonical_url(d["url"]) or ""
+            db[name].bulk_write(
+                [UpdateOne({"_id": d["_id"]}, {"$set": {"canonical_url": d["canonical_url"]}}) for d in docs],
+                ordered=False,
+            )
+            link_reddit_articles(name, docs)
+            done += len(docs)
+        print(f"🔗 Canonicalized {done} URLs in {name}")
+    bump_generation(*COLLECTIONS)
+
+
+def merge_articles(name: str, source: str, archived: bool = False, batch_size: int = 1000) -> int:
+    """Upsert the documents of a per-source collection into `articles`, or of its archive into `articles_archive`."""
+    suffix = "_archive" if archived else ""
+    target, bodies = f"articles{suffix}", f"bodies{suffix}"
+    moved, last_id = 0, None
+    while True:
+        query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+        docs = list(db[name + suffix].find(query).sort("_id", ASCENDING).limit(batch_size))
+        if not docs:
+            break
+        last_id = docs[-1]["_id"]
+        ops = [upsert_doc("articles", {**d, "source": source}) for d in docs if d.get("url")]
+        if ops:
+            db[target].bulk_write(ops, ordered=False)
+        body_ops = []
+        for record in db[bodies].find({"_id": {"$in": [body_id(name, d["url"]) for d in docs if d.get("url")]}}):
+            update = {"collection": "articles", "key": record["key"]}
+            for field in BODY_FIELDS["articles"]:
+                if field in record:
+                    update[field] = {"$ifNull": [f"${field}", {"$literal": record[field]}]}
+            body_ops.append(UpdateOne({"_id": body_id("articles", record["key"])}, [{"$set": update}], upsert=True))
+        if body_ops:
+            db[bodies].bulk_write(body_ops, ordered=False)
+        moved += len(docs)
+    return moved
+
+
+def cutover_watermark(meta: str) -> dict | None:
+    """Where the merged collection resumes the exports or clustering ("export" / "clustering") of the old ones.
+
+    Nothing the old collections had all been through is read again: the
+    watermark is the most advanced one when no old collection has pending
+    documents, else the least advanced one among those that do (documents
+    the other sources already went through after it are read again).
+    """
+    marks, pending = [], []
+    for name in LEGACY_ARTICLE_COLLECTIONS:
+        record = db.scrape_meta.find_one({meta: name})
+        mark = record["watermark"] if record else None
+        if mark is not None:
+            marks.append(mark)
+        if db[name].find_one(changed_since(mark), {"_id": 1}) is not None:
+            if mark is None:
+                return None  # never went through: start from the beginning
+            pending.append(mark)
+    key = lambda m: (m["saved_utc"], m["_id"])
+    if pending:
+        print(f"⚠️ Some legacy articles were never read by {meta}: resuming from the least advanced of them")
+        return min(pending, key=key)
+    return max(marks, key=key) if marks else None
+
+
+def migrate_to_articles(batch_size: int = 1000, drop_old: bool = False):
+    """Move the per-source article collections into `articles`, deduplicated by URL.
+
+    Collections are merged in LEGACY_ARTICLE_COLLECTIONS order, so an article
+    found by several sources keeps the first one as `source` and lists all
+    of them in `sources`. Bodies are merged field by field into the
+    "articles:<url>" records, and the `<collection>_archive` collections
+    into `articles_archive` the same way. Safe to re-run; the old
+    collections and their bodies are only dropped with `drop_old`.
+
+    Exports and clustering of `articles` resume where the old collections
+    stopped (see cutover_watermark): run them just before migrating, with
+    the scrapers stopped, and nothing is read twice. Exported rows then
+    continue under source=articles.
+    """
+    cutover = {meta: cutover_watermark(meta) for meta in ("export", "clustering")}
+    existing = set(db.list_collection_names())
+    for name, source in LEGACY_ARTICLE_COLLECTIONS.items():
+        moved = merge_articles(name, source, batch_size=batch_size)
+        print(f"📦 Merged {moved} documents from {name} into articles")
+        if f"{name}_archive" in existing:
+            archive_collection("articles_archive").create_index([("url", ASCENDING)], unique=True, sparse=True)
+            moved = merge_articles(name, source, archived=True, batch_size=batch_size)
+            print(f"📦 Merged {moved} documents from {name}_archive into articles_archive")
+
+        db.reddit_article_links.update_many({"articles": name}, {"$addToSet": {"articles": source}})
+        db.reddit_article_links.update_many({"articles": name}, {"$pull": {"articles": name}})
+
+    for meta, mark in cutover.items():
+        if mark and not db.scrape_meta.find_one({meta: "articles"}):
+            db.scrape_meta.insert_one({meta: "articles", "watermark": mark})
+
+    if drop_old:
+        for name in LEGACY_ARTICLE_COLLECTIONS:
+            db.bodies.delete_many({"_id": {"$regex": f"^{name}:"}})
+            db.bodies_archive.delete_many({"_id": {"$regex": f"^{name}:"}})
+            db[name].drop()
+            db[f"{name}_archive"].drop()
+            print(f"🗑️ {name} Dropped !")
+    bump_generation("articles")
+    print(f"✅ {db.articles.estimated_document_count()} articles. Rebuild the search index to pick up the new keys.")
+
+
 def save_post(raw_data: dict):
     """save or update a Reddit post."""
     if "created_utc" not in raw_data:
@@ -42,94 +428,227 @@ def save_post(raw_data: dict):
         raw_data["saved_utc"] = datetime.now()
 
     try:
-        post = RedditPost(**raw_data)
+        post = RedditPost(**with_canonical_url(raw_data))
+        main, body = split_body("reddit_posts", post.model_dump(mode="json"))
         db.reddit_posts.update_one(
             {"id": post.id},
-            {"$set": post.model_dump(mode="json")},
+            {"$set": main},
             upsert=True,
         )
+        save_body("reddit_posts", post.id, body)
+        link_reddit_articles("reddit_posts", [main])
+        bump_generation("reddit_posts")
+        run_ingest_hooks("reddit_posts", {**main, **body})
         print(f"✅ Saved post: {post.title[:80]}")
     except Exception as e:
         print(f"❌ Failed to save Reddit post {raw_data.get('id')}: {e}")
 
-def save_newsapi_article(raw_data: dict):
-    """save or update a NewsApi Article."""
-    
+def save_many(collection: str, docs: list[dict], rebuild_id: str = None) -> int:
+    """Validate and bulk upsert documents of a collection, return how many were written."""
+    spec = COLLECTIONS[collection]
+    key_field = spec["key"]
+    ops, body_ops, stored = [], [], []
+    for raw_data in docs:
+        try:
+            doc = spec["model"](**with_canonical_url(raw_data)).model_dump(mode="json")
+        except Exception as e:
+            print(f"❌ Invalid {collection} document {raw_data.get(key_field)}: {e}")
+            continue
+        main, body = split_body(collection, doc)
+        ops.append(upsert_doc(collection, main, rebuild_id))
+        body_op = body_update(collection, main[key_field], body)
+        if body_op is not None:
+            body_ops.append(body_op)
+        stored.append({**main, **body})
+    if not ops:
+        return 0
+
+    db[collection].bulk_write(ops, ordered=False)
+    if body_ops:
+        db.bodies.bulk_write(body_ops, ordered=False)
+    link_reddit_articles(collection, stored)
+    bump_generation(collection)
+    for doc in stored:
+        run_ingest_hooks(collection, doc)
+    print(f"✅ Saved {len(ops)} documents to {collection}")
+    return len(ops)
+
+def save_article(raw_data: dict, source: str):
+    """save or update an article found by `source` (newsapi, gnews, rss)."""
     try:
-        art = NewsArticleModel(**raw_data)
-        db.newsapi_articles.update_one(
-            {"url": str(art.url)},
-            {"$set": art.model_dump(mode="json")},
-            upsert=True,
-        )
+        art = ArticleModel(**with_canonical_url({**raw_data, "source": source}))
+        main, body = split_body("articles", art.model_dump(mode="json"))
+        db.articles.bulk_write([upsert_doc("articles", main)])
+        save_body("articles", str(art.url), body)
+        link_reddit_articles("articles", [main])
+        bump_generation("articles")
+        run_ingest_hooks("articles", {**main, **body})
         print(f"✅ Saved article: {art.title[:80]}")
     except Exception as e:
         print(f"❌ Failed to save article  {raw_data.get('url')}: {e}")
-        
+
+
+def save_newsapi_article(raw_data: dict):
+    """save or update a NewsApi Article."""
+    save_article(raw_data, "newsapi")
+
+
 def save_gnews_article(raw_data: dict):
     """save or update a Gnews Article."""
-    
+    save_article(raw_data, "gnews")
+
+
+def update_scrape_meta(query: dict, update: dict, partition: str = None, fence: int = None) -> bool:
+    """Upsert a scrape_meta record, fenced by the lease that owns `partition`.
+
+    With a fence, the write only applies when no newer lease on the same
+    partition has written this record; returns False when it was rejected.
+    """
+    if fence is None:
+        db.scrape_meta.update_one(query, update, upsert=True)
+        return True
+    fence_field = f"fences.{hashlib.sha1(partition.encode()).hexdigest()[:16]}"
+    query = {**query, "$or": [{fence_field: {"$lte": fence}}, {fence_field: {"$exists": False}}]}
+    update = {**update, "$set": {**update.get("$set", {}), fence_field: fence}}
     try:
-        art = GnewsArticleModel(**raw_data)
-        db.gnews_articles.update_one(
-            {"url": str(art.url)},
-            {"$set": art.model_dump(mode="json")},
-            upsert=True,
-        )
-        print(f"✅ Saved article: {art.title[:80]}")
-    except Exception as e:
-        print(f"❌ Failed to save article  {raw_data.get('url')}: {e}")
-        
+        db.scrape_meta.update_one(query, update, upsert=True)
+    except DuplicateKeyError:
+        print(f"⛔ Rejected stale watermark write for {partition} (fence {fence})")
+        return False
+    return True
+
+
 def get_last_reddit_timestamp(subreddit: str) -> float:
     """"Return the last created_utc timestamp for a subreddit."""
     record = db.scrape_meta.find_one({"subreddit": subreddit})
     return record["last_created_utc"] if record else 0.0
 
 
-def update_last_reddit_timestamp(subreddit: str, timestamp: float | datetime):
+def update_last_reddit_timestamp(subreddit: str, timestamp: float | datetime, fence: int = None) -> bool:
     """Update the last fetched timestamp for a subreddit."""
     if isinstance(timestamp, datetime):
         timestamp = timestamp.timestamp()
-    db.scrape_meta.update_one(
+    return update_scrape_meta(
         {"subreddit": subreddit},
         {"$set": {"last_created_utc": timestamp}},
-        upsert=True
+        partition=subreddit, fence=fence,
     )
 
-def get_last_news_timestamp() -> str | None:
+def get_last_news_timestamp() -> float | str | None:
     """Return the last publishedAt timestamp for NewsAPI scraper."""
     record = db.scrape_meta.find_one({"source": "newsapi"})
     return record["last_published_at"] if record else None
 
 
-def update_last_news_timestamp(timestamp: str):
+def update_last_news_timestamp(timestamp: float | str, fence: int = None) -> bool:
     """Update the last fetched timestamp for NewsAPI scraper."""
-    db.scrape_meta.update_one(
+    return update_scrape_meta(
         {"source": "newsapi"},
         {"$set": {"last_published_at": timestamp}},
-        upsert=True,
+        partition="everything", fence=fence,
     )
 
-def get_last_gnews_timestamp() -> str | None:
-    """Return the last publishedAt timestamp for NewsAPI scraper."""
+def get_last_gnews_timestamp() -> datetime | None:
+    """Return the last publishedAt timestamp for GNews scraper."""
     record = db.scrape_meta.find_one({"source": "gnews"})
     return record["last_published_at"] if record else None
 
 
-def update_last_gnews_timestamp(timestamp: str):
-    """Update the last fetched timestamp for NewsAPI scraper."""
-    db.scrape_meta.update_one(
+def update_last_gnews_timestamp(timestamp: datetime, topic: str = None, fence: int = None) -> bool:
+    """Update the last fetched timestamp for GNews scraper.
+
+    Topics share this watermark, so it only ever moves forward.
+    """
+    return update_scrape_meta(
         {"source": "gnews"},
-        {"$set": {"last_published_at": timestamp}},
+        {"$max": {"last_published_at": timestamp}},
+        partition=topic, fence=fence,
+    )
+
+def get_feed_state(feed: str) -> dict:
+    """Return the conditional-GET validators and last published timestamp of a feed."""
+    return db.scrape_meta.find_one({"feed": feed}) or {}
+
+
+def update_feed_state(feed: str, etag: str | None, last_modified: str | None, last_published_at: float | None,
+                      fence: int = None) -> bool:
+    """Update the validators and last published timestamp of a feed."""
+    update = {"etag": etag, "last_modified": last_modified, "checked_utc": datetime.now()}
+    if last_published_at is not None:
+        update["last_published_at"] = last_published_at
+    return update_scrape_meta({"feed": feed}, {"$set": update}, partition=feed, fence=fence)
+
+
+def changed_since(watermark: dict | None, field: str = "saved_utc") -> dict:
+    """Query for documents changed after a (field, _id) watermark, saved_utc by default."""
+    if not watermark:
+        return {}
+    return {"$or": [
+        {field: {"$gt": watermark[field]}},
+        {field: watermark[field], "_id": {"$gt": watermark["_id"]}},
+    ]}
+
+
+def export_name(collection: str, field: str = "saved_utc") -> str:
+    return collection if field == "saved_utc" else f"{collection}:{field}"
+
+
+def get_export_watermark(collection: str, field: str = "saved_utc") -> dict | None:
+    """Return the (field, _id) position of the last exported document."""
+    record = db.scrape_meta.find_one({"export": export_name(collection, field)})
+    return record["watermark"] if record else None
+
+
+def update_export_watermark(collection: str, value, last_id, field: str = "saved_utc"):
+    """Record the last exported document of a collection."""
+    db.scrape_meta.update_one(
+        {"export": export_name(collection, field)},
+        {"$set": {"watermark": {field: value, "_id": last_id}}},
         upsert=True,
     )
 
+def get_cluster_watermark(collection: str) -> dict | None:
+    """Return the (saved_utc, _id) position of the last clustered document."""
+    record = db.scrape_meta.find_one({"clustering": collection})
+    return record["watermark"] if record else None
+
+
+def update_cluster_watermark(collection: str, saved_utc, last_id):
+    """Record the last clustered document of a collection."""
+    db.scrape_meta.update_one(
+        {"clustering": collection},
+        {"$set": {"watermark": {"saved_utc": saved_utc, "_id": last_id}}},
+        upsert=True,
+    )
+
+def get_ingest_watermark(collection: str) -> dict | None:
+    """Return the (saved_utc, _id) position of the last document run through the ingest hooks."""
+    record = db.scrape_meta.find_one({"ingest": collection})
+    return record["watermark"] if record else None
+
+
+def update_ingest_watermark(collection: str, saved_utc, last_id, fence: int = None) -> bool:
+    """Record the last document run through the ingest hooks, fenced by the ingest lease."""
+    return update_scrape_meta(
+        {"ingest": collection},
+        {"$set": {"watermark": {"saved_utc": saved_utc, "_id": last_id}}},
+        partition="ingest", fence=fence,
+    )
+
 def drop_collections():
     db.reddit_posts.drop()
     print("🗑️ reddit_posts Dropped !")
     db.scrape_meta.drop()
     print("🗑️ scrape_meta Dropped !")
-    db.newsapi_articles.drop()
-    print("🗑️ newsapi_articles Dropped !")
-    db.gnews_articles.drop()
-    print("🗑️ gnews_articles Dropped !")
+    db.articles.drop()
+    print("🗑️ articles Dropped !")
+    db.bodies.drop()
+    print("🗑️ bodies Dropped !")
+    db.stories.drop()
+    print("🗑️ stories Dropped !")
+    db.trend_state.drop()
+    print("🗑️ trend_state Dropped !")
+    db.reddit_article_links.drop()
+    print("🗑️ reddit_article_links Dropped !")
+    # generations keep counting, so responses cached before the drop stay invalid
+    bump_generation(*COLLECTIONS, "stories", "trends")
@@ -0,0 +1,319 @@
+"""Generate a synthetic corpus at scale, bulk-load it and benchmark the read/ingest paths.
+
+Point MONGO_DB at a scratch database first:
+
+    MONGO_DB=news_synth python -m backend.db.synthetic_corpus load --posts 5000000 --articles 5000000 --workers 8
+    MONGO_DB=news_synth python -m backend.db.synthetic_corpus bench
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta
+import itertools
+from multiprocessing import get_context
+import random
+import statistics
+import time
+import zlib
+
+from backend.config import settings
+from backend.db.mongo import (
+    COLLECTIONS, DB_NAME, body_update, changed_since, connect_db, db, link_reddit_articles, load_bodies,
+    save_many, split_body, upsert_doc,
+)
+from backend.urls import canonicalize_url
+
+DOMAINS = [
+    "techcrunch.com", "theverge.com", "wired.com", "arstechnica.com", "reuters.com", "bbc.co.uk",
+    "nytimes.com", "venturebeat.com", "technologyreview.com", "cnbc.com", "zdnet.com", "engadget.com",
+]
+TRACKING_VARIANTS = ["?utm_source=reddit&utm_medium=social", "?ref=hn", "/amp", "?fbclid=IwAR0x", "#comments"]
+ARTICLE_SOURCES = ["newsapi", "gnews"]
+SENTENCE_WORDS = 20
+
+
+@dataclass
+class CorpusSpec(object):
+    """Shape of the generated corpus."""
+    posts: int = 100_000
+    articles: int = 100_000  # split evenly between NewsAPI and GNews
+    start: str = "2024-01-01"
+    span_days: int = 365
+    duplicate_rate: float = 0.05  # re-sightings of a stored key, or URL variants of a stored story
+    link_rate: float = 0.4  # Reddit posts linking to a generated article
+    keyword_rate: float = 0.6  # documents mentioning at least one keyword
+    title_words: int = 12
+    body_words: int = 400  # median words of selftext / expanded_content (lognormal)
+    body_sigma: float = 0.8
+    self_post_rate: float = 0.3
+    vocabulary: int = 30_000
+    seed: int = 7
+
+
+class CorpusGenerator(object):
+    """Deterministic generator of stored-form posts and articles for one shard."""
+
+    def __init__(self, spec: CorpusSpec, shard: int = 0):
+        self.spec = spec
+        self.rng = random.Random(spec.seed * 1_000_003 + shard)
+        self.words = [f"w{i}" for i in range(spec.vocabulary)]
+        self.cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(self.words))))
+        keywords = [k.strip() for k in settings.KEYWORDS.split("+") if k.strip()]
+        self.keywords = keywords
+        self.keyword_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(keywords))))
+        self.subs = settings.TARGET_SUBS.split("+")
+        self.start = datetime.fromisoformat(spec.start)
+        # long texts are stitched from a pool of Zipf sentences, far cheaper than sampling each word
+        self.sentences = [self.text(SENTENCE_WORDS) for _ in range(4096)]
+
+    def text(self, words: int) -> str:
+        return " ".join(self.rng.choices(self.words, cum_weights=self.cum_weights, k=max(1, words)))
+
+    def body(self) -> str:
+        words = int(self.rng.lognormvariate(0, self.spec.body_sigma) * self.spec.body_words)
+        return ". ".join(self.rng.choices(self.sentences, k=max(1, round(words / SENTENCE_WORDS))))
+
+    def mention(self, title: str, body: str) -> tuple[str, str, list[str]]:
+        """Splice keywords into a title or body at the configured rate."""
+        if self.rng.random() >= self.spec.keyword_rate:
+            return title, body, []
+        chosen = sorted(set(self.rng.choices(self.keywords, cum_weights=self.keyword_weights,
+                                             k=self.rng.randint(1, 3))))
+        for kw in chosen:
+            if not body or self.rng.random() < 0.5:
+                title = f"{kw} {title}"
+            else:
+                body = f"{body} {kw}"
+        return title, body, [kw.lower() for kw in chosen]
+
+    def when(self) -> datetime:
+        return self.start + timedelta(seconds=self.rng.random() * self.spec.span_days * 86400)
+
+    def dup(self, i: int) -> int:
+        """Index of the document this one duplicates (i itself when it is new)."""
+        if i and self.rng.random() < self.spec.duplicate_rate:
+            return self.rng.randrange(i)
+        return i
+
+    def article_url(self, source: str, i: int) -> str:
+        return f"https://www.{DOMAINS[i % len(DOMAINS)]}/{source}/story-{i}"
+
+    def article(self, source: str, i: int) -> dict:
+        j = self.dup(i)
+        # both APIs return some of the same stories
+        shared = source != ARTICLE_SOURCES[0] and self.rng.random() < self.spec.duplicate_rate
+        url = self.article_url(ARTICLE_SOURCES[0] if shared else source, j)
+        if j != i and self.rng.random() < 0.5:
+            url += self.rng.choice(TRACKING_VARIANTS)  # another URL of the same story
+        published = self.when()
+        title, body, _ = self.mention(self.text(self.spec.title_words), self.body())
+        return {
+            "url": url,
+            "canonical_url": canonicalize_url(url),
+            "title": title,
+            "author": f"author{self.rng.randrange(5000)}",
+            "description": self.text(30),
+            "content": body[:200] + f"... [+{max(len(body) - 200, 0)} chars]",
+            "expanded_content": body,
+            "publishedAt": published.isoformat(),
+            "source_id": DOMAINS[j % len(DOMAINS)],
+            "source_name": DOMAINS[j % len(DOMAINS)].split(".")[0].title(),
+            "source": source,
+            "saved_utc": (published + timedelta(minutes=self.rng.randrange(1, 600))).isoformat(),
+        }
+
+    def post(self, i: int) -> dict:
+        j = self.dup(i)
+        post_id = f"s{j:x}"
+        created = self.when()
+        is_self = self.rng.random() < self.spec.self_post_rate
+        title, body, keywords = self.mention(self.text(self.spec.title_words), self.body() if is_self else "")
+        subreddit = self.subs[j % len(self.subs)]
+        permalink = f"https://reddit.com/r/{subreddit}/comments/{post_id}/"
+        if not is_self and self.rng.random() < self.spec.link_rate and self.spec.articles:
+            source = self.rng.choice(ARTICLE_SOURCES)
+            url = self.article_url(source, self.rng.randrange(max(self.spec.articles // 2, 1)))
+            url += self.rng.choice(TRACKING_VARIANTS + [""])
+        elif not is_self:
+            url = f"https://{self.rng.choice(['imgur.com', 'youtube.com', 'github.com'])}/x/{post_id}"
+        else:
+            url = permalink
+        score = int(self.rng.paretovariate(1.2))
+        return {
+            "id": post_id,
+            "title": title,
+            "author": f"user{self.rng.randrange(200_000)}",
+            "subreddit": subreddit,
+            "score": score,
+            "upvote_ratio": round(self.rng.uniform(0.5, 1.0), 2),
+            "num_comments": int(score * self.rng.uniform(0.05, 0.5)),
+            "created_utc": created.isoformat(),
+            "url": url,
+            "canonical_url": canonicalize_url(url),
+            "permalink": permalink,
+            "selftext": body or None,
+            "keywords": keywords,
+            "saved_utc": (created + timedelta(minutes=self.rng.randrange(1, 120))).isoformat(),
+        }
+
+
+def write_batch(collection: str, docs: list[dict], validate: bool) -> int:
+    """Store a batch through save_many, or straight to the stored form when not validating."""
+    if validate:
+        return save_many(collection, docs)
+    key = COLLECTIONS[collection]["key"]
+    ops, body_ops, mains = [], [], []
+    for doc in docs:
+        main, body = split_body(collection, doc)
+        ops.append(upsert_doc(collection, main))
+        if body:
+            body_ops.append(body_update(collection, main[key], body))
+        mains.append(main)
+    db[collection].bulk_write(ops, ordered=False)
+    if body_ops:
+        db.bodies.bulk_write(body_ops, ordered=False)
+    link_reddit_articles(collection, mains)
+    return len(ops)
+
+
+def load_shard(spec: dict, stream: str, shard: int, start: int, stop: int, batch_size: int,
+               validate: bool) -> int:
+    """Load documents [start, stop) of a stream: "reddit_posts" or an article source."""
+    spec = CorpusSpec(**spec)
+    gen = CorpusGenerator(spec, shard=zlib.crc32(f"{stream}:{shard}".encode()))
+    collection = "reddit_posts" if stream == "reddit_posts" else "articles"
+    batch, written = [], 0
+    for i in range(start, stop):
+        batch.append(gen.post(i) if stream == "reddit_posts" else gen.article(stream, i))
+        if len(batch) >= batch_size:
+            written += write_batch(collection, batch, validate)
+            batch = []
+    if batch:
+        written += write_batch(collection, batch, validate)
+    return written
+
+
+def load(spec: CorpusSpec, workers: int = 4, batch_size: int = 5000, validate: bool = False):
+    """Generate and bulk-load the corpus; articles go first so that post links resolve."""
+    connect_db()
+    per_stream = {s: spec.articles // 2 for s in ARTICLE_SOURCES}
+    phases = [ARTICLE_SOURCES, ["reddit_posts"]]
+    per_stream["reddit_posts"] = spec.posts
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+        for phase in phases:
+            started = time.perf_counter()
+            futures, total = [], 0
+            for stream in phase:
+                n = per_stream[stream]
+                step = max(-(-n // (workers * 4)), batch_size)
+                for shard, start in enumerate(range(0, n, step)):
+                    futures.append(pool.submit(load_shard, asdict(spec), stream, shard, start,
+                                               min(start + step, n), batch_size, validate))
+            for f in futures:
+                total += f.result()
+            elapsed = time.perf_counter() - started
+            print(f"🏗️ Loaded {total} documents from {', '.join(phase)} in {elapsed:.1f}s "
+                  f"({total / max(elapsed, 1e-9):,.0f} docs/s)")
+
+
+def timed(fn, runs: int) -> tuple[float, float]:
+    latencies = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - t0) * 1000)
+    latencies.sort()
+    return statistics.median(latencies), latencies[max(int(len(latencies) * 0.95) - 1, 0)]
+
+
+def examined(cursor) -> str:
+    stats = cursor.explain().get("executionStats", {})
+    return f"{stats.get('totalKeysExamined', '?')} keys / {stats.get('totalDocsExamined', '?')} docs"
+
+
+def bench(runs: int = 20, seed: int = 7):
+    """Standard read and ingest benchmarks against the loaded corpus."""
+    rng = random.Random(seed)
+    connect_db()
+    for name in list(COLLECTIONS) + ["bodies", "reddit_article_links"]:
+        stats = db.command("collStats", name)
+        print(f"📊 {name}: {stats.get('count', 0):,} docs, data {stats.get('size', 0) / 2**20:,.0f} MiB, "
+              f"indexes {stats.get('totalIndexSize', 0) / 2**20:,.0f} MiB")
+
+    newest = db.reddit_posts.find_one({}, sort=[("created_utc", -1)]) or {}
+    last_day = (datetime.fromisoformat(newest.get("created_utc", "2025-01-01")) - timedelta(days=1)).isoformat()
+    week = (datetime.fromisoformat(last_day) - timedelta(days=7)).isoformat()
+    sub = (newest.get("subreddit") or "technology")
+    sample_links = [d["canonical_url"] for d in db.reddit_article_links.aggregate([{"$sample": {"size": 50}}])]
+    sample_urls = [d["url"] for d in db.articles.aggregate([{"$sample": {"size": 200}}])]
+    watermark = db.articles.find_one({}, sort=[("saved_utc", 1), ("_id", 1)])
+
+    queries = {
+        "latest posts in a subreddit": lambda: db.reddit_posts.find({"subreddit": sub}).sort("created_utc", -1).limit(50),
+        "latest articles": lambda: db.articles.find({}, {"_id": 0}).sort("publishedAt", -1).limit(50),
+        # as /articles/latest?source=gnews: every article GNews found, on (sources, publishedAt)
+        "latest articles of a source": lambda: db.articles.find(
+            {"sources": "gnews"}, {"_id": 0}).sort("publishedAt", -1).limit(50),
+        "posts in the last day": lambda: db.reddit_posts.find({"created_utc": {"$gte": last_day}}, {"id": 1}),
+        "discussion of an article": lambda: db.reddit_article_links.find(
+            {"canonical_url": rng.choice(sample_links or ["https://example.com"])}),
+        "watermark page (changed_since)": lambda: db.articles.find(
+            changed_since(watermark and {"saved_utc": watermark["saved_utc"], "_id": watermark["_id"]})
+        ).sort([("saved_utc", 1), ("_id", 1)]).limit(1000),
+    }
+    for label, make in queries.items():
+        p50, p95 = timed(lambda: list(make()), runs)
+        print(f"⏱️ {label}: p50={p50:.1f}ms p95={p95:.1f}ms ({examined(make())})")
+
+    p50, p95 = timed(lambda: load_bodies("articles", rng.sample(sample_urls, min(100, len(sample_urls)))), runs)
+    print(f"⏱️ load 100 bodies: p50={p50:.1f}ms p95={p95:.1f}ms")
+
+    pipeline = [
+        {"$match": {"created_utc": {"$gte": week}}},
+        {"$unwind": "$keywords"},
+        {"$group": {"_id": "$keywords", "n": {"$sum": 1}}},
+        {"$sort": {"n": -1}},
+    ]
+    p50, p95 = timed(lambda: list(db.reddit_posts.aggregate(pipeline)), max(runs // 4, 1))
+    print(f"⏱️ keyword counts over a week: p50={p50:.1f}ms p95={p95:.1f}ms")
+
+    gen = CorpusGenerator(CorpusSpec(seed=seed, duplicate_rate=0), shard=0xBEEF)
+    for collection, make in (("reddit_posts", lambda i: gen.post(i)),
+                             ("articles", lambda i: gen.article("newsapi", i))):
+        docs = [make(10**9 + i) for i in range(5000)]
+        started = time.perf_counter()
+        save_many(collection, docs)
+        elapsed = time.perf_counter() - started
+        print(f"⏱️ ingest via save_many into {collection}: {len(docs) / elapsed:,.0f} docs/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Synthetic corpus generator, bulk loader and benchmarks.")
+    parser.add_argument("command", choices=["load", "bench"])
+    parser.add_argument("--posts", type=int, default=CorpusSpec.posts)
+    parser.add_argument("--articles", type=int, default=CorpusSpec.articles)
+    parser.add_argument("--start", default=CorpusSpec.start)
+    parser.add_argument("--span-days", type=int, default=CorpusSpec.span_days)
+    parser.add_argument("--duplicate-rate", type=float, default=CorpusSpec.duplicate_rate)
+    parser.add_argument("--link-rate", type=float, default=CorpusSpec.link_rate)
+    parser.add_argument("--keyword-rate", type=float, default=CorpusSpec.keyword_rate)
+    parser.add_argument("--body-words", type=int, default=CorpusSpec.body_words)
+    parser.add_argument("--body-sigma", type=float, default=CorpusSpec.body_sigma)
+    parser.add_argument("--seed", type=int, default=CorpusSpec.seed)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--validate", action="store_true", help="load through save_many and the models (slower)")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--force", action="store_true", help=f"allow writing to {DB_NAME}")
+    args = parser.parse_args()
+
+    if not args.force and not any(marker in DB_NAME for marker in ("synth", "bench", "test")):
+        parser.error(f"MONGO_DB={DB_NAME} does not look like a scratch database, use --force")
+    if args.command == "load":
+        load(CorpusSpec(posts=args.posts, articles=args.articles, start=args.start, span_days=args.span_days,
+                        duplicate_rate=args.duplicate_rate, link_rate=args.link_rate,
+                        keyword_rate=args.keyword_rate, body_words=args.body_words,
+                        body_sigma=args.body_sigma, seed=args.seed),
+             workers=args.workers, batch_size=args.batch_size, validate=args.validate)
+    else:
+        bench(runs=args.runs, seed=args.seed)
@@ -1,21 +1,17 @@
-from dotenv import load_dotenv
-import os
-import praw
+from contextlib import asynccontextmanager
 
-load_dotenv()
-client_id=os.getenv("CLIENT_ID", "")
-client_secret=os.getenv("CLIENT_SECRET", "")
-user_agent=os.getenv("USER_AGENT", "")
+from fastapi import FastAPI
 
-subreddits = ["news", "worldnews", "politics", "technolgy", "economics"]
+from backend.db.mongo import close_db, connect_db
+from backend.routes.route import router
 
-reddit = praw.Reddit(
-    client_id=client_id,
-    client_secret=client_secret,
-    user_agent=user_agent
-)
-print(reddit.read_only)
-subreddit = reddit.subreddit("news")
-for post in subreddit.new(limit=5):
-    print(post.keys())
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    connect_db()
+    yield
+    close_db()
+
+
+app = FastAPI(title="News-Scraper API", lifespan=lifespan)
+app.include_router(router)
@@ -1,10 +1,10 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Literal, Optional
 from pydantic import BaseModel, Field, HttpUrl
 
 
-class GnewsArticleModel(BaseModel):
-    """Schema for Gnews articles stored in MongoDB."""
+class ArticleModel(BaseModel):
+    """Schema for news articles (NewsAPI, GNews, RSS) stored in MongoDB."""
     url: HttpUrl
     title: str
     author: Optional[str]
@@ -12,7 +12,10 @@ class GnewsArticleModel(BaseModel):
     content: Optional[str]
     expanded_content: Optional[str]
     publishedAt: datetime
+    source: Literal["newsapi", "gnews", "rss"]
     source_id: Optional[str]
     source_name: Optional[str]
+    canonical_url: Optional[str] = None
+    feed_url: Optional[str] = None
+    keywords: List[str] = []
     saved_utc: datetime = Field(default_factory=datetime.now)
-
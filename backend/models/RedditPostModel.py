@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional, Union
+from typing import List, Optional, Union
 from pydantic import BaseModel, HttpUrl, field_validator
 
 
@@ -14,8 +14,10 @@ class RedditPost(BaseModel):
     num_comments: Optional[int] = 0
     created_utc: Union[datetime, float, int]
     url: Optional[HttpUrl] = None
+    canonical_url: Optional[str] = None
     permalink: Optional[str] = None
     selftext: Optional[str] = None
+    keywords: List[str] = []
     saved_utc: datetime = datetime.now()
     
     @field_validator("created_utc", mode="before")
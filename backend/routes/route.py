@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Query, Request
+
+from backend.db.mongo import COLLECTIONS, cached_redirect, db
+from backend.services.ResponseCache import response_cache
+from backend.urls import canonicalize_url
+
+router = APIRouter()
+
+# time-window responses change as the window moves, even without writes
+WINDOW_TTL_SECONDS = 30
+
+def since(hours: int) -> str:
+    # dates are stored as ISO strings
+    return (datetime.now() - timedelta(hours=hours)).isoformat()
+
+
+@router.get("/posts/latest")
+def latest_posts(request: Request, subreddit: str = None, limit: int = Query(50, le=500)):
+    def compute():
+        query = {"subreddit": subreddit} if subreddit else {}
+        cursor = db.reddit_posts.find(query, {"_id": 0, "score_history": 0}).sort("created_utc", -1).limit(limit)
+        return list(cursor)
+    return response_cache.respond(request, ["reddit_posts"], compute)
+
+
+@router.get("/articles/latest")
+def latest_articles(request: Request, source: Optional[Literal["newsapi", "gnews", "rss"]] = None,
+                    limit: int = Query(50, le=500)):
+    def compute():
+        # every article the source found, first or not: a scan of (sources, publishedAt)
+        query = {"sources": source} if source else {}
+        return list(db.articles.find(query, {"_id": 0}).sort("publishedAt", -1).limit(limit))
+    return response_cache.respond(request, ["articles"], compute)
+
+
+@router.get("/trends")
+def trends(request: Request, hours: int = Query(24, le=24 * 30), keyword: str = None):
+    def compute():
+        query = {"bucket_start": {"$gte": datetime.now() - timedelta(hours=hours)}}
+        if keyword:
+            query["keyword"] = keyword.lower()
+        return list(db.trends.find(query, {"_id": 0}).sort("bucket_start", -1).limit(500))
+    return response_cache.respond(request, ["trends"], compute, ttl_seconds=WINDOW_TTL_SECONDS)
+
+
+@router.get("/stories")
+def stories(request: Request, hours: int = Query(72, le=24 * 30), limit: int = Query(20, le=200)):
+    def compute():
+        cursor = db.stories.find(
+            {"last_seen": {"$gte": since(hours)}},
+            {"centroid_idx": 0, "centroid_val": 0},
+        ).sort("doc_count", -1).limit(limit)
+        return list(cursor)
+    return response_cache.respond(request, ["stories"], compute, ttl_seconds=WINDOW_TTL_SECONDS)
+
+
+@router.get("/articles/discussion")
+def article_discussion(request: Request, url: str, limit: int = Query(50, le=500)):
+    """Reddit posts linking to an article, through the canonical URL link table."""
+    canonical = canonicalize_url(url, cached_redirect)  # no outbound request on the API path
+
+    def compute():
+        links = list(db.reddit_article_links.find({"canonical_url": canonical}, {"_id": 0})
+                     .sort("score", -1).limit(limit))
+        totals = next(db.reddit_article_links.aggregate([
+            {"$match": {"canonical_url": canonical}},
+            {"$group": {"_id": None, "posts": {"$sum": 1}, "score": {"$sum": "$score"},
+                        "comments": {"$sum": "$num_comments"}}},
+        ]), {})
+        return {
+            "canonical_url": canonical,
+            "posts": totals.get("posts", 0),
+            "score": totals.get("score", 0),
+            "comments": totals.get("comments", 0),
+            "links": links,
+        }
+    return response_cache.respond(request, list(COLLECTIONS), compute)
+
+
+@router.get("/cache/stats")
+def cache_stats():
+    return response_cache.stats()
@@ -0,0 +1,144 @@
+"""Full-text extraction with per-domain yield tracking and a circuit breaker.
+
+Usage (report): python -m backend.services.ContentExtractor --limit 30
+"""
+import argparse
+from datetime import datetime, timedelta
+import threading
+import time
+from urllib.parse import urlsplit
+
+from newspaper import Article
+
+from backend.db.mongo import close_db, connect_db, db
+
+
+OUTCOME_COUNTERS = {"success": "successes", "empty": "empties", "timeout": "timeouts", "error": "errors"}
+
+
+def domain_of(url: str) -> str:
+    host = (urlsplit(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+class ContentExtractor(object):
+    """newspaper3k extraction that learns which publishers are worth trying.
+
+    Every attempt updates the totals of its domain in `domain_stats`
+    (attempts, successes, timeouts, latency, extracted characters). After
+    `failure_threshold` consecutive failures (error, timeout or empty text)
+    the breaker of the domain opens and extraction is skipped until
+    `retry_at`. The next attempt after that is a probe: a success closes
+    the breaker, a failure reopens it with a doubled cooldown.
+    """
+
+    def __init__(self, timeout: int = 10, failure_threshold: int = 3, base_cooldown: int = 3600,
+                 max_cooldown: int = 7 * 86400):
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self.states: dict[str, dict] = {}
+        self.lock = threading.Lock()
+
+    def state(self, domain: str) -> dict:
+        with self.lock:
+            if domain not in self.states:
+                record = db.domain_stats.find_one(
+                    {"_id": domain}, {"consecutive_failures": 1, "opens": 1, "retry_at": 1}) or {}
+                self.states[domain] = {
+                    "consecutive_failures": record.get("consecutive_failures", 0),
+                    "opens": record.get("opens", 0),
+                    "retry_at": record.get("retry_at"),
+                }
+            return self.states[domain]
+
+    def allowed(self, domain: str) -> bool:
+        retry_at = self.state(domain)["retry_at"]
+        return retry_at is None or datetime.utcnow() >= retry_at
+
+    def extract(self, url: str) -> str | None:
+        """Return the article text, or None if extraction failed or the domain is skipped."""
+        domain = domain_of(url)
+        if not domain:
+            return None
+        if not self.allowed(domain):
+            db.domain_stats.update_one({"_id": domain}, {"$inc": {"skipped": 1}})
+            return None
+
+        start = time.monotonic()
+        text, outcome = None, "success"
+        try:
+            article = Article(url, language="en", request_timeout=self.timeout)
+            article.download()
+            article.parse()
+            text = article.text.strip() or None
+            if text is None:
+                outcome = "empty"  # typically a paywall or a bot wall
+        except Exception as e:
+            outcome = "timeout" if "timed out" in str(e).lower() or "timeout" in type(e).__name__.lower() else "error"
+        self.record(domain, outcome, time.monotonic() - start, len(text or ""))
+        return text
+
+    def record(self, domain: str, outcome: str, latency: float, chars: int):
+        state = self.state(domain)
+        with self.lock:
+            if outcome == "success":
+                state.update(consecutive_failures=0, opens=0, retry_at=None)
+            else:
+                state["consecutive_failures"] += 1
+                probe_failed = state["retry_at"] is not None
+                if probe_failed or state["consecutive_failures"] >= self.failure_threshold:
+                    state["opens"] += 1
+                    cooldown = min(self.base_cooldown * 2 ** (state["opens"] - 1), self.max_cooldown)
+                    state["retry_at"] = datetime.utcnow() + timedelta(seconds=cooldown)
+                    print(f"⛔ Skipping extraction on {domain} for {cooldown // 60} min")
+            update_state = dict(state)
+
+        db.domain_stats.update_one(
+            {"_id": domain},
+            {
+                "$inc": {
+                    "attempts": 1,
+                    OUTCOME_COUNTERS[outcome]: 1,
+                    "latency_total": latency,
+                    "chars_total": chars,
+                },
+                "$set": {**update_state, "last_outcome": outcome, "last_attempt_utc": datetime.utcnow()},
+            },
+            upsert=True,
+        )
+
+
+content_extractor = ContentExtractor()
+
+
+def domain_report(limit: int = 30) -> list[dict]:
+    """Per-domain success rate, average latency and average extracted length, worst yield first."""
+    attempts = {"$max": ["$attempts", 1]}
+    return list(db.domain_stats.aggregate([
+        {"$match": {"attempts": {"$gt": 0}}},
+        {"$project": {
+            "attempts": 1, "skipped": 1, "retry_at": 1,
+            "success_rate": {"$divide": [{"$ifNull": ["$successes", 0]}, attempts]},
+            "avg_latency": {"$divide": ["$latency_total", attempts]},
+            "avg_chars": {"$divide": ["$chars_total", {"$max": [{"$ifNull": ["$successes", 0]}, 1]}]},
+        }},
+        {"$sort": {"success_rate": 1, "attempts": -1}},
+        {"$limit": limit},
+    ]))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show the extraction yield of the worst domains.")
+    parser.add_argument("--limit", type=int, default=30)
+    args = parser.parse_args()
+    connect_db()
+    try:
+        for row in domain_report(args.limit):
+            status = f"open until {row['retry_at']:%Y-%m-%d %H:%M}" if row.get("retry_at") else "closed"
+            print(f"{row['_id']:<40} {row['attempts']:>6} tries  {row['success_rate']:>6.1%} ok  "
+                  f"{row['avg_latency']:>5.1f}s  {row['avg_chars']:>7.0f} chars  "
+                  f"{row.get('skipped', 0):>6} skipped  {status}")
+    finally:
+        close_db()
@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta
+
+from pymongo import UpdateOne
+
+from backend.db.mongo import bump_generation, close_db, connect_db, db
+from backend.services.RedditScraper import RedditScraper
+
+ENGAGEMENT_FIELDS = ("score", "upvote_ratio", "num_comments")
+
+
+class EngagementRefresher(object):
+    """Re-reads the engagement of recent Reddit posts.
+
+    Posts are stored once, when first seen, so their score and comment count
+    go stale. Posts created inside the engagement window are re-hydrated
+    through Reddit's `info` endpoint, 100 fullnames per call, and only the
+    fields that moved are written back, stamped with `refreshed_utc` for the
+    Parquet export (saved_utc is left alone, so the story clusterer does not
+    count the post again). With `history` on, each change also appends a
+    compact [timestamp, score, num_comments] point to the post's
+    `score_history`, capped to its last `history_len` points.
+    """
+
+    BATCH_SIZE = 100  # fullnames per /api/info call
+
+    def __init__(self, window_hours: int = 72, history: bool = False, history_len: int = 48, praw_client=None):
+        self.window_hours = window_hours
+        self.history = history
+        self.history_len = history_len
+        self.praw = praw_client or RedditScraper().praw
+
+    def changes(self, stored: dict, post) -> dict:
+        changed = {}
+        for field in ENGAGEMENT_FIELDS:
+            value = getattr(post, field, None)
+            if value is not None and value != stored.get(field):
+                changed[field] = value
+        return changed
+
+    def refresh_batch(self, stored: list[dict]) -> int:
+        """Re-hydrate up to 100 stored posts, return how many changed."""
+        by_id = {d["id"]: d for d in stored}
+        now = datetime.now()
+        ops, link_ops = [], []
+        for post in self.praw.info(fullnames=[f"t3_{i}" for i in by_id]):
+            doc = by_id.get(post.id)
+            if doc is None:
+                continue
+            changed = self.changes(doc, post)
+            if not changed:
+                continue
+            update = {"$set": {**changed, "refreshed_utc": now.isoformat()}}
+            if self.history:
+                point = [int(now.timestamp()), post.score, post.num_comments]
+                update["$push"] = {"score_history": {"$each": [point], "$slice": -self.history_len}}
+            ops.append(UpdateOne({"id": post.id}, update))
+            link_ops.append(UpdateOne({"_id": post.id}, {"$set": changed}))
+        if ops:
+            db.reddit_posts.bulk_write(ops, ordered=False)
+            db.reddit_article_links.bulk_write(link_ops, ordered=False)
+            bump_generation("reddit_posts")
+        return len(ops)
+
+    def run(self) -> tuple[int, int]:
+        """Refresh every post inside the engagement window, return (checked, changed)."""
+        since = (datetime.now() - timedelta(hours=self.window_hours)).isoformat()
+        cursor = db.reddit_posts.find(
+            {"created_utc": {"$gte": since}},
+            {"_id": 0, "id": 1, **{f: 1 for f in ENGAGEMENT_FIELDS}},
+        ).batch_size(1000)
+
+        checked = changed = 0
+        batch = []
+        for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= self.BATCH_SIZE:
+                changed += self.refresh_batch(batch)
+                checked += len(batch)
+                batch = []
+        if batch:
+            changed += self.refresh_batch(batch)
+            checked += len(batch)
+        print(f"📈 Refreshed engagement of {checked} posts ({changed} changed, "
+              f"{-(-checked // self.BATCH_SIZE)} API calls)")
+        return checked, changed
+
+
+def run_engagement_refresh_job(window_hours: int = 72, history: bool = True, history_len: int = 48):
+    """Wrapper to be used by Airflow DAG."""
+    print("🚀 Starting Reddit engagement refresh job...")
+    connect_db()
+    try:
+        refresher = EngagementRefresher(window_hours=window_hours, history=history, history_len=history_len)
+        refresher.run()
+        print("✅ Engagement refresh complete!")
+    except Exception as e:
+        print(f"❌ Engagement refresh failed: {e}")
+        raise
+    finally:
+        close_db()
+        print("🛑 Database connection closed.")
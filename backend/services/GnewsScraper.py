@@ -1,9 +1,11 @@
 from email.utils import parsedate_to_datetime
 from gnews import GNews
 from datetime import datetime, timedelta
-from newspaper import Article
 import math
 
+from backend.services.ContentExtractor import content_extractor
+from backend.services.RawArchive import attach_raw_archive
+from backend.services.source import Source, register_source
 from backend.db.mongo import close_db, connect_db, get_last_gnews_timestamp, save_gnews_article, update_last_gnews_timestamp
 
 # class GnewsScraper(object):
@@ -83,7 +85,13 @@ from backend.db.mongo import close_db, connect_db, get_last_gnews_timestamp, sav
 #             print(f"🔃 Updated GNews last timestamp: {newest_timestamp}")
 
 
-class GnewsScraper:
+@register_source
+class GnewsScraper(Source):
+    name = "gnews"
+    collection = "articles"
+    MAX_REQUESTS = 100  # Free-tier limit
+    MAX_RESULTS = 10     # per request
+
     def __init__(self, query: str = None):
         self.query = query or (
             'AI OR "artificial intelligence" OR ChatGPT OR OpenAI '
@@ -98,15 +106,8 @@ class GnewsScraper:
         ]
 
     def fetch_full_content(self, url: str) -> str | None:
-        """Attempt to extract full article text using newspaper3k."""
-        try:
-            article = Article(url, language="en")
-            article.download()
-            article.parse()
-            text = article.text.strip()
-            return text if text else None
-        except Exception:
-            return None
+        """Attempt to extract full article text, unless its domain's circuit breaker is open."""
+        return content_extractor.extract(url)
 
     def parse_datetime(self, date_str: str) -> datetime | None:
         """Handle multiple possible GNews date formats."""
@@ -196,98 +197,102 @@ class GnewsScraper:
 
         print(f"✅ GNews scraping complete — {fetched_count} articles saved.")
 
-    def scrape_news(self, limit: int = 100, incremental: bool = True):
+    def partitions(self) -> list[str]:
+        return self.topics[:self.MAX_REQUESTS]
+
+    def watermark_key(self, partition: str) -> str:
+        return "gnews"
+
+    def get_watermark(self, partition: str) -> datetime | None:
+        # topics overlap, so they share the single GNews watermark
+        return get_last_gnews_timestamp()
+
+    def commit_watermark(self, partition: str, watermark: datetime | None, fence: int = None) -> bool:
+        if watermark is None:
+            return True
+        if not update_last_gnews_timestamp(watermark, topic=partition, fence=fence):
+            return False
+        print(f"🔃 Updated GNews last timestamp: {watermark}")
+        return True
+
+    def watermark_of(self, raw: dict) -> datetime:
+        # normalize published date
+        published_raw = (
+            raw.get("published date")
+            or raw.get("publishedAt")
+            or None
+        )
+        try:
+            if published_raw:
+                return datetime.strptime(
+                    published_raw, "%a, %d %b %Y %H:%M:%S %Z"
+                )
+        except Exception:
+            pass
+        return datetime.utcnow()
+
+    def fetch(self, partition: str, watermark: datetime | None, limit: int):
+        print(f"📡 Fetching: {partition}")
+        try:
+            articles = self.client.get_news(partition)
+        except Exception as e:
+            print(f"❌ GNews request failed ({partition}): {e}")
+            return
+        yield from (articles or [])[:limit]
+
+    def to_doc(self, raw: dict) -> dict | None:
+        url = raw.get("url")
+        if not url:
+            return None
+
+        expanded_content = None
+        if "[+" in str(raw.get("content") or "") and not self.offline:
+            expanded_content = self.fetch_full_content(url)
+
+        return {
+            "url": url,
+            "title": raw.get("title"),
+            "author": raw.get("author"),
+            "description": raw.get("description"),
+            "content": raw.get("content"),
+            "expanded_content": expanded_content,
+            "publishedAt": self.watermark_of(raw),
+            "source_id": None,
+            "source_name": raw.get("source"),
+            "source": self.name,
+            "saved_utc": datetime.utcnow(),
+        }
+
+    def scrape(self, partitions: list[str] = None, limit: int = 100, incremental: bool = True) -> int:
+        """Scrape topics against the watermark read at start, committed once at the end."""
         last_timestamp = get_last_gnews_timestamp() if incremental else None
         newest_timestamp = last_timestamp
         fetched_count = 0
 
-        MAX_REQUESTS = 100  # Free-tier limit
-        MAX_RESULTS = 10     # per request
-
-        # Build ordered topic list
-        requests = []
-        for topic in self.topics:
-            if len(requests) >= MAX_REQUESTS:
-                break
-            requests.append(topic)
-
-        for idx, topic in enumerate(requests, start=1):
+        for topic in partitions or self.partitions():
             if fetched_count >= limit:
                 break
-
-            print(f"📡 [{idx}/{len(requests)}] Fetching: {topic}")
-
-            try:
-                articles = self.client.get_news(topic)
-            except Exception as e:
-                print(f"❌ GNews request failed ({topic}): {e}")
-                continue
-
-            if not articles:
-                continue
-
-            for art in articles:
-                if fetched_count >= limit:
-                    break
-
-                url = art.get("url")
-                if not url:
-                    continue
-
-                # normalize published date
-                published_raw = (
-                    art.get("published date")
-                    or art.get("publishedAt")
-                    or None
-                )
-                try:
-                    if published_raw:
-                        publishedAt = datetime.strptime(
-                            published_raw, "%a, %d %b %Y %H:%M:%S %Z"
-                        )
-                    else:
-                        publishedAt = datetime.utcnow()
-                except Exception:
-                    publishedAt = datetime.utcnow()
-
-                # incremental filtering
-                if incremental and last_timestamp and publishedAt <= last_timestamp:
-                    continue
-
-                expanded_content = None
-                if "[+" in str(art.get("content") or ""):
-                    expanded_content = self.fetch_full_content(url)
-
-                doc = {
-                    "url": url,
-                    "title": art.get("title"),
-                    "author": art.get("author"),
-                    "description": art.get("description"),
-                    "content": art.get("content"),
-                    "expanded_content": expanded_content,
-                    "publishedAt": publishedAt,
-                    "source_id": None,
-                    "source_name": art.get("source"),
-                    "saved_utc": datetime.utcnow(),
-                }
-
-                save_gnews_article(doc)
-                fetched_count += 1
-
-                if not newest_timestamp or publishedAt > newest_timestamp:
-                    newest_timestamp = publishedAt
+            saved, newest = self.scrape_partition(
+                topic, limit=min(self.MAX_RESULTS, limit - fetched_count), incremental=incremental, commit=False)
+            fetched_count += saved
+            if newest and (not newest_timestamp or newest > newest_timestamp):
+                newest_timestamp = newest
 
         if incremental and newest_timestamp and newest_timestamp != last_timestamp:
-            update_last_gnews_timestamp(newest_timestamp)
-            print(f"🔃 Updated GNews last timestamp: {newest_timestamp}")
+            self.commit_watermark("all", newest_timestamp)
 
         print(f"✅ Finished GNews scraping — {fetched_count} articles stored.")
+        return fetched_count
+
+    def scrape_news(self, limit: int = 100, incremental: bool = True) -> int:
+        return self.scrape(limit=limit, incremental=incremental)
 
 
 def run_gnews_scraper_job(limit: int = 100, incremental: int = True):
     """Wrapper to be used by Airflow DAG."""
     print("🚀 Starting Gnews Scraper job...")
     connect_db()
+    raw_archive = attach_raw_archive()
     try:
         GS = GnewsScraper()
         GS.scrape_news(limit=limit, incremental=incremental)
@@ -296,5 +301,6 @@ def run_gnews_scraper_job(limit: int = 100, incremental: int = True):
         print(f"❌ Gnews Scraper failed: {e}")
         raise
     finally:
+        raw_archive.close()
         close_db()
         print("🛑 Database connection closed.")
@@ -1,13 +1,19 @@
 from newsapi import NewsApiClient
-from datetime import datetime
+from datetime import datetime, timezone
 from backend.config import settings
 import math
-from newspaper import Article
 
-from backend.db.mongo import close_db, connect_db, get_last_news_timestamp, save_newsapi_article, update_last_news_timestamp
+from backend.services.ContentExtractor import content_extractor
+from backend.services.RawArchive import attach_raw_archive
+from backend.services.source import Source, register_source
+from backend.db.mongo import close_db, connect_db, get_last_news_timestamp, update_last_news_timestamp
 
 
-class NewsApiScrapper(object):
+@register_source
+class NewsApiScrapper(Source):
+    name = "newsapi"
+    collection = "articles"
+
     def __init__(self):
         self.client = NewsApiClient(api_key=settings.NEWSAPI_KEY)
         self.query = (
@@ -17,29 +23,44 @@ class NewsApiScrapper(object):
         )
 
     def fetch_full_content(self, url: str) -> str | None:
+        """Attempt to extract full article text, unless its domain's circuit breaker is open."""
+        return content_extractor.extract(url)
+
+    def partitions(self) -> list[str]:
+        return ["everything"]
+
+    def get_watermark(self, partition: str) -> float | None:
+        return get_last_news_timestamp()
+
+    def commit_watermark(self, partition: str, watermark: float | None, fence: int = None) -> bool:
+        if watermark is None:
+            return True
+        if not update_last_news_timestamp(watermark, fence=fence):
+            return False
+        print(f"🔃 Updated NewsAPI last timestamp: {watermark}")
+        return True
+
+    def watermark_of(self, raw: dict) -> float | None:
+        article_ts_str = raw.get("publishedAt")
+        if not article_ts_str:
+            return None
         try:
-            article = Article(url, language="en")
-            article.download()
-            article.parse()
-
-            text = article.text.strip()
-            return text if text else None
+            return datetime.fromisoformat(article_ts_str.replace("Z", "+00:00")).timestamp()
         except Exception:
             return None
 
-    def scrape_news(self, limit: int = 100, page_size: int = 100, incremental: bool = True):
-        last_timestamp = get_last_news_timestamp() if incremental else None
-
-        # Convert last_timestamp to the proper NewsAPI format
+    def fetch(self, partition: str, watermark: float | str | None, limit: int, page_size: int = 100):
+        # Convert the watermark to the proper NewsAPI format
         from_param = None
-        if incremental and last_timestamp:
-            from_param = last_timestamp.strip()
+        if isinstance(watermark, (int, float)):
+            from_param = datetime.fromtimestamp(watermark, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+        elif watermark:
+            from_param = watermark.strip()
             if from_param.endswith("Z"):
-                from_param = from_param[:-1]  # remove trailing Z 
+                from_param = from_param[:-1]  # remove trailing Z
+
         total_pages = math.ceil(limit / page_size)
         fetched_count = 0
-        newest_timestamp = last_timestamp
-
         for page in range(1, total_pages + 1):
             params = {
                 "q": self.query,
@@ -48,12 +69,12 @@ class NewsApiScrapper(object):
                 "page_size": min(page_size, limit - fetched_count),
                 "page": page,
             }
-            if incremental and from_param:
+            if from_param:
                 params["from_param"] = from_param
 
             try:
                 res = self.client.get_everything(**params)
-                print(f"Total article results: {res.get("totalResults")}")
+                print(f"Total article results: {res.get('totalResults')}")
             except Exception as e:
                 print(f"❌ Failed Scraping NewsAPI page {page}: {e}")
                 break
@@ -64,57 +85,44 @@ class NewsApiScrapper(object):
 
             for art in res["articles"]:
                 if fetched_count >= limit:
-                    break
-
-                url = art.get("url")
-                if not url:
-                    continue
-
-                api_content = art.get("content")
-                expanded_content = None
-                if api_content and "[+" in api_content:
-                    expanded_content = self.fetch_full_content(url)
-
-                doc = {
-                    "url": url,
-                    "title": art.get("title"),
-                    "author": art.get("author"),
-                    "description": art.get("description"),
-                    "content": api_content,
-                    "expanded_content": expanded_content,
-                    "publishedAt": art.get("publishedAt"),
-                    "source_id": art.get("source", {}).get("id"),
-                    "source_name": art.get("source", {}).get("name"),
-                    "saved_utc": datetime.utcnow(),
-                }
-
-                save_newsapi_article(doc)
+                    return
                 fetched_count += 1
+                yield art
 
-                # Track newest timestamp
-                article_ts_str = art.get("publishedAt")
-                if article_ts_str:
-                    try:
-                        article_dt = datetime.fromisoformat(article_ts_str.replace("Z", "+00:00"))
-                        article_ts = article_dt.timestamp()
-                        if not newest_timestamp or article_ts > newest_timestamp:
-                            newest_timestamp = article_ts
-                    except Exception:
-                        pass
-
-            if fetched_count >= limit:
-                break
+    def to_doc(self, raw: dict) -> dict | None:
+        url = raw.get("url")
+        if not url:
+            return None
 
-        # Update incremental timestamp
-        if incremental and newest_timestamp and newest_timestamp != last_timestamp:
-            update_last_news_timestamp(newest_timestamp)
-            print(f"🔃 Updated NewsAPI last timestamp: {newest_timestamp}")
+        api_content = raw.get("content")
+        expanded_content = None
+        if api_content and "[+" in api_content and not self.offline:
+            expanded_content = self.fetch_full_content(url)
+
+        return {
+            "url": url,
+            "title": raw.get("title"),
+            "author": raw.get("author"),
+            "description": raw.get("description"),
+            "content": api_content,
+            "expanded_content": expanded_content,
+            "publishedAt": raw.get("publishedAt"),
+            "source_id": (raw.get("source") or {}).get("id"),
+            "source_name": (raw.get("source") or {}).get("name"),
+            "source": self.name,
+            "saved_utc": datetime.utcnow(),
+        }
+
+    def scrape_news(self, limit: int = 100, page_size: int = 100, incremental: bool = True) -> int:
+        saved, _ = self.scrape_partition("everything", limit=limit, incremental=incremental, page_size=page_size)
+        return saved
 
 
 def run_news_api_scraper_job(limit: int = 100, page_size: int = 100, incremental:int = True):
     """Wrapper to be used by Airflow DAG."""
     print("🚀 Starting NewsApi Scraper job...")
     connect_db()
+    raw_archive = attach_raw_archive()
     try:
         NS = NewsApiScrapper()
         NS.scrape_news(limit=limit, page_size=page_size, incremental=incremental)
@@ -123,5 +131,6 @@ def run_news_api_scraper_job(limit: int = 100, page_size: int = 100, incremental
         print(f"❌ NewsAPI Scraper failed: {e}")
         raise
     finally:
+        raw_archive.close()
         close_db()
         print("🛑 Database connection closed.")
@@ -0,0 +1,181 @@
+from datetime import datetime, timezone
+import os
+import uuid
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from backend.db.mongo import (
+    BODY_FIELDS, changed_since, close_db, connect_db, db, get_export_watermark, load_bodies,
+    update_export_watermark,
+)
+
+TIMESTAMP = pa.timestamp("us")
+
+# Columnar schema per collection, with the field used for the date partition
+# and the key the body collection is indexed by. A collection with a
+# `refresh_field` is also exported when that field moves: the same document
+# then appears in several rows, and readers keep the one with the latest
+# saved_utc / refresh_field.
+EXPORTS = {
+    "reddit_posts": {
+        "date_field": "created_utc",
+        "key": "id",
+        "refresh_field": "refreshed_utc",
+        "schema": pa.schema([
+            ("id", pa.string()),
+            ("title", pa.string()),
+            ("author", pa.string()),
+            ("subreddit", pa.string()),
+            ("score", pa.int64()),
+            ("upvote_ratio", pa.float64()),
+            ("num_comments", pa.int64()),
+            ("created_utc", TIMESTAMP),
+            ("url", pa.string()),
+            ("permalink", pa.string()),
+            ("selftext", pa.string()),
+            ("keywords", pa.list_(pa.string())),
+            ("saved_utc", TIMESTAMP),
+            ("refreshed_utc", TIMESTAMP),
+        ]),
+    },
+}
+EXPORTS["articles"] = {
+    "date_field": "publishedAt",
+    "key": "url",
+    "schema": pa.schema([
+        ("url", pa.string()),
+        ("title", pa.string()),
+        ("author", pa.string()),
+        ("description", pa.string()),
+        ("content", pa.string()),
+        ("expanded_content", pa.string()),
+        ("publishedAt", TIMESTAMP),
+        ("source", pa.string()),
+        ("sources", pa.list_(pa.string())),
+        ("source_id", pa.string()),
+        ("source_name", pa.string()),
+        ("feed_url", pa.string()),
+        ("keywords", pa.list_(pa.string())),
+        ("saved_utc", TIMESTAMP),
+    ]),
+}
+
+def to_datetime(value) -> datetime | None:
+    """Parse the ISO strings Mongo documents are stored with into naive UTC."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class ParquetExporter(object):
+    def __init__(self, out_dir: str = None, batch_size: int = 50_000):
+        self.out_dir = out_dir or os.getenv("PARQUET_EXPORT_DIR", "exports")
+        self.batch_size = batch_size
+        self.run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S") + "-" + uuid.uuid4().hex[:6]
+
+    def write_batch(self, collection: str, schema: pa.Schema, rows: list[dict], batch_num: int) -> int:
+        """Write one batch, split into source/date partitions."""
+        spec = EXPORTS[collection]
+        partitions: dict[str, list[dict]] = {}
+        for row in rows:
+            day = row.get(spec["date_field"])
+            partitions.setdefault(day.date().isoformat() if day else "unknown", []).append(row)
+
+        for day, part_rows in partitions.items():
+            path = os.path.join(self.out_dir, f"source={collection}", f"date={day}")
+            os.makedirs(path, exist_ok=True)
+            table = pa.Table.from_pylist(part_rows, schema=schema)
+            pq.write_table(table, os.path.join(path, f"part-{self.run_id}-{batch_num:05d}.parquet"),
+                           compression="zstd")
+        return len(rows)
+
+    def export_collection(self, collection: str, columns: list[str] = None, incremental: bool = True) -> int:
+        spec = EXPORTS[collection]
+        schema = spec["schema"]
+        if columns:
+            # keep the partition field so files can always be placed
+            wanted = set(columns) | {spec["date_field"]}
+            schema = pa.schema([f for f in schema if f.name in wanted])
+        body_cols = [f.name for f in schema if f.name in BODY_FIELDS.get(collection, ())]
+        projection = {f.name: 1 for f in schema if f.name not in body_cols}
+        fields = ["saved_utc"]
+        if incremental and spec.get("refresh_field"):
+            fields.append(spec["refresh_field"])
+        projection.update({spec["key"]: 1, **{f: 1 for f in fields}})
+
+        exported, batch_num = 0, 0
+        for field in fields:
+            watermark = get_export_watermark(collection, field) if incremental else None
+            query = changed_since(watermark, field) or ({} if field == "saved_utc" else {field: {"$ne": None}})
+            cursor = (
+                db[collection]
+                .find(query, projection)
+                .sort([(field, 1), ("_id", 1)])
+                .batch_size(min(self.batch_size, 10_000))
+            )
+            batch = []
+            for doc in cursor:
+                batch.append(doc)
+                if len(batch) >= self.batch_size:
+                    exported += self.flush(collection, schema, body_cols, batch, batch_num, field)
+                    batch_num += 1
+                    batch = []
+            if batch:
+                exported += self.flush(collection, schema, body_cols, batch, batch_num, field)
+                batch_num += 1
+
+        print(f"📤 Exported {exported} documents from {collection}")
+        return exported
+
+    def flush(self, collection: str, schema: pa.Schema, body_cols: list[str], docs: list[dict], batch_num: int,
+              field: str = "saved_utc") -> int:
+        spec = EXPORTS[collection]
+        bodies = load_bodies(collection, [d[spec["key"]] for d in docs]) if body_cols else {}
+        rows = []
+        for d in docs:
+            row = {}
+            for column in schema:
+                if column.name in body_cols:
+                    value = bodies.get(d[spec["key"]], {}).get(column.name)
+                else:
+                    value = d.get(column.name)
+                if column.type == TIMESTAMP:
+                    value = to_datetime(value)
+                row[column.name] = value
+            rows.append(row)
+
+        count = self.write_batch(collection, schema, rows, batch_num)
+        # Advance the watermark only once the batch is on disk
+        last = docs[-1]
+        update_export_watermark(collection, last[field], last["_id"], field)
+        return count
+
+    def export(self, collections: list[str] = None, columns: list[str] = None, incremental: bool = True) -> int:
+        total = 0
+        for collection in collections or list(EXPORTS):
+            total += self.export_collection(collection, columns=columns, incremental=incremental)
+        return total
+
+
+def run_parquet_export_job(out_dir: str = None, columns: list[str] = None, batch_size: int = 50_000, incremental: bool = True):
+    """Wrapper to be used by Airflow DAG."""
+    print("🚀 Starting Parquet export job...")
+    connect_db()
+    try:
+        exporter = ParquetExporter(out_dir=out_dir, batch_size=batch_size)
+        exporter.export(columns=columns, incremental=incremental)
+        print("✅ Parquet export complete!")
+    except Exception as e:
+        print(f"❌ Parquet export failed: {e}")
+        raise
+    finally:
+        close_db()
+        print("🛑 Database connection closed.")
@@ -0,0 +1,178 @@
+from datetime import datetime
+import glob
+import gzip
+import io
+import json
+import os
+import socket
+import threading
+import time
+from typing import Iterator
+
+from backend.db.compression import ZSTD_LEVEL, zstandard
+
+
+class SegmentWriter(object):
+    """One compressed JSONL segment, published under its final name on close."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.part_path = path + ".part"
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if path.endswith(".zst"):
+            self.stream = zstandard.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(open(self.part_path, "wb"))
+        else:
+            self.stream = gzip.open(self.part_path, "wb")
+        self.records = 0
+        self.opened_at = time.monotonic()
+
+    def write(self, line: bytes):
+        self.stream.write(line)
+        self.records += 1
+
+    def close(self):
+        self.stream.close()
+        os.replace(self.part_path, self.path)
+
+
+class RawArchive(object):
+    """Append-only archive of the raw API payloads of every scrape.
+
+    Payloads are written before any filtering to compressed JSONL segments
+    under `source=<name>/date=<fetch day>/`, one record per line:
+    {"source", "partition", "fetched_utc", "raw"}. A segment is only visible
+    under its final name once closed, so readers never see a torn file;
+    writers close theirs after every scrape run, and `recover_parts` publishes
+    what a crashed writer left in its `.part` files.
+    """
+
+    def __init__(self, directory: str = None, max_records: int = 50_000, max_seconds: int = 900):
+        self.directory = directory or os.getenv("RAW_ARCHIVE_DIR", "raw_archive")
+        self.max_records = max_records
+        self.max_seconds = max_seconds
+        self.ext = ".jsonl.zst" if zstandard is not None else ".jsonl.gz"
+        self.run_id = f"{datetime.utcnow():%Y%m%dT%H%M%S}-{socket.gethostname()}-{os.getpid()}"
+        self.segments: dict[tuple[str, str], SegmentWriter] = {}
+        self.counter = 0
+        self.lock = threading.Lock()
+
+    def open_segment(self, source: str, day: str) -> SegmentWriter:
+        self.counter += 1
+        name = f"part-{self.run_id}-{self.counter:05d}{self.ext}"
+        return SegmentWriter(os.path.join(self.directory, f"source={source}", f"date={day}", name))
+
+    def append(self, source: str, partition: str, raw: dict):
+        now = datetime.utcnow()
+        record = {"source": source, "partition": partition, "fetched_utc": now.isoformat(), "raw": raw}
+        line = json.dumps(record, default=str, ensure_ascii=False).encode("utf-8") + b"\n"
+        key = (source, now.strftime("%Y-%m-%d"))
+        with self.lock:
+            segment = self.segments.get(key)
+            if segment is None or segment.records >= self.max_records:
+                if segment is not None:
+                    segment.close()
+                segment = self.segments[key] = self.open_segment(*key)
+            segment.write(line)
+
+    def flush(self, max_age: float = None):
+        """Close the segments older than `max_age` seconds (all of them by default)."""
+        with self.lock:
+            for key, segment in list(self.segments.items()):
+                if max_age is None or time.monotonic() - segment.opened_at >= max_age:
+                    segment.close()
+                    del self.segments[key]
+
+    def close(self):
+        self.flush()
+
+
+def list_segments(directory: str = None, sources: list[str] = None, since: str = None, until: str = None) -> list[str]:
+    """Closed segments, filtered on source and on fetch day (since inclusive, until exclusive)."""
+    directory = directory or os.getenv("RAW_ARCHIVE_DIR", "raw_archive")
+    paths = []
+    for ext in (".jsonl.zst", ".jsonl.gz"):
+        paths += glob.glob(os.path.join(directory, "source=*", "date=*", f"*{ext}"))
+    selected = []
+    for path in sorted(paths):
+        source = path.split("source=")[1].split(os.sep)[0]
+        day = path.split("date=")[1].split(os.sep)[0]
+        if sources and source not in sources:
+            continue
+        if (since and day < since) or (until and day >= until):
+            continue
+        selected.append(path)
+    return selected
+
+
+def open_text(path: str, name: str = None) -> io.TextIOBase:
+    """Decompressing text stream over a segment file, the codec is taken from `name` (default: path)."""
+    if (name or path).endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd segments")
+        return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(open(path, "rb")), encoding="utf-8")
+    return gzip.open(path, "rt", encoding="utf-8")
+
+
+def read_segment(path: str) -> Iterator[dict]:
+    """Stream the records of a segment."""
+    with open_text(path) as stream:
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+
+
+def recover_parts(directory: str = None, min_age: float = 3600) -> int:
+    """Publish the complete records of `.part` segments untouched for `min_age` seconds.
+
+    Those were left open by a writer that crashed or was killed. Each one is
+    claimed by an atomic rename, so concurrent recoveries never process the
+    same file; its readable lines are rewritten as a closed segment under the
+    final name. Returns the number of records recovered.
+    """
+    directory = directory or os.getenv("RAW_ARCHIVE_DIR", "raw_archive")
+    recovered = 0
+    for part in glob.glob(os.path.join(directory, "source=*", "date=*", "*.part")):
+        try:
+            if time.time() - os.stat(part).st_mtime < min_age:
+                continue
+            claimed = part + ".recovering"
+            os.replace(part, claimed)
+        except FileNotFoundError:
+            continue  # closed or claimed by another process meanwhile
+        path = part[:-len(".part")]
+        lines = []
+        try:
+            with open_text(claimed, path) as stream:
+                for line in stream:
+                    if line.endswith("\n") and line.strip():
+                        json.loads(line)
+                        lines.append(line)
+        except Exception:
+            pass  # truncated stream: keep the complete records read so far
+        if lines:
+            segment = SegmentWriter(path)
+            for line in lines:
+                segment.write(line.encode("utf-8"))
+            segment.close()
+        os.remove(claimed)
+        recovered += len(lines)
+        print(f"🩹 Recovered {len(lines)} records from {part}")
+    return recovered
+
+
+_raw_archive: RawArchive | None = None
+
+
+def attach_raw_archive() -> RawArchive:
+    """Archive the raw payloads fetched by this process."""
+    global _raw_archive
+    if _raw_archive is None:
+        _raw_archive = RawArchive()
+        recover_parts(_raw_archive.directory, min_age=2 * _raw_archive.max_seconds)
+    return _raw_archive
+
+
+def archive_raw(source: str, partition: str, raw: dict):
+    """Append a raw payload to the attached archive, if any."""
+    if _raw_archive is not None:
+        _raw_archive.append(source, partition, raw)
@@ -3,14 +3,24 @@ from datetime import datetime
 import re
 from backend.config import settings
 import praw
+from praw.models.base import PRAWBase
+from praw.models.reddit.base import RedditBase
 from typing import Literal
 
-from backend.db.mongo import close_db, connect_db, get_last_reddit_timestamp, save_post, update_last_reddit_timestamp
+from backend.services.RawArchive import attach_raw_archive
+from backend.services.keywords import compile_keywords, match_keywords
+from backend.services.source import Source, register_source
+from backend.db.mongo import close_db, connect_db, get_last_reddit_timestamp, update_last_reddit_timestamp
+
+@register_source
+class RedditScraper(Source):
+    name = "reddit"
+    collection = "reddit_posts"
 
-class RedditScraper(object):
     def __init__(self):
         self.TARGET_SUBS = settings.TARGET_SUBS.split("+")
         self.KEYWORDS = settings.KEYWORDS.split("+")
+        self.keyword_patterns = compile_keywords(self.KEYWORDS)
         self.FALSE_POSITIVES = ["ukrain", "russia", "war", "politics"]
 
         self.client_id = settings.CLIENT_ID
@@ -32,21 +42,14 @@ class RedditScraper(object):
         if not text:
             return False
         text = text.lower()
+        return any(pattern.search(text) for _, pattern in self.keyword_patterns)
 
-        for kw in self.KEYWORDS:
-            kw = kw.lower().strip()
-            if len(kw) <= 2:  # short keywords: ai, ml
-                pattern = rf"\b{re.escape(kw)}\b|\b{re.escape(kw)}-(?=\w)"
-            else:  # longer keywords/phrases
-                pattern = rf"\b{re.escape(kw)}\b"
-
-            if re.search(pattern, text):
-                return True
-        return False
-
-    def post_mentions_ai(self, post: praw.reddit.Submission) -> bool:
+    def post_mentions_ai(self, post: praw.reddit.Submission | dict) -> bool:
         """Return True if post is AI-related and not a false positive."""
-        text = (post.title or "") + " " + (getattr(post, "selftext", "") or "")
+        if isinstance(post, dict):
+            text = (post.get("title") or "") + " " + (post.get("selftext") or "")
+        else:
+            text = (post.title or "") + " " + (getattr(post, "selftext", "") or "")
         text_lower = text.lower()
 
         # Must contain AI keyword
@@ -63,71 +66,87 @@ class RedditScraper(object):
                         return False  # discard if no AI mention in same sentence
         return True
 
-    def extract_post_data(self, post: praw.reddit.Submission) -> dict:
-        data = {}
-        for field in self.reddit_fields:
-            value = getattr(post, field, None)
-
-            if field == "author":
-                value = value.name if value else "unknown"
-            elif field == "subreddit":
-                value = value.display_name if value else "unknown"
-            elif field == "created_utc":
-                value = datetime.fromtimestamp(
-                    post.created_utc) if value else datetime.now()
-            data[field] = value
+    def plain(self, value):
+        """JSON-friendly copy of a PRAW attribute: Reddit objects by name, other PRAW objects as dicts."""
+        if isinstance(value, RedditBase):
+            return str(value)  # author name, subreddit display name...
+        if isinstance(value, PRAWBase):
+            value = {k: v for k, v in vars(value).items() if not k.startswith("_")}
+        if isinstance(value, dict):
+            return {k: self.plain(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self.plain(v) for v in value]
+        return value
+
+    def raw_post(self, post: praw.reddit.Submission) -> dict:
+        """Every attribute of a submission as returned by the API, so archived posts can be reprocessed
+        into fields the models do not store yet."""
+        return {k: self.plain(v) for k, v in vars(post).items() if not k.startswith("_")}
+
+    def extract_post_data(self, post: praw.reddit.Submission | dict) -> dict:
+        raw = post if isinstance(post, dict) else self.raw_post(post)
+        data = {field: raw.get(field) for field in self.reddit_fields}
+
+        data["author"] = data.get("author") or "unknown"
+        data["subreddit"] = data.get("subreddit") or "unknown"
+        data["created_utc"] = datetime.fromtimestamp(
+            data["created_utc"]) if data.get("created_utc") else datetime.now()
 
         if "permalink" in data and data["permalink"]:
             data["permalink"] = f"https://reddit.com{data['permalink']}"
 
+        data["keywords"] = match_keywords(
+            f"{data.get('title') or ''} {data.get('selftext') or ''}", self.keyword_patterns)
+        data["saved_utc"] = datetime.utcnow()
+
         return data
 
-    def scrape(self, type: Literal["top", "hot", "new", "rising"] = "new", limit: int = 25, incremental: bool = True):
-        total_saved_posts = 0
-        for sub in self.TARGET_SUBS:
-            subreddit = self.praw.subreddit(sub)
-            last_created_utc = get_last_reddit_timestamp(sub)
-            new_last_created_utc = last_created_utc
-
-            if type == "top":
-                posts = subreddit.top(limit=limit)
-            elif type == "hot":
-                posts = subreddit.hot(limit=limit)
-            elif type == "new":
-                posts = subreddit.new(limit=limit)
-            elif type == "rising":
-                posts = subreddit.rising(limit=limit)
-            else:
-                raise ValueError(f"Unsupported Scraping Type: {type}")
-            new_posts_count = 0
-            for post in posts:
-
-                if incremental and post.created_utc <= last_created_utc:
-                    continue
-
-                if self.post_mentions_ai(post):
-                    doc = self.extract_post_data(post)
-                    save_post(doc)
-                    new_posts_count += 1
-                    print(f"✅ Saved post: {post.title[:60]}")
-
-                    if post.created_utc > new_last_created_utc:
-                        new_last_created_utc = post.created_utc
-
-            if incremental:
-                update_last_reddit_timestamp(sub, new_last_created_utc)
-                print(
-                    f"🔃 Updated timestamp for r/{sub}: {new_last_created_utc}")
-            print(f"📊 Finished r/{sub}: {new_posts_count} posts saved.")
-            total_saved_posts += new_posts_count
-        print(f"🏁 Finished {", ".join([f"r/{sub}" for sub in self.TARGET_SUBS])}: {
-              total_saved_posts} posts saved.")
+    def partitions(self) -> list[str]:
+        return self.TARGET_SUBS
+
+    def get_watermark(self, partition: str) -> float:
+        return get_last_reddit_timestamp(partition)
+
+    def commit_watermark(self, partition: str, watermark: float, fence: int = None) -> bool:
+        if not update_last_reddit_timestamp(partition, watermark, fence=fence):
+            return False
+        print(f"🔃 Updated timestamp for r/{partition}: {watermark}")
+        return True
+
+    def watermark_of(self, raw: dict) -> float:
+        return raw.get("created_utc")
+
+    def fetch(self, partition: str, watermark: float, limit: int,
+              type: Literal["top", "hot", "new", "rising"] = "new"):
+        subreddit = self.praw.subreddit(partition)
+        if type == "top":
+            posts = subreddit.top(limit=limit)
+        elif type == "hot":
+            posts = subreddit.hot(limit=limit)
+        elif type == "new":
+            posts = subreddit.new(limit=limit)
+        elif type == "rising":
+            posts = subreddit.rising(limit=limit)
+        else:
+            raise ValueError(f"Unsupported Scraping Type: {type}")
+        for post in posts:
+            yield self.raw_post(post)
+
+    def to_doc(self, raw: dict) -> dict | None:
+        if not self.post_mentions_ai(raw):
+            return None
+        return self.extract_post_data(raw)
+
+    def scrape(self, type: Literal["top", "hot", "new", "rising"] = "new", limit: int = 25,
+               incremental: bool = True, partitions: list[str] = None) -> int:
+        return super().scrape(partitions=partitions, limit=limit, incremental=incremental, type=type)
 
 
 def run_reddit_scraper_job(scrape_type: Literal["top", "hot", "new", "rising"] = "new", limit: int = 100, incremental: bool = True):
     """Wrapper to be used by Airflow DAG."""
     print("🚀 Starting RedditScraper job...")
     connect_db()
+    raw_archive = attach_raw_archive()
     try:
         scraper = RedditScraper()
         scraper.scrape(type=scrape_type, limit=limit, incremental=incremental)
@@ -136,5 +155,6 @@ def run_reddit_scraper_job(scrape_type: Literal["top", "hot", "new", "rising"] =
         print(f"❌ Scraper failed: {e}")
         raise
     finally:
+        raw_archive.close()
         close_db()
         print("🛑 Reddit Database connection closed.")
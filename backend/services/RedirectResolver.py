@@ -0,0 +1,92 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from pymongo import UpdateOne
+import requests
+
+from backend.db.mongo import (
+    COLLECTIONS, bump_generation, close_db, connect_db, db, link_reddit_articles,
+)
+from backend.urls import canonicalize_url
+
+
+def resolve_redirect(url: str, timeout: float = 5.0) -> str | None:
+    """Follow the redirects of a shortened URL, None on failure."""
+    try:
+        res = requests.head(url, allow_redirects=True, timeout=timeout)
+        return res.url or None
+    except requests.RequestException:
+        return None
+
+
+class RedirectResolver(object):
+    """Resolves the link shorteners queued in `url_redirects` off the ingest path.
+
+    Documents are stored with the canonical form of the short URL, and the
+    short URL is queued. Each run follows the queued redirects in parallel,
+    records the target, then moves the documents stored under the short URL
+    to the canonical form of the target and relinks them. Ingest and the API
+    only ever read `url_redirects`; failed lookups are retried up to
+    `max_attempts` runs.
+    """
+
+    def __init__(self, max_workers: int = 16, timeout: float = 5.0, batch_size: int = 500, max_attempts: int = 3):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+
+    def relink(self, short_url: str, canonical: str) -> int:
+        """Move the documents stored under `short_url` to `canonical`, return how many moved."""
+        moved = 0
+        for name in sorted(COLLECTIONS, key=lambda c: c == "reddit_posts"):  # articles first, as on ingest
+            key = COLLECTIONS[name]["key"]
+            docs = list(db[name].find({"canonical_url": short_url}, {
+                key: 1, "source": 1, "subreddit": 1, "created_utc": 1, "score": 1, "num_comments": 1}))
+            if not docs:
+                continue
+            db[name].update_many({"_id": {"$in": [d["_id"] for d in docs]}}, {"$set": {"canonical_url": canonical}})
+            for d in docs:
+                d["canonical_url"] = canonical
+            link_reddit_articles(name, docs)
+            bump_generation(name)
+            moved += len(docs)
+        return moved
+
+    def run(self) -> tuple[int, int]:
+        """Resolve every queued short URL, return (resolved, documents moved)."""
+        pending = [r["_id"] for r in db.url_redirects.find(
+            {"target": None, "attempts": {"$not": {"$gte": self.max_attempts}}}, {"_id": 1}).limit(self.batch_size)]
+        if not pending:
+            return 0, 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            targets = list(pool.map(lambda u: resolve_redirect(u, self.timeout), pending))
+
+        resolved = moved = 0
+        ops = []
+        for short_url, target in zip(pending, targets):
+            canonical = canonicalize_url(target) if target else None
+            if not canonical or canonical == short_url:
+                ops.append(UpdateOne({"_id": short_url}, {"$inc": {"attempts": 1}}))
+                continue
+            ops.append(UpdateOne({"_id": short_url}, {"$set": {"target": canonical, "resolved_utc": datetime.now()}}))
+            moved += self.relink(short_url, canonical)
+            resolved += 1
+        db.url_redirects.bulk_write(ops, ordered=False)
+        print(f"🔗 Resolved {resolved}/{len(pending)} short URLs, {moved} documents relinked")
+        return resolved, moved
+
+
+def run_redirect_resolution_job(max_workers: int = 16, batch_size: int = 500):
+    """Wrapper to be used by Airflow DAG."""
+    print("🚀 Starting redirect resolution job...")
+    connect_db()
+    try:
+        RedirectResolver(max_workers=max_workers, batch_size=batch_size).run()
+        print("✅ Redirect resolution complete!")
+    except Exception as e:
+        print(f"❌ Redirect resolution failed: {e}")
+        raise
+    finally:
+        close_db()
+        print("🛑 Database connection closed.")
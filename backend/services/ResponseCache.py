@@ -0,0 +1,85 @@
+from collections import OrderedDict
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Callable
+
+from fastapi import Request, Response
+
+from backend.db.mongo import get_generations
+
+
+class CacheEntry(object):
+    __slots__ = ("body", "etag", "generations", "expires_at")
+
+    def __init__(self, body: bytes, etag: str, generations: tuple, expires_at: float):
+        self.body = body
+        self.etag = etag
+        self.generations = generations
+        self.expires_at = expires_at
+
+
+class ResponseCache(object):
+    """Bounded LRU / TTL cache of serialized API responses.
+
+    Each entry remembers the write generation of the collections it was
+    computed from. Writers bump those generations in `cache_generations`
+    after every flush, and a lookup only hits when they are unchanged, so a
+    hit is never staler than the database. The TTL bounds how long an
+    unused entry holds memory; endpoints whose window moves with the clock
+    pass a short one, as their result changes without any write.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: int = 600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key: str, generations: tuple) -> CacheEntry | None:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.generations != generations or entry.expires_at < time.monotonic():
+                del self.entries[key]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, body: bytes, generations: tuple, ttl_seconds: int = None) -> CacheEntry:
+        etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+        entry = CacheEntry(body, etag, generations, time.monotonic() + (ttl_seconds or self.ttl_seconds))
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return entry
+
+    def respond(self, request: Request, collections: list[str], compute: Callable[[], Any],
+                ttl_seconds: int = None) -> Response:
+        """Serve `compute()` as JSON from the cache, answering 304 to a matching If-None-Match."""
+        key = request.url.path + "?" + "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+        generations = tuple(sorted(get_generations(collections).items()))
+        entry = self.get(key, generations)
+        if entry is None:
+            body = json.dumps(compute(), default=str, separators=(",", ":")).encode()
+            entry = self.put(key, body, generations, ttl_seconds)
+
+        headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+        if entry.etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses}
+
+
+response_cache = ResponseCache()
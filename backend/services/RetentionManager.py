@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta
+
+from pymongo import ASCENDING, DeleteOne, ReplaceOne
+
+from backend.config import settings
+from backend.db.mongo import (
+    BODY_FIELDS, COLLECTIONS, archive_collection, body_id, bump_generation, close_db, connect_db, db,
+    ensure_ttl_index,
+)
+
+# Date and key fields of the collections that can be tiered, besides the scraped ones
+TIERED = {
+    **{name: {"key": spec["key"], "date_field": spec["date_field"]} for name, spec in COLLECTIONS.items()},
+    "stories": {"key": "_id", "date_field": "last_seen"},
+}
+
+# Date field each scratch collection expires on. scrape_leases is not one:
+# its fence tokens must never restart below those stored in scrape_meta.
+TTL_FIELDS = {
+    "trends": "bucket_start",
+    "domain_stats": "last_attempt_utc",
+}
+
+
+def parse_days(value: str) -> dict[str, int]:
+    """Parse "name=days,name=days" settings."""
+    days = {}
+    for item in value.split(","):
+        if "=" in item:
+            name, n = item.split("=", 1)
+            days[name.strip()] = int(n)
+    return days
+
+
+RETENTION_DAYS = parse_days(settings.RETENTION_DAYS)
+SCRATCH_TTL_DAYS = parse_days(settings.SCRATCH_TTL_DAYS)
+
+
+def ensure_scratch_ttl(collection: str):
+    """Expire the documents of a scratch collection after its configured TTL."""
+    if collection in SCRATCH_TTL_DAYS and collection not in TTL_FIELDS:
+        print(f"⚠️ No TTL support for {collection}")
+    elif collection in SCRATCH_TTL_DAYS:
+        ensure_ttl_index(collection, TTL_FIELDS[collection], SCRATCH_TTL_DAYS[collection] * 86400)
+
+
+class RetentionManager(object):
+    """Moves documents past their retention age from the hot collections to archives.
+
+    Old documents are copied in batches to `<collection>_archive`, created
+    with zstd block compression and indexed on the natural key only, then
+    deleted from the hot collection. Their compressed bodies move to
+    `bodies_archive`, or are dropped with `strip_bodies` (the raw archive can
+    still rebuild them). Copies are idempotent upserts, so an interrupted run
+    is simply resumed by the next one. The hot collections, and the indexes
+    every query goes through, stay bounded by the retention window.
+    """
+
+    def __init__(self, retention_days: dict[str, int] = None, batch_size: int = 5000, strip_bodies: bool = False):
+        self.retention_days = retention_days or RETENTION_DAYS
+        self.batch_size = batch_size
+        self.strip_bodies = strip_bodies
+
+    def tier(self, collection: str, days: int) -> int:
+        """Move the documents of `collection` older than `days` days, return how many moved."""
+        spec = TIERED[collection]
+        key, date_field = spec["key"], spec["date_field"]
+        cutoff = (datetime.now() - timedelta(days=days)).isoformat()  # dates are stored as ISO strings
+        archive = archive_collection(f"{collection}_archive")
+        archive.create_index([(key, ASCENDING)], unique=True, sparse=True)
+        body_fields = BODY_FIELDS.get(collection)
+        bodies_archive = archive_collection("bodies_archive") if body_fields and not self.strip_bodies else None
+
+        moved = 0
+        while True:
+            docs = list(db[collection].find({date_field: {"$lt": cutoff}}).limit(self.batch_size))
+            if not docs:
+                break
+            archive.bulk_write([ReplaceOne({"_id": d["_id"]}, d, upsert=True) for d in docs], ordered=False)
+            if body_fields:
+                ids = [body_id(collection, d[key]) for d in docs if d.get(key)]
+                if bodies_archive is not None:
+                    bodies = list(db.bodies.find({"_id": {"$in": ids}}))
+                    if bodies:
+                        bodies_archive.bulk_write(
+                            [ReplaceOne({"_id": b["_id"]}, b, upsert=True) for b in bodies], ordered=False)
+                db.bodies.delete_many({"_id": {"$in": ids}})
+            db[collection].bulk_write([DeleteOne({"_id": d["_id"]}) for d in docs], ordered=False)
+            moved += len(docs)
+        if moved:
+            bump_generation(collection)
+        print(f"🧊 Moved {moved} documents older than {days} days from {collection} to {collection}_archive")
+        return moved
+
+    def run(self) -> int:
+        total = 0
+        for collection, days in self.retention_days.items():
+            if collection not in TIERED:
+                print(f"⚠️ No retention support for {collection}")
+                continue
+            total += self.tier(collection, days)
+        for collection in SCRATCH_TTL_DAYS:
+            ensure_scratch_ttl(collection)
+        return total
+
+
+def run_retention_job(batch_size: int = 5000, strip_bodies: bool = False):
+    """Wrapper to be used by Airflow DAG."""
+    print("🚀 Starting retention job...")
+    connect_db()
+    try:
+        total = RetentionManager(batch_size=batch_size, strip_bodies=strip_bodies).run()
+        print(f"✅ Retention complete — {total} documents archived.")
+    except Exception as e:
+        print(f"❌ Retention failed: {e}")
+        raise
+    finally:
+        close_db()
+        print("🛑 Database connection closed.")
@@ -0,0 +1,453 @@
+from array import array
+from collections import Counter
+from datetime import date, datetime
+import fcntl
+import heapq
+import json
+import math
+import mmap
+import os
+import pickle
+import re
+import time
+import uuid
+
+from backend.db.mongo import (
+    BODY_FIELDS, COLLECTIONS, close_db, connect_db, db, load_bodies, register_ingest_hook, source_of,
+)
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the "
+    "this to was were will with".split()
+)
+INDEXED_FIELDS = ("title", "description", "content", "selftext")
+SOURCES = {name: spec["source"] for name, spec in COLLECTIONS.items()}
+KEY_FIELDS = {name: spec["key"] for name, spec in COLLECTIONS.items()}
+DATE_FIELDS = {name: spec["date_field"] for name, spec in COLLECTIONS.items()}
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# segments of the same size tier merged together on flush
+MERGE_FACTOR = 8
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in TOKEN_RE.findall(text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+def day_ordinal(value) -> int:
+    """Day number of an ISO string / datetime, 0 when unknown."""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return 0
+    return value.toordinal() if isinstance(value, (date, datetime)) else 0
+
+
+class Segment(object):
+    """An immutable, memory-mapped slice of the index.
+
+    `<name>.post` holds, per term, its docnums (uint32) followed by its term
+    frequencies (uint16). `<name>.meta` holds the term dictionary and the
+    per-document columns used for filtering and length normalisation.
+    """
+
+    def __init__(self, directory: str, name: str):
+        self.name = name
+        with open(os.path.join(directory, f"{name}.meta"), "rb") as f:
+            meta = pickle.load(f)
+        self.base = meta["base"]
+        self.terms = meta["terms"]
+        self.keys = meta["keys"]
+        self.sources = meta["sources"]
+        self.subreddits = meta["subreddits"]
+        self.source_codes = meta["source_codes"]
+        self.subreddit_codes = meta["subreddit_codes"]
+        self.days = meta["days"]
+        self.lengths = meta["lengths"]
+        self._file = open(os.path.join(directory, f"{name}.post"), "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+
+    def postings(self, term: str) -> tuple[array, array]:
+        entry = self.terms.get(term)
+        if entry is None or self._mm is None:
+            return array("I"), array("H")
+        offset, n = entry
+        docs = array("I")
+        docs.frombytes(self._mm[offset:offset + 4 * n])
+        tfs = array("H")
+        tfs.frombytes(self._mm[offset + 4 * n:offset + 6 * n])
+        return docs, tfs
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+        self._file.close()
+
+    @staticmethod
+    def write(directory: str, base: int, docs: list[dict]) -> str:
+        """Write buffered documents as a new segment and return its name."""
+        name = f"seg-{base:010d}-{uuid.uuid4().hex[:8]}"
+        inverted: dict[str, tuple[array, array]] = {}
+        sources, subreddits = [], []
+        meta = {
+            "base": base,
+            "keys": [],
+            "source_codes": array("B"),
+            "subreddit_codes": array("H"),
+            "days": array("I"),
+            "lengths": array("I"),
+        }
+        for i, d in enumerate(docs):
+            docnum = base + i
+            for term, tf in d["tf"].items():
+                postings = inverted.setdefault(term, (array("I"), array("H")))
+                postings[0].append(docnum)
+                postings[1].append(min(tf, 65535))
+            if d["source"] not in sources:
+                sources.append(d["source"])
+            if d["subreddit"] not in subreddits:
+                subreddits.append(d["subreddit"])
+            meta["keys"].append(d["key"])
+            meta["source_codes"].append(sources.index(d["source"]))
+            meta["subreddit_codes"].append(subreddits.index(d["subreddit"]))
+            meta["days"].append(d["day"])
+            meta["lengths"].append(d["length"])
+
+        terms = {}
+        with open(os.path.join(directory, f"{name}.post"), "wb") as f:
+            offset = 0
+            for term in sorted(inverted):
+                docnums, tfs = inverted[term]
+                f.write(docnums.tobytes())
+                f.write(tfs.tobytes())
+                terms[term] = (offset, len(docnums))
+                offset += 6 * len(docnums)
+        meta.update(terms=terms, sources=sources, subreddits=subreddits)
+        with open(os.path.join(directory, f"{name}.meta"), "wb") as f:
+            pickle.dump(meta, f, protocol=pickle.HIGHEST_PROTOCOL)
+        return name
+
+
+class SearchIndex(object):
+    """Incrementally updated BM25 index over stored posts and articles.
+
+    New documents are buffered in memory and searchable immediately in this
+    process; `flush()` writes them to disk as a new segment that other
+    processes pick up on their next query, and merges small segments of the
+    same size tier. Full compaction is left to the reindex job.
+
+    Writers serialize on an flock of `manifest.lock`, which only holds
+    between processes of one host: documents are added by the single ingest
+    consumer (backend.services.indexer), and readers on other hosts only
+    need the directory mounted.
+    """
+
+    def __init__(self, directory: str = None, flush_every: int = 5000, flush_seconds: float = 5.0):
+        self.directory = directory or os.getenv("SEARCH_INDEX_DIR", "search_index")
+        os.makedirs(self.directory, exist_ok=True)
+        self.flush_every = flush_every
+        self.flush_seconds = flush_seconds
+        self.segments: dict[str, Segment] = {}
+        self.manifest = {"segments": [], "next_docnum": 0, "doc_count": 0, "total_length": 0, "deleted": []}
+        self.manifest_mtime = None
+        self.deleted: set[int] = set()
+        self.docnums: dict[tuple[str, str], int] = {}
+        self.buffer: dict[tuple[str, str], dict] = {}
+        self.last_flush = time.monotonic()
+        self.refresh()
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.directory, "manifest.json")
+
+    def refresh(self):
+        """Load segments written by other processes since the last refresh."""
+        try:
+            mtime = os.stat(self.manifest_path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self.manifest_mtime:
+            return
+        with open(self.manifest_path) as f:
+            self.manifest = json.load(f)
+        self.manifest_mtime = mtime
+        self.deleted = set(self.manifest["deleted"])
+        for name in self.manifest["segments"]:
+            if name not in self.segments:
+                seg = Segment(self.directory, name)
+                self.segments[name] = seg
+                for i, key in enumerate(seg.keys):
+                    self.docnums[tuple(key)] = seg.base + i
+        for name in set(self.segments) - set(self.manifest["segments"]):
+            self.segments.pop(name).close()
+
+    def add(self, collection: str, doc: dict):
+        """Buffer a stored document for indexing."""
+        if collection not in SOURCES:
+            return
+        key = (collection, str(doc.get(KEY_FIELDS[collection])))
+        tokens = tokenize(" ".join(str(doc.get(f) or "") for f in INDEXED_FIELDS))
+        self.buffer[key] = {
+            "key": key,
+            "tf": Counter(tokens),
+            "source": source_of(collection, doc),
+            "subreddit": (doc.get("subreddit") or "").lower(),
+            "day": day_ordinal(doc.get(DATE_FIELDS[collection])),
+            "length": len(tokens),
+        }
+        if len(self.buffer) >= self.flush_every or time.monotonic() - self.last_flush >= self.flush_seconds:
+            self.flush()
+
+    def flush(self):
+        """Write buffered documents as a segment and publish it in the manifest."""
+        self.last_flush = time.monotonic()
+        if not self.buffer:
+            return
+        with open(os.path.join(self.directory, "manifest.lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            self.refresh()
+            docs = list(self.buffer.values())
+            base = self.manifest["next_docnum"]
+            name = Segment.write(self.directory, base, docs)
+            for i, d in enumerate(docs):
+                old = self.docnums.get(d["key"])
+                if old is not None:
+                    self.deleted.add(old)
+                self.docnums[d["key"]] = base + i
+            self.manifest["segments"].append(name)
+            self.manifest["next_docnum"] = base + len(docs)
+            self.manifest["doc_count"] = self.manifest.get("doc_count", base) + len(docs)
+            self.manifest["total_length"] += sum(d["length"] for d in docs)
+            self.manifest["deleted"] = sorted(self.deleted)
+            self.write_manifest()
+            self.buffer.clear()
+            candidates = self.merge_candidates()
+            if candidates:
+                self._merge(candidates)
+
+    def delete(self, keys: list[tuple[str, str]]) -> int:
+        """Remove (collection, key) documents from the index, return how many were indexed."""
+        for key in keys:
+            self.buffer.pop(key, None)
+        with open(os.path.join(self.directory, "manifest.lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            self.refresh()
+            removed = [self.docnums.pop(key) for key in keys if key in self.docnums]
+            if removed:
+                self.deleted.update(removed)
+                self.manifest["deleted"] = sorted(self.deleted)
+                self.write_manifest()
+        return len(removed)
+
+    def write_manifest(self):
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp, self.manifest_path)
+        self.manifest_mtime = os.stat(self.manifest_path).st_mtime_ns
+        self.segments.update({n: Segment(self.directory, n) for n in self.manifest["segments"] if n not in self.segments})
+
+    def merge_candidates(self) -> list[str]:
+        """The segments of the smallest size tier, once it holds MERGE_FACTOR of them.
+
+        Segments of n documents are in tier log(n, MERGE_FACTOR), so each
+        document is merged about once per tier and a flush never rewrites
+        more than a few small segments.
+        """
+        tiers: dict[int, list[str]] = {}
+        for name in self.manifest["segments"]:
+            tiers.setdefault(int(math.log(max(len(self.segments[name].keys), 1), MERGE_FACTOR)), []).append(name)
+        for tier in sorted(tiers):
+            if len(tiers[tier]) >= MERGE_FACTOR:
+                return tiers[tier][:MERGE_FACTOR]
+        return []
+
+    def compact(self):
+        """Merge all segments into one, dropping deleted documents."""
+        with open(os.path.join(self.directory, "manifest.lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            self.refresh()
+            kept = self._merge(list(self.manifest["segments"]))
+        print(f"🗜️ Compacted search index into {kept} documents")
+
+    def _merge(self, names: list[str]) -> int:
+        """Rewrite the live documents of `names` as one new segment; the manifest lock must be held.
+
+        The merged documents get new docnums after every existing one, so the
+        manifest stays ordered by base and the latest version of a key still
+        has the highest docnum. Returns the number of documents kept.
+        """
+        docs, dropped, dropped_length = [], 0, 0
+        merged_docnums = set()
+        for name in names:
+            seg = self.segments[name]
+            merged_docnums.update(range(seg.base, seg.base + len(seg.keys)))
+            per_doc: dict[int, Counter] = {}
+            for term in seg.terms:
+                docnums, tfs = seg.postings(term)
+                for docnum, tf in zip(docnums, tfs):
+                    if docnum not in self.deleted:
+                        per_doc.setdefault(docnum, Counter())[term] = tf
+            for i, key in enumerate(seg.keys):
+                docnum = seg.base + i
+                if docnum in self.deleted:
+                    dropped += 1
+                    dropped_length += seg.lengths[i]
+                    continue
+                docs.append({
+                    "key": tuple(key),
+                    "tf": per_doc.get(docnum, Counter()),
+                    "source": seg.sources[seg.source_codes[i]],
+                    "subreddit": seg.subreddits[seg.subreddit_codes[i]],
+                    "day": seg.days[i],
+                    "length": seg.lengths[i],
+                })
+        base = self.manifest["next_docnum"]
+        segments = [n for n in self.manifest["segments"] if n not in names]
+        if docs:
+            segments.append(Segment.write(self.directory, base, docs))
+        for i, d in enumerate(docs):
+            self.docnums[d["key"]] = base + i
+        self.deleted -= merged_docnums
+        self.manifest.update(
+            segments=segments,
+            next_docnum=base + len(docs),
+            doc_count=self.manifest.get("doc_count", base) - dropped,
+            total_length=self.manifest["total_length"] - dropped_length,
+            deleted=sorted(self.deleted),
+        )
+        self.write_manifest()
+        for old in names:
+            self.segments.pop(old).close()
+            for ext in ("post", "meta"):
+                os.remove(os.path.join(self.directory, f"{old}.{ext}"))
+        return len(docs)
+
+    def search(self, query: str, limit: int = 20, source: str = None, subreddit: str = None,
+               since: date = None, until: date = None) -> list[dict]:
+        """Return the top `limit` documents for `query` ranked by BM25."""
+        self.refresh()
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        # docnums maps every key to its latest version, so it counts live docs
+        n_docs = max(len(self.docnums) + len(self.buffer), 1)
+        doc_count = self.manifest.get("doc_count", self.manifest["next_docnum"])
+        avgdl = max(self.manifest["total_length"] / max(doc_count, 1), 1.0)
+        since_day = since.toordinal() if since else 0
+        until_day = until.toordinal() if until else 1 << 31
+        subreddit = subreddit.lower() if subreddit else None
+
+        postings_by_term = {t: [(seg, seg.postings(t)) for seg in self.segments.values()] for t in terms}
+        dfs = {t: sum(len(p[0]) for _, p in sp) for t, sp in postings_by_term.items()}
+        scores: dict[int, float] = {}
+        keys: dict[int, tuple] = {}
+        for term, seg_postings in postings_by_term.items():
+            df = dfs[term]
+            if df == 0:
+                continue
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            for seg, (docnums, tfs) in seg_postings:
+                source_code = seg.sources.index(source) if source in seg.sources else None
+                subreddit_code = seg.subreddits.index(subreddit) if subreddit in seg.subreddits else None
+                if (source and source_code is None) or (subreddit and subreddit_code is None):
+                    continue
+                for docnum, tf in zip(docnums, tfs):
+                    if docnum in self.deleted:
+                        continue
+                    i = docnum - seg.base
+                    if source and seg.source_codes[i] != source_code:
+                        continue
+                    if subreddit and seg.subreddit_codes[i] != subreddit_code:
+                        continue
+                    if not since_day <= seg.days[i] <= until_day:
+                        continue
+                    norm = tf + K1 * (1 - B + B * seg.lengths[i] / avgdl)
+                    scores[docnum] = scores.get(docnum, 0.0) + idf * tf * (K1 + 1) / norm
+                    keys[docnum] = seg.keys[i]
+
+        results = [
+            {"collection": keys[d][0], "key": keys[d][1], "score": s}
+            for d, s in heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        ]
+        return self._merge_buffer(results, dfs, limit, source, subreddit, since_day, until_day, n_docs, avgdl)
+
+    def _merge_buffer(self, results, dfs, limit, source, subreddit, since_day, until_day, n_docs, avgdl):
+        """Score documents not flushed yet so they are searchable right away."""
+        if not self.buffer:
+            return results
+        buffered = []
+        for d in self.buffer.values():
+            if (source and d["source"] != source) or (subreddit and d["subreddit"] != subreddit):
+                continue
+            if not since_day <= d["day"] <= until_day:
+                continue
+            score = 0.0
+            for t in dfs.keys() & d["tf"].keys():
+                tf = d["tf"][t]
+                df = dfs[t] + 1
+                idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                score += idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * d["length"] / avgdl))
+            if score:
+                buffered.append({"collection": d["key"][0], "key": d["key"][1], "score": score})
+        pending = {(r["collection"], r["key"]) for r in buffered}
+        results = [r for r in results if (r["collection"], r["key"]) not in pending] + buffered
+        return sorted(results, key=lambda r: r["score"], reverse=True)[:limit]
+
+    def close(self):
+        self.flush()
+        for seg in self.segments.values():
+            seg.close()
+        self.segments.clear()
+
+
+_ingest_index: SearchIndex | None = None
+
+
+def attach_search_index(directory: str = None) -> SearchIndex:
+    """Index every document run through the ingest hooks of this process from now on."""
+    global _ingest_index
+    if _ingest_index is None:
+        _ingest_index = SearchIndex(directory)
+        register_ingest_hook(_ingest_index.add)
+    return _ingest_index
+
+
+def run_search_reindex_job(directory: str = None, batch_size: int = 5000):
+    """Backfill the search index from the stored collections."""
+    print("🚀 Starting search reindex job...")
+    connect_db()
+    index = SearchIndex(directory, flush_every=batch_size)
+    try:
+        for collection, key in KEY_FIELDS.items():
+            batch = []
+            for doc in db[collection].find({}, {"_id": 0}).batch_size(batch_size):
+                batch.append(doc)
+                if len(batch) >= batch_size:
+                    _index_batch(index, collection, key, batch)
+                    batch = []
+            _index_batch(index, collection, key, batch)
+        index.flush()
+        index.compact()
+        print("✅ Search reindex complete!")
+    finally:
+        index.close()
+        close_db()
+        print("🛑 Database connection closed.")
+
+
+def _index_batch(index: SearchIndex, collection: str, key: str, docs: list[dict]):
+    if not docs:
+        return
+    if BODY_FIELDS.get(collection):
+        bodies = load_bodies(collection, [d[key] for d in docs])
+        for d in docs:
+            d.update(bodies.get(d[key], {}))
+    for d in docs:
+        index.add(collection, d)
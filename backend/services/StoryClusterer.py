@@ -0,0 +1,226 @@
+from datetime import datetime, timedelta
+import uuid
+import zlib
+
+from bson import Binary
+import numpy as np
+from pymongo import UpdateOne
+import scipy.sparse as sp
+
+from backend.db.mongo import (
+    BODY_FIELDS, bump_generation, changed_since, close_db, connect_db, db, get_cluster_watermark, load_bodies,
+    source_of, update_cluster_watermark,
+)
+from backend.services.SearchIndex import DATE_FIELDS, KEY_FIELDS, tokenize
+
+N_FEATURES = 2 ** 18
+CENTROID_TERMS = 300  # dimensions kept per story centroid
+TEXT_FIELDS = ("title", "description", "selftext", "content")
+
+
+def hash_terms(tokens: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """Map tokens to hashed feature ids (crc32 is stable across processes) and counts."""
+    ids = np.fromiter((zlib.crc32(t.encode()) % N_FEATURES for t in tokens), dtype=np.int64, count=len(tokens))
+    return np.unique(ids, return_counts=True)
+
+
+def normalize_rows(m: sp.csr_matrix) -> sp.csr_matrix:
+    norms = np.sqrt(np.asarray(m.multiply(m).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sp.csr_matrix(sp.diags(1.0 / norms) @ m)
+
+
+class StoryClusterer(object):
+    """Single-pass, incremental clustering of posts and articles into stories.
+
+    Each new document becomes a sublinear TF-IDF vector over hashed terms; it
+    joins the most similar active story when the cosine similarity clears
+    `threshold`, otherwise it opens a new story. Story centroids are running
+    means truncated to their strongest terms and live in the `stories`
+    collection, next to running document frequencies in `story_meta`.
+    """
+
+    def __init__(self, threshold: float = 0.35, active_days: int = 3, batch_size: int = 1000):
+        self.threshold = threshold
+        self.active_days = active_days
+        self.batch_size = batch_size
+        meta = db.story_meta.find_one({"_id": "idf"})
+        if meta:
+            self.n_docs = meta["n_docs"]
+            self.df = np.frombuffer(meta["df"], dtype=np.int32).copy()
+        else:
+            self.n_docs = 0
+            self.df = np.zeros(N_FEATURES, dtype=np.int32)
+
+    def vectorize(self, docs: list[dict]) -> sp.csr_matrix:
+        """TF-IDF matrix of a batch; document frequencies are updated first."""
+        rows, cols, tfs = [], [], []
+        for i, d in enumerate(docs):
+            ids, counts = hash_terms(tokenize(" ".join(str(d.get(f) or "") for f in TEXT_FIELDS)))
+            rows.append(np.full(len(ids), i))
+            cols.append(ids)
+            tfs.append(counts)
+            self.df[ids] += 1
+        self.n_docs += len(docs)
+
+        cols = np.concatenate(cols) if cols else np.array([], dtype=np.int64)
+        rows = np.concatenate(rows) if rows else np.array([], dtype=np.int64)
+        tfs = np.concatenate(tfs) if tfs else np.array([])
+        idf = np.log((1 + self.n_docs) / (1 + self.df[cols])) + 1
+        values = (1 + np.log(tfs)) * idf
+        m = sp.csr_matrix((values, (rows, cols)), shape=(len(docs), N_FEATURES))
+        return normalize_rows(m)
+
+    def load_active_stories(self, since: str) -> tuple[list[dict], sp.csr_matrix]:
+        stories = list(db.stories.find({"last_seen": {"$gte": since}}))
+        if not stories:
+            return [], sp.csr_matrix((0, N_FEATURES))
+        indptr, indices, data = [0], [], []
+        for s in stories:
+            idx = np.frombuffer(s["centroid_idx"], dtype=np.int32)
+            indices.append(idx)
+            data.append(np.frombuffer(s["centroid_val"], dtype=np.float32))
+            indptr.append(indptr[-1] + len(idx))
+        centroids = sp.csr_matrix(
+            (np.concatenate(data), np.concatenate(indices), np.array(indptr)),
+            shape=(len(stories), N_FEATURES),
+        )
+        return stories, normalize_rows(centroids)
+
+    def assign(self, vec: sp.csr_matrix, existing_sims: np.ndarray, new_rows: list[sp.csr_matrix]) -> tuple[int, float]:
+        """Index and similarity of the closest story, -1 when there is none."""
+        best, sim = -1, 0.0
+        if len(existing_sims):
+            best = int(existing_sims.argmax())
+            sim = float(existing_sims[best])
+        if new_rows:
+            new_sims = (sp.vstack(new_rows) @ vec.T).toarray().ravel()
+            j = int(new_sims.argmax())
+            if new_sims[j] > sim:
+                best, sim = len(existing_sims) + j, float(new_sims[j])
+        return best, sim
+
+    def cluster_batch(self, docs: list[tuple[str, dict]]) -> int:
+        """Assign (collection, doc) pairs to stories and persist the result."""
+        if not docs:
+            return 0
+        x = self.vectorize([d for _, d in docs])
+        since = (datetime.now() - timedelta(days=self.active_days)).isoformat()
+        stories, centroids = self.load_active_stories(since)
+        # Similarities to the active stories are taken against their centroids
+        # at the start of the batch; stories opened in the batch are compared live.
+        existing = len(stories)
+        sims = (x @ centroids.T).toarray() if existing else np.zeros((len(docs), 0))
+        counts = [s["doc_count"] for s in stories]
+        centroid_rows = [centroids[i] for i in range(existing)]
+        stats: dict[int, dict] = {}
+        doc_updates: dict[str, list[UpdateOne]] = {}
+
+        for i, (collection, doc) in enumerate(docs):
+            vec = x[i]
+            if vec.nnz == 0:
+                continue
+            best, sim = self.assign(vec, sims[i], centroid_rows[existing:])
+            if best < 0 or sim < self.threshold:
+                stories.append({"_id": uuid.uuid4().hex, "doc_count": 0, "headline": doc.get("title")})
+                counts.append(0)
+                centroid_rows.append(normalize_rows(self.truncate(vec)))
+                best = len(stories) - 1
+            else:
+                n = counts[best]
+                centroid_rows[best] = normalize_rows(self.truncate((centroid_rows[best] * n + vec) / (n + 1)))
+            counts[best] += 1
+
+            story_stats = stats.setdefault(best, {"docs": 0, "sources": {}, "score": 0, "comments": 0, "dates": []})
+            source = source_of(collection, doc)
+            story_stats["docs"] += 1
+            story_stats["sources"][source] = story_stats["sources"].get(source, 0) + 1
+            story_stats["score"] += doc.get("score") or 0
+            story_stats["comments"] += doc.get("num_comments") or 0
+            if doc.get(DATE_FIELDS[collection]):
+                story_stats["dates"].append(doc[DATE_FIELDS[collection]])
+
+            doc_updates.setdefault(collection, []).append(
+                UpdateOne({"_id": doc["_id"]}, {"$set": {"story_id": stories[best]["_id"]}})
+            )
+
+        now = datetime.now().isoformat()
+        story_ops = []
+        for i, st in stats.items():
+            centroid = centroid_rows[i]
+            update = {
+                "$set": {
+                    "centroid_idx": Binary(centroid.indices.astype(np.int32).tobytes()),
+                    "centroid_val": Binary(centroid.data.astype(np.float32).tobytes()),
+                    "updated_utc": now,
+                },
+                "$inc": {
+                    "doc_count": st["docs"],
+                    "score_total": st["score"],
+                    "comments_total": st["comments"],
+                    **{f"sources.{s}": n for s, n in st["sources"].items()},
+                },
+                "$max": {"last_seen": max(st["dates"], default=now)},
+                "$min": {"first_seen": min(st["dates"], default=now)},
+            }
+            if i >= existing:
+                update["$setOnInsert"] = {"headline": stories[i]["headline"]}
+            story_ops.append(UpdateOne({"_id": stories[i]["_id"]}, update, upsert=True))
+        if story_ops:
+            db.stories.bulk_write(story_ops, ordered=False)
+        for collection, ops in doc_updates.items():
+            db[collection].bulk_write(ops, ordered=False)
+        bump_generation("stories", *doc_updates)
+        db.story_meta.update_one(
+            {"_id": "idf"},
+            {"$set": {"n_docs": self.n_docs, "df": Binary(self.df.tobytes())}},
+            upsert=True,
+        )
+        new_stories = len(stories) - existing
+        print(f"🧩 Clustered {len(docs)} documents into {len(stats)} stories ({new_stories} new)")
+        return len(docs)
+
+    def truncate(self, v: sp.csr_matrix) -> sp.csr_matrix:
+        """Keep only the strongest CENTROID_TERMS dimensions of a centroid."""
+        v = sp.csr_matrix(v)
+        if v.nnz <= CENTROID_TERMS:
+            return v
+        keep = np.argpartition(v.data, -CENTROID_TERMS)[-CENTROID_TERMS:]
+        return sp.csr_matrix((v.data[keep], (np.zeros(len(keep), dtype=np.int64), v.indices[keep])), shape=v.shape)
+
+    def run(self) -> int:
+        """Cluster every document saved since the last run, one batch at a time."""
+        total = 0
+        for collection, key in KEY_FIELDS.items():
+            while True:
+                watermark = get_cluster_watermark(collection)
+                batch = list(
+                    db[collection].find(changed_since(watermark)).sort([("saved_utc", 1), ("_id", 1)]).limit(self.batch_size)
+                )
+                if not batch:
+                    break
+                # documents re-saved after an update already belong to a story
+                todo = [d for d in batch if not d.get("story_id")]
+                if todo and BODY_FIELDS.get(collection):
+                    bodies = load_bodies(collection, [d[key] for d in todo])
+                    for d in todo:
+                        d.update(bodies.get(d[key], {}))
+                total += self.cluster_batch([(collection, d) for d in todo])
+                update_cluster_watermark(collection, batch[-1]["saved_utc"], batch[-1]["_id"])
+        return total
+
+
+def run_story_clustering_job(threshold: float = 0.35, active_days: int = 3, batch_size: int = 1000):
+    """Wrapper to be used by Airflow DAG."""
+    print("🚀 Starting story clustering job...")
+    connect_db()
+    try:
+        clusterer = StoryClusterer(threshold=threshold, active_days=active_days, batch_size=batch_size)
+        total = clusterer.run()
+        print(f"✅ Story clustering complete — {total} documents assigned.")
+    except Exception as e:
+        print(f"❌ Story clustering failed: {e}")
+        raise
+    finally:
+        close_db()
+        print("🛑 Database connection closed.")
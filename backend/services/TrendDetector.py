@@ -0,0 +1,314 @@
+"""Streaming burst detection on keyword mention rates.
+
+Usage (replay): python -m backend.services.TrendDetector --since 2025-01-01 --z 3 4 5
+"""
+import argparse
+from array import array
+from datetime import datetime
+import heapq
+import math
+
+from pymongo import ASCENDING, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from backend.db.mongo import (
+    BODY_FIELDS, bump_generation, close_db, connect_db, db, load_bodies, register_ingest_hook, source_of,
+)
+from backend.services.RetentionManager import SCRATCH_TTL_DAYS, ensure_scratch_ttl
+from backend.services.SearchIndex import DATE_FIELDS, KEY_FIELDS, SOURCES
+from backend.services.keywords import match_keywords
+
+MAX_GAP_BUCKETS = 48  # longest run of empty buckets replayed into the baseline; longer gaps count as this long
+
+
+def to_timestamp(value) -> float | None:
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return value
+
+
+class TrendDetector(object):
+    """EWMA / z-score burst detector per keyword x channel.
+
+    A channel is the subreddit for Reddit posts and the source for articles.
+    Mentions are counted in fixed time buckets; each key keeps an exponentially
+    weighted mean and variance of its per-bucket count, and a burst fires as
+    soon as the running count of the current bucket is `z_threshold` standard
+    deviations above that baseline. State lives in fixed-capacity arrays
+    indexed by slot, so every mention is an O(1) update.
+
+    The last `open_buckets` buckets of a key stay open: mentions arriving out
+    of order within them still count, and a bucket joins the baseline once it
+    leaves that window. Older mentions are dropped as late.
+
+    Each key's state is a read-modify-write of `trend_state`, so one process
+    at a time owns it: the ingest consumer (backend.services.indexer), whose
+    lease fence is set as `fence` and stamped on every write. A detector
+    that lost the lease cannot overwrite what its successor stored.
+    """
+
+    def __init__(self, bucket_seconds: int = 3600, alpha: float = 0.1, z_threshold: float = 4.0,
+                 min_count: int = 3, warmup_buckets: int = 24, capacity: int = 8192,
+                 open_buckets: int = 4, trends_collection: str = "trends"):
+        self.bucket_seconds = bucket_seconds
+        self.alpha = alpha
+        self.z_threshold = z_threshold
+        self.min_count = min_count
+        self.warmup_buckets = warmup_buckets
+        self.capacity = capacity
+        self.open_buckets = open_buckets
+        self.trends_collection = trends_collection
+        self.fence: int | None = None
+        self.bursts: list[dict] = []
+        self.reset()
+
+    def reset(self):
+        """Forget every key, before (re)loading the stored state."""
+        capacity = self.capacity
+        self.slots: dict[tuple[str, str], int] = {}
+        self.keys: list[tuple[str, str]] = []
+        self.mean = array("d", bytes(8 * capacity))
+        self.var = array("d", bytes(8 * capacity))
+        # per slot, a ring of the open buckets' counts and the bucket each last alerted in
+        self.count = array("I", bytes(4 * capacity * self.open_buckets))
+        self.alerted = array("q", bytes(8 * capacity * self.open_buckets))
+        self.bucket = array("q", bytes(8 * capacity))  # newest open bucket
+        self.history = array("I", bytes(4 * capacity))  # closed buckets in the baseline
+        self.dirty: set[int] = set()
+
+    def slot(self, key: tuple[str, str]) -> int | None:
+        slot = self.slots.get(key)
+        if slot is None:
+            if len(self.keys) >= self.capacity:
+                return None
+            slot = len(self.keys)
+            self.slots[key] = slot
+            self.keys.append(key)
+            for i in range(slot * self.open_buckets, (slot + 1) * self.open_buckets):
+                self.alerted[i] = -1
+        return slot
+
+    def cell(self, slot: int, bucket: int) -> int:
+        """Position of an open bucket of a slot in the count and alerted rings."""
+        return slot * self.open_buckets + bucket % self.open_buckets
+
+    def roll(self, slot: int, bucket: int):
+        """Open `bucket`, folding the buckets that leave the open window into the baseline."""
+        newest = self.bucket[slot]
+        if newest == 0:
+            self.bucket[slot] = bucket
+            return
+        gap = bucket - newest
+        if gap <= 0:
+            return
+        closed = []
+        for b in range(newest - self.open_buckets + 1, newest - self.open_buckets + 1 + min(gap, self.open_buckets)):
+            cell = self.cell(slot, b)
+            closed.append(self.count[cell])
+            self.count[cell] = 0
+            self.alerted[cell] = -1
+        closed += [0] * (min(gap, MAX_GAP_BUCKETS) - len(closed))
+        for x in closed:
+            diff = x - self.mean[slot]
+            self.mean[slot] += self.alpha * diff
+            self.var[slot] = (1 - self.alpha) * (self.var[slot] + self.alpha * diff * diff)
+        self.history[slot] = min(self.history[slot] + len(closed), 2 ** 32 - 1)
+        self.bucket[slot] = bucket
+
+    def observe(self, keyword: str, channel: str, ts: float, source: str = None):
+        """Count one mention of `keyword` in `channel` at unix time `ts`."""
+        slot = self.slot((keyword, channel))
+        if slot is None:
+            return
+        bucket = int(ts // self.bucket_seconds)
+        if self.bucket[slot] and bucket <= self.bucket[slot] - self.open_buckets:
+            return  # late mention for a bucket already folded into the baseline
+        self.roll(slot, bucket)
+        cell = self.cell(slot, bucket)
+        self.count[cell] += 1
+        self.dirty.add(slot)
+
+        x = self.count[cell]
+        z = (x - self.mean[slot]) / math.sqrt(self.var[slot] + 1.0)
+        warm = self.history[slot] >= self.warmup_buckets
+        if warm and x >= self.min_count and z >= self.z_threshold and self.alerted[cell] != bucket:
+            self.alerted[cell] = bucket
+            self.bursts.append({
+                "keyword": keyword,
+                "channel": channel,
+                "source": source,
+                "bucket_start": datetime.fromtimestamp(bucket * self.bucket_seconds),
+                "count": x,
+                "baseline": self.mean[slot],
+                "z": z,
+                "detected_utc": datetime.now(),
+            })
+
+    def observe_doc(self, collection: str, doc: dict):
+        """Ingest hook: count the keyword mentions of a stored document."""
+        if collection not in SOURCES:
+            return
+        ts = to_timestamp(doc.get(DATE_FIELDS[collection]))
+        if ts is None:
+            return
+        keywords = doc.get("keywords")
+        if keywords is None:
+            text = " ".join(str(doc.get(f) or "") for f in ("title", "description", "selftext", "content"))
+            keywords = match_keywords(text)
+        source = source_of(collection, doc)
+        channel = doc.get("subreddit") or source
+        for kw in keywords:
+            self.observe(kw, channel, ts, source)
+
+    def load_state(self):
+        self.reset()
+        for record in db.trend_state.find():
+            slot = self.slot((record["keyword"], record["channel"]))
+            if slot is None:
+                break
+            self.mean[slot] = record["mean"]
+            self.var[slot] = record["var"]
+            self.bucket[slot] = newest = record["bucket"]
+            self.history[slot] = record.get("history", 0)
+            # states written before the open window hold the newest bucket only
+            counts = record["counts"] if "counts" in record else [record["count"]]
+            alerted = record["alerted"] if isinstance(record["alerted"], list) else [record["alerted"]]
+            for b, n, a in zip(range(newest - len(counts) + 1, newest + 1), counts, alerted):
+                if b > newest - self.open_buckets:
+                    self.count[self.cell(slot, b)] = n
+                    self.alerted[self.cell(slot, b)] = a
+
+    def flush(self):
+        """Persist touched keys and detected bursts."""
+        if self.dirty:
+            ops = []
+            for slot in self.dirty:
+                keyword, channel = self.keys[slot]
+                newest = self.bucket[slot]
+                window = [self.cell(slot, b) for b in range(newest - self.open_buckets + 1, newest + 1)]
+                query = {"_id": f"{keyword}|{channel}"}
+                state = {
+                    "keyword": keyword, "channel": channel,
+                    "mean": self.mean[slot], "var": self.var[slot],
+                    "counts": [self.count[i] for i in window], "bucket": newest,
+                    "alerted": [self.alerted[i] for i in window], "history": self.history[slot],
+                }
+                if self.fence is not None:
+                    # a newer owner's write makes this upsert collide on _id instead of matching
+                    query["$or"] = [{"fence": {"$lte": self.fence}}, {"fence": {"$exists": False}}]
+                    state["fence"] = self.fence
+                ops.append(UpdateOne(query, {"$set": state}, upsert=True))
+            try:
+                db.trend_state.bulk_write(ops, ordered=False)
+            except BulkWriteError as e:
+                print(f"⛔ Rejected {len(e.details['writeErrors'])} stale trend state writes (fence {self.fence})")
+            self.dirty.clear()
+        self.write_bursts()
+
+    def write_bursts(self):
+        if not self.bursts:
+            return
+        ops = [
+            UpdateOne(
+                {"keyword": b["keyword"], "channel": b["channel"], "bucket_start": b["bucket_start"]},
+                {"$set": b},
+                upsert=True,
+            )
+            for b in self.bursts
+        ]
+        db[self.trends_collection].bulk_write(ops, ordered=False)
+        bump_generation(self.trends_collection)
+        print(f"📈 Recorded {len(self.bursts)} bursts in {self.trends_collection}")
+        self.bursts.clear()
+
+
+_ingest_detector: TrendDetector | None = None
+
+
+def attach_trend_detector() -> TrendDetector:
+    """Feed every document run through the ingest hooks of this process to the trend detector."""
+    global _ingest_detector
+    if _ingest_detector is None:
+        db.trends.create_index(
+            [("keyword", ASCENDING), ("channel", ASCENDING), ("bucket_start", ASCENDING)], unique=True)
+        if "trends" in SCRATCH_TTL_DAYS:
+            ensure_scratch_ttl("trends")  # the TTL index also serves bucket_start range queries
+        else:
+            db.trends.create_index([("bucket_start", ASCENDING)])
+        _ingest_detector = TrendDetector()
+        _ingest_detector.load_state()
+        register_ingest_hook(_ingest_detector.observe_doc)
+    return _ingest_detector
+
+
+def history(since: str = None, until: str = None):
+    """Stream stored documents of every collection in publication order."""
+    def stream(collection: str):
+        date_field = DATE_FIELDS[collection]
+        query = {date_field: {k: v for k, v in (("$gte", since), ("$lt", until)) if v}} if since or until else {}
+        key = KEY_FIELDS[collection]
+        batch = []
+        cursor = db[collection].find(query).sort(date_field, ASCENDING).batch_size(2000)
+        for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= 2000:
+                yield from with_text(collection, key, batch)
+                batch = []
+        yield from with_text(collection, key, batch)
+
+    def with_text(collection, key, docs):
+        # keyword matches are stored on newer posts; older documents need their text
+        need_text = [d for d in docs if d.get("keywords") is None]
+        if need_text and BODY_FIELDS.get(collection):
+            bodies = load_bodies(collection, [d[key] for d in need_text])
+            for d in need_text:
+                d.update(bodies.get(d[key], {}))
+        for d in docs:
+            yield str(d.get(DATE_FIELDS[collection]) or ""), collection, d
+
+    return heapq.merge(*(stream(c) for c in SOURCES), key=lambda item: item[0])
+
+
+def replay(z_thresholds: list[float], since: str = None, until: str = None, write: bool = False, **params) -> dict:
+    """Run fresh detectors over historical data, one per threshold, in a single pass."""
+    detectors = {z: TrendDetector(z_threshold=z, trends_collection=f"trends_replay_z{z:g}", **params)
+                 for z in z_thresholds}
+    bursts = {z: 0 for z in z_thresholds}
+    for _, collection, doc in history(since, until):
+        for z, detector in detectors.items():
+            detector.observe_doc(collection, doc)
+            if detector.bursts:
+                bursts[z] += len(detector.bursts)
+                if write:
+                    detector.write_bursts()
+                else:
+                    detector.bursts.clear()
+    for z, n in bursts.items():
+        print(f"🔁 z>={z:g}: {n} bursts")
+    return bursts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay the trend detector over stored documents.")
+    parser.add_argument("--since", default=None, help="ISO date, inclusive")
+    parser.add_argument("--until", default=None, help="ISO date, exclusive")
+    parser.add_argument("--z", type=float, nargs="+", default=[3.0, 4.0, 5.0])
+    parser.add_argument("--alpha", type=float, default=0.1)
+    parser.add_argument("--bucket-seconds", type=int, default=3600)
+    parser.add_argument("--min-count", type=int, default=3)
+    parser.add_argument("--warmup-buckets", type=int, default=24)
+    parser.add_argument("--open-buckets", type=int, default=4)
+    parser.add_argument("--write", action="store_true", help="store bursts in trends_replay_z<z>")
+    args = parser.parse_args()
+    connect_db()
+    try:
+        replay(args.z, args.since, args.until, write=args.write, alpha=args.alpha,
+               bucket_seconds=args.bucket_seconds, min_count=args.min_count,
+               warmup_buckets=args.warmup_buckets, open_buckets=args.open_buckets)
+    finally:
+        close_db()
@@ -0,0 +1,184 @@
+"""Single consumer running the search index and trend detector over newly stored documents.
+
+Usage: python -m backend.services.indexer --interval-seconds 30
+"""
+import argparse
+from datetime import datetime, timedelta
+import os
+import signal
+import socket
+import threading
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from backend.db.mongo import (
+    BODY_FIELDS, COLLECTIONS, changed_since, close_db, connect_db, db, get_ingest_watermark, run_ingest_hooks,
+    update_ingest_watermark, with_bodies,
+)
+from backend.services.SearchIndex import DATE_FIELDS, attach_search_index
+from backend.services.TrendDetector import attach_trend_detector
+
+LEASE = "ingest"
+
+
+class IngestConsumer(object):
+    """Runs the ingest hooks over the documents stored since its watermark.
+
+    The search index directory and the trend state each take a single
+    writer, so scrapers only store documents and this consumer follows every
+    collection in (saved_utc, _id) order from its watermark in scrape_meta,
+    starting from the first stored document. Replicas stamp saved_utc just
+    before they write, so a batch can land after a later-stamped one: only
+    documents saved more than `safety_lag_seconds` ago are read, and the
+    watermark never passes a write still in flight.
+    It holds the `ingest` lease in scrape_leases, so a second replica or a
+    DAG run waits for it, and the lease fence guards its watermark and trend
+    state writes: a consumer that lost the lease cannot overwrite its
+    successor's.
+    """
+
+    def __init__(self, worker_id: str = None, lease_seconds: int = 90, batch_size: int = 1000,
+                 safety_lag_seconds: int = 60):
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self.batch_size = batch_size
+        self.safety_lag_seconds = safety_lag_seconds
+        self.fence: int | None = None
+        self.search_index = attach_search_index()
+        self.trend_detector = attach_trend_detector()
+        self.stopping = threading.Event()
+
+    def expiry(self) -> datetime:
+        return datetime.utcnow() + timedelta(seconds=self.lease_seconds)
+
+    def acquire(self) -> bool:
+        """Take the ingest lease if it is free, and resume from the stored trend state."""
+        now = datetime.utcnow()
+        try:
+            doc = db.scrape_leases.find_one_and_update(
+                {"_id": LEASE, "$or": [{"owner": None}, {"expires_at": {"$lt": now}}]},
+                {
+                    "$set": {"owner": self.worker_id, "acquired_utc": now, "expires_at": self.expiry()},
+                    "$inc": {"fence": 1},
+                },
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        except DuplicateKeyError:
+            return False  # held by a live consumer
+        self.fence = doc["fence"]
+        self.trend_detector.load_state()
+        self.trend_detector.fence = self.fence
+        print(f"🔑 Acquired the {LEASE} lease (fence {self.fence})")
+        return True
+
+    def renew(self) -> bool:
+        if self.fence is None:
+            return False
+        res = db.scrape_leases.update_one(
+            {"_id": LEASE, "owner": self.worker_id, "fence": self.fence},
+            {"$set": {"expires_at": self.expiry()}},
+        )
+        if res.matched_count == 0:
+            print(f"⚠️ Lost the {LEASE} lease")
+            self.fence = None
+        return self.fence is not None
+
+    def release(self):
+        if self.fence is None:
+            return
+        db.scrape_leases.update_one(
+            {"_id": LEASE, "owner": self.worker_id, "fence": self.fence},
+            {"$set": {"owner": None, "expires_at": datetime.utcnow()}},
+        )
+        self.fence = None
+        print(f"🔓 Released the {LEASE} lease")
+
+    def catch_up(self) -> int:
+        """Run the hooks over every document stored since the watermarks, return how many."""
+        total = 0
+        cutoff = datetime.utcnow() - timedelta(seconds=self.safety_lag_seconds)
+        settled = {"saved_utc": {"$lt": cutoff.isoformat()}}
+        for collection, spec in COLLECTIONS.items():
+            watermark = get_ingest_watermark(collection)
+            while self.renew():
+                docs = list(
+                    db[collection].find({"$and": [changed_since(watermark), settled]})
+                    .sort([("saved_utc", 1), ("_id", 1)]).limit(self.batch_size)
+                )
+                if not docs:
+                    break
+                if BODY_FIELDS.get(collection):
+                    with_bodies(collection, docs, spec["key"])
+                # scrapers store the newest documents first; the trend detector counts in time order
+                for doc in sorted(docs, key=lambda d: str(d.get(DATE_FIELDS[collection]) or "")):
+                    run_ingest_hooks(collection, doc)
+                # flushed before the watermark moves: a crash replays the batch instead of losing it
+                self.search_index.flush()
+                self.trend_detector.flush()
+                last = docs[-1]
+                if not update_ingest_watermark(collection, last["saved_utc"], last["_id"], self.fence):
+                    self.fence = None
+                    break
+                watermark = {"saved_utc": last["saved_utc"], "_id": last["_id"]}
+                total += len(docs)
+        if total:
+            print(f"🗂️ Ran the ingest hooks over {total} documents")
+        return total
+
+    def stop(self, *_):
+        print(f"🛑 Ingest consumer {self.worker_id} stopping...")
+        self.stopping.set()
+
+    def run(self, interval_seconds: int = 30):
+        """Catch up every interval while holding the lease, wait for it otherwise."""
+        try:
+            while not self.stopping.is_set():
+                if self.renew() or self.acquire():
+                    self.catch_up()
+                self.stopping.wait(interval_seconds)
+        finally:
+            self.release()
+            self.search_index.close()
+
+
+def run_ingest_job(batch_size: int = 1000, safety_lag_seconds: int = 60):
+    """Wrapper to be used by Airflow DAG."""
+    print("🚀 Starting ingest job...")
+    connect_db()
+    consumer = IngestConsumer(batch_size=batch_size, safety_lag_seconds=safety_lag_seconds)
+    try:
+        if consumer.acquire():
+            consumer.catch_up()
+            print("✅ Ingest complete!")
+        else:
+            print("⏭️ Another ingest consumer holds the lease, skipping")
+    except Exception as e:
+        print(f"❌ Ingest failed: {e}")
+        raise
+    finally:
+        consumer.release()
+        consumer.search_index.close()
+        close_db()
+        print("🛑 Database connection closed.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the single ingest consumer (search index, trends).")
+    parser.add_argument("--worker-id", default=None)
+    parser.add_argument("--lease-seconds", type=int, default=90)
+    parser.add_argument("--interval-seconds", type=int, default=30)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--safety-lag-seconds", type=int, default=60,
+                        help="only read documents saved at least this long ago")
+    args = parser.parse_args()
+    connect_db()
+    consumer = IngestConsumer(worker_id=args.worker_id, lease_seconds=args.lease_seconds,
+                              batch_size=args.batch_size, safety_lag_seconds=args.safety_lag_seconds)
+    signal.signal(signal.SIGTERM, consumer.stop)
+    signal.signal(signal.SIGINT, consumer.stop)
+    try:
+        consumer.run(args.interval_seconds)
+    finally:
+        close_db()
@@ -0,0 +1,29 @@
+import re
+
+from backend.config import settings
+
+
+def compile_keywords(keywords: list[str]) -> list[tuple[str, re.Pattern]]:
+    """Compile keywords to word-boundary patterns, handling short keywords correctly."""
+    patterns = []
+    for kw in keywords:
+        kw = kw.lower().strip()
+        if not kw or any(kw == seen for seen, _ in patterns):
+            continue
+        if len(kw) <= 2:  # short keywords: ai, ml
+            pattern = rf"\b{re.escape(kw)}\b|\b{re.escape(kw)}-(?=\w)"
+        else:  # longer keywords/phrases
+            pattern = rf"\b{re.escape(kw)}\b"
+        patterns.append((kw, re.compile(pattern)))
+    return patterns
+
+
+KEYWORD_PATTERNS = compile_keywords(settings.KEYWORDS.split("+"))
+
+
+def match_keywords(text: str, patterns: list[tuple[str, re.Pattern]] = None) -> list[str]:
+    """Return every keyword found in text."""
+    if not text:
+        return []
+    text = text.lower()
+    return [kw for kw, pattern in (patterns or KEYWORD_PATTERNS) if pattern.search(text)]
@@ -0,0 +1,198 @@
+"""Rebuild the stored collections from the raw archive, without any API call.
+
+Usage: python -m backend.services.reprocess --sources reddit newsapi --since 2025-01-01 --workers 8
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, timedelta
+from multiprocessing import get_context
+import os
+import uuid
+
+from backend.db.mongo import (
+    BODY_FIELDS, COLLECTIONS, body_id, bump_generation, close_db, connect_db, db, link_reddit_articles, save_many,
+)
+from backend.services.RawArchive import list_segments, read_segment
+from backend.services.SearchIndex import SearchIndex
+from backend.services.source import Source, get_source
+
+_sources: dict[str, Source] = {}
+
+
+def offline_source(name: str) -> Source:
+    if name not in _sources:
+        source = get_source(name)
+        source.offline = True
+        _sources[name] = source
+    return _sources[name]
+
+
+def reprocess_segment(path: str, rebuild_id: str = None) -> tuple[str, int, int]:
+    """Run the records of one segment through the current to_doc -> save_many path.
+
+    Returns (path, records read, documents saved).
+    """
+    read = saved = 0
+    batches: dict[str, list[dict]] = {}
+    for record in read_segment(path):
+        read += 1
+        source = offline_source(record["source"])
+        doc = source.to_doc(record["raw"])
+        if doc is None:
+            continue
+        batch = batches.setdefault(source.collection, [])
+        batch.append(doc)
+        if len(batch) >= 1000:
+            saved += save_many(source.collection, batch, rebuild_id)
+            batch.clear()
+    for collection, batch in batches.items():
+        if batch:
+            saved += save_many(collection, batch, rebuild_id)
+    return path, read, saved
+
+
+def segment_day(path: str) -> str:
+    return path.split("date=")[1].split(os.sep)[0]
+
+
+def segment_source(path: str) -> str:
+    return path.split("source=")[1].split(os.sep)[0]
+
+
+def replayed_window(segments: list[str], name: str) -> tuple[str, str] | None:
+    """[first, last + 1 day) fetch days of the replayed segments of a source, None when it has none.
+
+    Only documents saved inside that window can be judged by the replay:
+    older ones were fetched before the selected segments, or before the raw
+    archive existed.
+    """
+    days = sorted(segment_day(s) for s in segments if segment_source(s) == name)
+    if not days:
+        return None
+    return days[0], (date.fromisoformat(days[-1]) + timedelta(days=1)).isoformat()
+
+
+def sweep(name: str, window: tuple[str, str], rebuild_id: str, search_index: SearchIndex = None) -> int:
+    """Drop a source from the documents saved inside `window` that its replay did not write again.
+
+    In the shared articles collection the source is pulled from `sources`,
+    and only articles no other source found are deleted. Deleted documents
+    take their bodies, Reddit links, story counts and search index entries
+    with them. Returns how many were deleted.
+    """
+    collection = get_source(name).collection
+    spec = COLLECTIONS[collection]
+    key = spec["key"]
+    shared = spec["source"] is None
+    query = {"saved_utc": {"$gte": window[0], "$lt": window[1]}, "rebuild_id": {"$ne": rebuild_id}}
+    if shared:
+        query["sources"] = name
+    docs = list(db[collection].find(query, {key: 1, "canonical_url": 1, "story_id": 1}))
+    deleted = 0
+    for start in range(0, len(docs), 1000):
+        batch = docs[start:start + 1000]
+        ids = [d["_id"] for d in batch]
+        if shared:
+            db[collection].update_many({"_id": {"$in": ids}}, {"$pull": {"sources": name}})
+            # an article kept by another source is now attributed to the next one that found it
+            db[collection].update_many(
+                {"_id": {"$in": ids}, "source": name, "sources.0": {"$exists": True}},
+                [{"$set": {"source": {"$arrayElemAt": ["$sources", 0]}}}],
+            )
+            gone_ids = {d["_id"] for d in db[collection].find({"_id": {"$in": ids}, "sources": {"$size": 0}}, {"_id": 1})}
+        else:
+            gone_ids = set(ids)
+        gone = [d for d in batch if d["_id"] in gone_ids]
+        keys = [d[key] for d in gone if d.get(key)]
+        db[collection].delete_many({"_id": {"$in": list(gone_ids)}})
+        if BODY_FIELDS.get(collection):
+            db.bodies.delete_many({"_id": {"$in": [body_id(collection, k) for k in keys]}})
+
+        if collection == "reddit_posts":
+            db.reddit_article_links.delete_many({"_id": {"$in": keys}})
+        else:
+            urls = list({d["canonical_url"] for d in batch if d.get("canonical_url")})
+            db.reddit_article_links.update_many({"canonical_url": {"$in": urls}}, {"$pull": {"articles": name}})
+            # the articles still stored at these URLs put their sources back
+            remaining = list(db[collection].find({"canonical_url": {"$in": urls}}, {"canonical_url": 1, "sources": 1}))
+            for d in remaining:
+                link_reddit_articles(collection, [{**d, "source": s} for s in d.get("sources") or []])
+
+        stories: dict[str, tuple[int, int]] = {}
+        for d in batch:
+            if d.get("story_id"):
+                docs_n, source_n = stories.get(d["story_id"], (0, 0))
+                stories[d["story_id"]] = (docs_n + (d["_id"] in gone_ids), source_n + 1)
+        for story_id, (docs_n, source_n) in stories.items():
+            db.stories.update_one({"_id": story_id}, {"$inc": {"doc_count": -docs_n, f"sources.{name}": -source_n}})
+        if search_index is not None:
+            search_index.delete([(collection, str(k)) for k in keys])
+        deleted += len(gone)
+    if docs:
+        bump_generation(collection, "stories")
+    print(f"🧹 Dropped {name} from {len(docs)} documents saved {window[0]}..{window[1]}, {deleted} deleted")
+    return deleted
+
+
+def init_worker():
+    connect_db()
+
+
+def reprocess(sources: list[str] = None, since: str = None, until: str = None, workers: int = 4,
+              rebuild: bool = False) -> tuple[int, int]:
+    """Reprocess archived payloads in parallel across segments, return (records, saved).
+
+    With `rebuild`, documents the replay writes again keep their identity and
+    saved_utc (their story, links and exported rows stay valid), and documents
+    of the replayed sources saved inside the replayed fetch days that the
+    current filters and models no longer produce are then deleted, with the
+    state derived from them. Documents saved outside those days are not
+    touched. Run the search reindex afterwards for the new content, and a
+    full Parquet export (incremental=False) to a fresh directory if the
+    exported rows must reflect it too.
+    """
+    segments = list_segments(sources=sources, since=since, until=until)
+    if not segments:
+        print("⚠️ No archived segments matched")
+        return 0, 0
+    rebuild_id = uuid.uuid4().hex if rebuild else None
+
+    print(f"🔁 Reprocessing {len(segments)} segments with {workers} workers...")
+    total_read = total_saved = 0
+    # spawn: each worker opens its own MongoClient instead of inheriting the parent's
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"), initializer=init_worker) as pool:
+        futures = [pool.submit(reprocess_segment, path, rebuild_id) for path in segments]
+        for future in as_completed(futures):
+            path, read, saved = future.result()
+            total_read += read
+            total_saved += saved
+            print(f"📦 {path}: {read} records, {saved} saved")
+    print(f"✅ Reprocessed {total_read} records, {total_saved} documents saved")
+
+    if rebuild:
+        search_index = SearchIndex()
+        try:
+            for name in sources or sorted({segment_source(s) for s in segments}):
+                window = replayed_window(segments, name)
+                if window:
+                    sweep(name, window, rebuild_id, search_index)
+        finally:
+            search_index.close()
+        print("ℹ️ Run the search reindex job to index the rebuilt documents.")
+    return total_read, total_saved
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild collections from the raw archive.")
+    parser.add_argument("--sources", nargs="+", default=None, help="default: every archived source")
+    parser.add_argument("--since", default=None, help="fetch day YYYY-MM-DD, inclusive")
+    parser.add_argument("--until", default=None, help="fetch day YYYY-MM-DD, exclusive")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rebuild", action="store_true",
+                        help="then delete the documents of the replayed days that the replay no longer produces")
+    args = parser.parse_args()
+    connect_db()
+    try:
+        reprocess(args.sources, args.since, args.until, workers=args.workers, rebuild=args.rebuild)
+    finally:
+        close_db()
@@ -0,0 +1,81 @@
+"""Benchmark SearchIndex build and query latency on a synthetic corpus.
+
+Usage: python -m backend.services.search_benchmark --docs 1000000
+"""
+import argparse
+import itertools
+from datetime import date, timedelta
+import random
+import statistics
+import tempfile
+import time
+
+from backend.services.SearchIndex import SearchIndex
+
+QUERIES = [
+    "openai", "chatgpt release", "machine learning research", "ai regulation europe",
+    "gpu shortage", "open source model weights", "deepmind", "llm agent benchmark",
+]
+
+
+def zipf_vocabulary(rng: random.Random, size: int) -> tuple[list[str], list[float]]:
+    """Synthetic vocabulary with query terms mixed in and cumulative Zipf weights."""
+    words = [f"w{i}" for i in range(size)]
+    for q in QUERIES:
+        for term in q.split():
+            words.insert(rng.randrange(200, 5000), term)
+    return words, list(itertools.accumulate(1 / (rank + 1) for rank in range(len(words))))
+
+
+def main(docs: int, seed: int, directory: str = None):
+    rng = random.Random(seed)
+    words, cum_weights = zipf_vocabulary(rng, 50_000)
+    subs = ["technology", "MachineLearning", "artificial", "worldnews", "Futurology"]
+    start_day = date(2024, 1, 1)
+
+    directory = directory or tempfile.mkdtemp(prefix="search_bench_")
+    index = SearchIndex(directory, flush_every=100_000, flush_seconds=float("inf"))
+    started = time.perf_counter()
+    for i in range(docs):
+        collection = "reddit_posts" if i % 2 else "articles"
+        index.add(collection, {
+            "id": str(i),
+            "source": "gnews",
+            "url": f"https://example.com/{i}",
+            "title": " ".join(rng.choices(words, cum_weights=cum_weights, k=10)),
+            "description": " ".join(rng.choices(words, cum_weights=cum_weights, k=25)),
+            "selftext": " ".join(rng.choices(words, cum_weights=cum_weights, k=rng.randint(0, 120))),
+            "subreddit": rng.choice(subs) if collection == "reddit_posts" else None,
+            "created_utc": (start_day + timedelta(days=i % 365)).isoformat(),
+            "publishedAt": (start_day + timedelta(days=i % 365)).isoformat(),
+        })
+    index.flush()
+    index.compact()
+    print(f"🏗️ Indexed {docs} documents in {time.perf_counter() - started:.1f}s ({directory})")
+
+    filters = [
+        {},
+        {"source": "reddit"},
+        {"subreddit": "MachineLearning"},
+        {"since": start_day + timedelta(days=300)},
+    ]
+    for f in filters:
+        latencies = []
+        for _ in range(5):
+            for q in QUERIES:
+                t0 = time.perf_counter()
+                index.search(q, limit=20, **f)
+                latencies.append((time.perf_counter() - t0) * 1000)
+        latencies.sort()
+        p95 = latencies[int(len(latencies) * 0.95) - 1]
+        print(f"⏱️ filters={f or 'none'}: p50={statistics.median(latencies):.1f}ms p95={p95:.1f}ms")
+    index.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--dir", default=None)
+    args = parser.parse_args()
+    main(args.docs, args.seed, args.dir)
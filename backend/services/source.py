@@ -0,0 +1,206 @@
+from datetime import datetime
+from importlib import import_module
+from typing import Any, Iterator
+
+from backend.db.mongo import close_db, connect_db, save_many
+from backend.services.RawArchive import archive_raw, attach_raw_archive
+
+# name -> Source subclass, filled by @register_source
+SOURCES: dict[str, type["Source"]] = {}
+
+SOURCE_MODULES = [
+    "backend.services.RedditScraper",
+    "backend.services.NewsApiScraper",
+    "backend.services.GnewsScraper",
+    "backend.services.RssScraper",
+]
+
+
+class Source(object):
+    """Common interface of a scraped source.
+
+    A source splits its work into partitions (a subreddit, a GNews topic, a
+    feed URL...). For each partition it yields raw API payloads from `fetch`,
+    turns the relevant ones into model documents with `to_doc`, and keeps a
+    watermark so incremental runs skip what was already stored.
+    """
+
+    name: str = None
+    collection: str = None
+    flush_size: int = 100
+    offline: bool = False  # set when reprocessing archived payloads: to_doc must not call any API
+
+    def partitions(self) -> list[str]:
+        raise NotImplementedError
+
+    def fetch(self, partition: str, watermark: Any, limit: int, **options) -> Iterator[dict]:
+        """Yield the raw payloads of a partition, newest API data first."""
+        raise NotImplementedError
+
+    def to_doc(self, raw: dict) -> dict | None:
+        """Convert a raw payload to a document, or None to drop it."""
+        raise NotImplementedError
+
+    def watermark_of(self, raw: dict) -> Any:
+        """Watermark value of a raw payload (a timestamp, comparable with <=)."""
+        raise NotImplementedError
+
+    def get_watermark(self, partition: str) -> Any:
+        raise NotImplementedError
+
+    def commit_watermark(self, partition: str, watermark: Any, fence: int = None) -> bool:
+        """Persist a watermark; with a lease fence, stale writers are rejected."""
+        raise NotImplementedError
+
+    def watermark_key(self, partition: str) -> str:
+        """Partitions with the same key share one watermark."""
+        return partition
+
+    def store(self, docs: list[dict]) -> int:
+        """Save a batch, stamping saved_utc at write time rather than when each document was built.
+
+        Consumers following saved_utc (backend.services.indexer) then only
+        have to wait out the write itself before a document is safe to read.
+        """
+        now = datetime.utcnow()
+        for doc in docs:
+            doc["saved_utc"] = now
+        return save_many(self.collection, docs)
+
+    def scrape_partition(self, partition: str, limit: int = 100, incremental: bool = True,
+                         commit: bool = True, **options) -> tuple[int, Any]:
+        """Scrape one partition, returning (saved count, newest watermark seen)."""
+        watermark = self.get_watermark(partition) if incremental else None
+        newest = watermark
+        saved, batch = 0, []
+        for raw in self.fetch(partition, watermark, limit, **options):
+            value = self.watermark_of(raw)
+            if incremental and watermark is not None and value is not None and value <= watermark:
+                continue
+            archive_raw(self.name, partition, raw)
+            doc = self.to_doc(raw)
+            if doc is None:
+                continue
+            batch.append(doc)
+            if value is not None and (newest is None or value > newest):
+                newest = value
+            if len(batch) >= self.flush_size:
+                saved += self.store(batch)
+                batch = []
+        if batch:
+            saved += self.store(batch)
+
+        if commit and incremental:
+            self.commit_watermark(partition, newest)
+        print(f"📊 Finished {self.name}/{partition}: {saved} documents saved.")
+        return saved, newest
+
+    def scrape(self, partitions: list[str] = None, limit: int = 100, incremental: bool = True, **options) -> int:
+        """Scrape every partition; a failing partition does not stop the others."""
+        total, failed = 0, []
+        for partition in partitions or self.partitions():
+            try:
+                saved, _ = self.scrape_partition(partition, limit=limit, incremental=incremental, **options)
+                total += saved
+            except Exception as e:
+                print(f"❌ {self.name}/{partition} failed: {e}")
+                failed.append(partition)
+        print(f"🏁 Finished {self.name}: {total} documents saved.")
+        if failed:
+            raise RuntimeError(f"{self.name} partitions failed: {', '.join(failed)}")
+        return total
+
+
+def register_source(cls: type[Source]) -> type[Source]:
+    """Class decorator adding a source to the registry."""
+    SOURCES[cls.name] = cls
+    return cls
+
+
+def load_sources() -> dict[str, type[Source]]:
+    for module in SOURCE_MODULES:
+        import_module(module)
+    return SOURCES
+
+
+def get_source(name: str) -> Source:
+    load_sources()
+    if name not in SOURCES:
+        raise ValueError(f"Unknown source: {name}")
+    return SOURCES[name]()
+
+
+def run_source_job(name: str, partitions: list[str] = None, limit: int = 100, incremental: bool = True, **options):
+    """Wrapper to be used by Airflow DAG for any registered source."""
+    print(f"🚀 Starting {name} source job...")
+    connect_db()
+    raw_archive = attach_raw_archive()
+    try:
+        source = get_source(name)
+        source.scrape(partitions=partitions, limit=limit, incremental=incremental, **options)
+        print(f"✅ {name} scraping complete!")
+    except Exception as e:
+        print(f"❌ {name} source failed: {e}")
+        raise
+    finally:
+        raw_archive.close()
+        close_db()
+        print("🛑 Database connection closed.")
+
+
+def plan_source_shards(name: str, batch_size: int = 1, **options) -> list[dict]:
+    """Split the partitions of a source into shard kwargs for run_source_shard."""
+    partitions = get_source(name).partitions()
+    return [
+        {"name": name, "partitions": partitions[i:i + batch_size], **options}
+        for i in range(0, len(partitions), batch_size)
+    ]
+
+
+def run_source_shard(name: str, partitions: list[str], limit: int = 100, incremental: bool = True, **options) -> dict:
+    """Scrape a few partitions without committing their watermarks.
+
+    The newest watermark of each partition is returned so that
+    merge_source_watermarks can commit them once every shard is done.
+    """
+    print(f"🚀 Starting {name} shard {partitions}...")
+    connect_db()
+    raw_archive = attach_raw_archive()
+    try:
+        source = get_source(name)
+        watermarks = {}
+        for partition in partitions:
+            _, newest = source.scrape_partition(
+                partition, limit=limit, incremental=incremental, commit=False, **options)
+            watermarks[partition] = newest
+        return {"name": name, "watermarks": watermarks}
+    finally:
+        raw_archive.close()
+        close_db()
+        print("🛑 Database connection closed.")
+
+
+def merge_source_watermarks(*shard_results):
+    """Commit the newest watermark per source and watermark key across shards."""
+    merged: dict[tuple[str, str], tuple[str, Any]] = {}
+    sources: dict[str, Source] = {}
+    for results in shard_results:
+        for result in results or []:
+            if not result:
+                continue  # failed shard, its partitions keep their old watermark
+            name = result["name"]
+            source = sources.setdefault(name, get_source(name))
+            for partition, watermark in result["watermarks"].items():
+                if watermark is None:
+                    continue
+                key = (name, source.watermark_key(partition))
+                if key not in merged or watermark > merged[key][1]:
+                    merged[key] = (partition, watermark)
+
+    connect_db()
+    try:
+        for (name, _), (partition, watermark) in merged.items():
+            sources[name].commit_watermark(partition, watermark)
+        print(f"🔃 Merged {len(merged)} watermarks")
+    finally:
+        close_db()
@@ -0,0 +1,225 @@
+"""Long-lived scraper worker sharing partitions with its replicas through leases.
+
+Usage: python -m backend.services.worker --sources reddit gnews rss --worker-id w1
+"""
+import argparse
+from datetime import datetime, timedelta
+import os
+import signal
+import socket
+import threading
+import zlib
+
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from backend.db.mongo import close_db, connect_db, db
+from backend.services.RawArchive import attach_raw_archive
+from backend.services.source import Source, get_source
+
+
+def lease_id(source: str, partition: str) -> str:
+    return f"{source}:{partition}"
+
+
+def rendezvous_owner(lease: str, workers: list[str]) -> str:
+    """Highest random weight owner of a lease; stable while the worker set is."""
+    return max(workers, key=lambda w: (zlib.crc32(f"{w}|{lease}".encode()), w))
+
+
+class ScrapeWorker(object):
+    """Scrapes the partitions it holds a lease on, one interval at a time.
+
+    Workers announce themselves in `scrape_workers` and every partition
+    (subreddit, topic, feed) has a lease in `scrape_leases`. Each worker
+    wants the partitions it ranks first on by rendezvous hashing over the
+    live workers, so joining or leaving replicas move only their share.
+    A lease expires unless heartbeats renew it, and every acquisition bumps
+    its fence token, which guards the watermark writes of that partition:
+    a worker that lost its lease mid-scrape cannot move the watermark back.
+    Workers only store documents: the search index and trend detector run
+    in the single ingest consumer (backend.services.indexer).
+    """
+
+    def __init__(self, sources: list[str], worker_id: str = None, lease_seconds: int = 90,
+                 heartbeat_seconds: int = 15, interval_seconds: int = 600, limit: int = 100):
+        self.sources: dict[str, Source] = {name: get_source(name) for name in sources}
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.interval_seconds = interval_seconds
+        self.limit = limit
+
+        self.leases: dict[str, int] = {}  # lease id -> fence
+        self.last_run: dict[str, datetime] = {}
+        self.lock = threading.Lock()
+        self.stopping = threading.Event()
+
+    def expiry(self) -> datetime:
+        return datetime.utcnow() + timedelta(seconds=self.lease_seconds)
+
+    def register(self):
+        db.scrape_workers.create_index([("expires_at", ASCENDING)], expireAfterSeconds=0)
+        db.scrape_workers.create_index([("sources", ASCENDING)])
+        db.scrape_leases.create_index([("owner", ASCENDING)])
+        # leases are never expired by a TTL: a recreated lease would restart its
+        # fence below the one scrape_meta holds, and every watermark write would fail
+        for index in list(db.scrape_leases.list_indexes()):
+            if "expireAfterSeconds" in index:
+                db.scrape_leases.drop_index(index["name"])
+        self.beat()
+        print(f"👷 Worker {self.worker_id} serving {', '.join(self.sources)}")
+
+    def beat(self):
+        """Refresh the worker record and renew held leases, dropping lost ones."""
+        db.scrape_workers.update_one(
+            {"_id": self.worker_id},
+            {"$set": {"sources": list(self.sources), "host": socket.gethostname(), "pid": os.getpid(),
+                      "heartbeat_utc": datetime.utcnow(), "expires_at": self.expiry()}},
+            upsert=True,
+        )
+        with self.lock:
+            held = list(self.leases.items())
+        for lease, fence in held:
+            res = db.scrape_leases.update_one(
+                {"_id": lease, "owner": self.worker_id, "fence": fence},
+                {"$set": {"expires_at": self.expiry()}},
+            )
+            if res.matched_count == 0:
+                print(f"⚠️ Lost lease {lease}")
+                with self.lock:
+                    self.leases.pop(lease, None)
+
+    def heartbeat(self):
+        while not self.stopping.wait(self.heartbeat_seconds):
+            try:
+                self.beat()
+            except Exception as e:
+                print(f"❌ Heartbeat failed: {e}")
+
+    def live_workers(self, source: str) -> list[str]:
+        query = {"sources": source, "expires_at": {"$gt": datetime.utcnow()}}
+        workers = [w["_id"] for w in db.scrape_workers.find(query, {"_id": 1})]
+        return workers if self.worker_id in workers else workers + [self.worker_id]
+
+    def acquire(self, source: str, partition: str) -> bool:
+        lease = lease_id(source, partition)
+        now = datetime.utcnow()
+        try:
+            doc = db.scrape_leases.find_one_and_update(
+                {"_id": lease, "$or": [{"owner": None}, {"expires_at": {"$lt": now}}]},
+                {
+                    "$set": {"source": source, "partition": partition, "owner": self.worker_id,
+                             "acquired_utc": now, "expires_at": self.expiry()},
+                    "$inc": {"fence": 1},
+                },
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        except DuplicateKeyError:
+            return False  # held by a live worker
+        with self.lock:
+            self.leases[lease] = doc["fence"]
+        self.last_run[lease] = doc.get("last_run_utc") or datetime.min
+        print(f"🔑 Acquired {lease} (fence {doc['fence']})")
+        return True
+
+    def release(self, lease: str):
+        with self.lock:
+            fence = self.leases.pop(lease, None)
+        self.last_run.pop(lease, None)
+        if fence is None:
+            return
+        db.scrape_leases.update_one(
+            {"_id": lease, "owner": self.worker_id, "fence": fence},
+            {"$set": {"owner": None, "expires_at": datetime.utcnow()}},
+        )
+        print(f"🔓 Released {lease}")
+
+    def rebalance(self):
+        """Release the leases that now rank elsewhere and claim the ones ranking here."""
+        for name, source in self.sources.items():
+            workers = self.live_workers(name)
+            for partition in source.partitions():
+                lease = lease_id(name, partition)
+                mine = rendezvous_owner(lease, workers) == self.worker_id
+                if lease in self.leases and not mine:
+                    self.release(lease)
+                elif mine and lease not in self.leases:
+                    self.acquire(name, partition)
+
+    def due(self) -> list[str]:
+        cutoff = datetime.utcnow() - timedelta(seconds=self.interval_seconds)
+        with self.lock:
+            held = list(self.leases)
+        return sorted((lease for lease in held if self.last_run.get(lease, datetime.min) <= cutoff),
+                      key=lambda lease: self.last_run.get(lease, datetime.min))
+
+    def run_partition(self, lease: str):
+        name, partition = lease.split(":", 1)
+        source = self.sources[name]
+        fence = self.leases.get(lease)
+        if fence is None:
+            return
+        try:
+            _, newest = source.scrape_partition(partition, limit=self.limit, incremental=True, commit=False)
+            if not source.commit_watermark(partition, newest, fence=fence):
+                print(f"⚠️ {lease} changed owner during the scrape, watermark kept")
+        except Exception as e:
+            print(f"❌ {lease} failed: {e}")
+        now = datetime.utcnow()
+        self.last_run[lease] = now
+        db.scrape_leases.update_one(
+            {"_id": lease, "owner": self.worker_id, "fence": fence},
+            {"$set": {"last_run_utc": now}},
+        )
+
+    def stop(self, *_):
+        print(f"🛑 Worker {self.worker_id} stopping...")
+        self.stopping.set()
+
+    def run(self):
+        """Scrape due partitions until stopped, rebalancing every heartbeat."""
+        self.register()
+        raw_archive = attach_raw_archive()
+        beater = threading.Thread(target=self.heartbeat, daemon=True)
+        beater.start()
+        try:
+            while not self.stopping.is_set():
+                self.rebalance()
+                for lease in self.due():
+                    if self.stopping.is_set():
+                        break
+                    self.run_partition(lease)
+                    raw_archive.flush()  # publish the payloads of every run, a killed pod loses none
+                self.stopping.wait(self.heartbeat_seconds)
+        finally:
+            for lease in list(self.leases):
+                self.release(lease)
+            db.scrape_workers.delete_one({"_id": self.worker_id})
+            raw_archive.close()
+
+
+def run_scrape_worker(sources: list[str], **kwargs):
+    connect_db()
+    worker = ScrapeWorker(sources, **kwargs)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    try:
+        worker.run()
+    finally:
+        close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a lease-sharded scraper worker.")
+    parser.add_argument("--sources", nargs="+", default=["reddit", "gnews", "rss"])
+    parser.add_argument("--worker-id", default=None)
+    parser.add_argument("--lease-seconds", type=int, default=90)
+    parser.add_argument("--heartbeat-seconds", type=int, default=15)
+    parser.add_argument("--interval-seconds", type=int, default=600)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+    run_scrape_worker(args.sources, worker_id=args.worker_id, lease_seconds=args.lease_seconds,
+                      heartbeat_seconds=args.heartbeat_seconds, interval_seconds=args.interval_seconds,
+                      limit=args.limit)
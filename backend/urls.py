@@ -0,0 +1,72 @@
+"""URL canonicalization shared by the storage, service and API layers. No network access."""
+import re
+from typing import Callable
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit, urlunsplit
+
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "igshid", "mc_cid", "mc_eid", "ref", "ref_src", "ref_url",
+    "cmpid", "ncid", "ocid", "smid", "smtyp", "taid", "soc_src", "soc_trk", "sr_share",
+    "guccounter", "guce_referrer", "guce_referrer_sig", "outputtype", "amp",
+}
+TRACKING_PREFIXES = ("utm_", "itm_", "pk_", "at_", "__twitter")
+HOST_PREFIXES = ("www.", "m.", "mobile.", "amp.")
+SHORTENERS = {
+    "t.co", "bit.ly", "buff.ly", "dlvr.it", "goo.gl", "ift.tt", "ow.ly", "reut.rs", "tinyurl.com",
+    "trib.al", "wapo.st", "nyti.ms", "bbc.in", "cnn.it", "lnkd.in", "apple.news", "flip.it",
+}
+AMP_PATH = re.compile(r"(/amp/?$|/amp(?=/)|\.amp(?=\.html?$|$))")
+
+
+def unwrap_amp_cache(host: str, path: str) -> str | None:
+    """Publisher URL behind a Google AMP cache / viewer URL, if it is one."""
+    if host.endswith(".cdn.ampproject.org") or host in ("google.com", "news.google.com"):
+        match = re.match(r"^(?:/amp|/c|/v)?(?:/s)?/(.+)$", path)
+        if match and "." in match.group(1).split("/")[0]:
+            return "https://" + unquote(match.group(1))
+    return None
+
+
+def is_shortened(canonical_url: str | None) -> bool:
+    return bool(canonical_url) and (urlsplit(canonical_url).hostname or "") in SHORTENERS
+
+
+def canonicalize_url(url: str | None, resolver: Callable[[str], str | None] = None) -> str | None:
+    """Normalize an article URL so that variants of one story compare equal.
+
+    Drops tracking parameters, fragments, www/m/amp host prefixes, AMP paths
+    and trailing slashes and unwraps AMP cache URLs. Link shorteners are
+    replaced by `resolver(short canonical URL)` when it knows their target;
+    resolving them over the network is left to RedirectResolver.
+    """
+    if not url:
+        return None
+    url = str(url).strip()
+    parts = urlsplit(url if "://" in url else "https://" + url)
+    host = (parts.hostname or "").lower()
+    if not host:
+        return None
+
+    for prefix in HOST_PREFIXES:
+        if host.startswith(prefix) and host.count(".") > 1:
+            host = host[len(prefix):]
+            break
+
+    path = parts.path or "/"
+    unwrapped = unwrap_amp_cache(host, path)
+    if unwrapped:
+        return canonicalize_url(unwrapped, resolver)
+    path = AMP_PATH.sub("", path)
+    path = re.sub(r"/{2,}", "/", path).rstrip("/") or ""
+
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)
+    ]
+    port = f":{parts.port}" if parts.port and parts.port not in (80, 443) else ""
+    canonical = urlunsplit(("https", host + port, path, urlencode(sorted(query)), ""))
+
+    if resolver is not None and host in SHORTENERS:
+        target = resolver(canonical)
+        if target and target != canonical:
+            return canonicalize_url(target)
+    return canonical
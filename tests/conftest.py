@@ -0,0 +1,61 @@
+import os
+import sys
+
+import pytest
+
+# required settings (backend.config) that no test uses
+for name in ("CLIENT_ID", "CLIENT_SECRET", "USER_AGENT", "NEWSAPI_KEY"):
+    os.environ.setdefault(name, "test")
+
+
+def bulk_write(self, requests, ordered=True, **kwargs):
+    """Apply pymongo write operations one by one.
+
+    mongomock's bulk builder predates the operation classes of pymongo 4.9+.
+    Errors are collected like an unordered bulk write does.
+    """
+    from pymongo import DeleteMany, DeleteOne, InsertOne, ReplaceOne, UpdateMany, UpdateOne
+    from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+    errors = []
+    for i, op in enumerate(requests):
+        try:
+            if isinstance(op, InsertOne):
+                self.insert_one(op._doc)
+            elif isinstance(op, UpdateOne):
+                self.update_one(op._filter, op._doc, upsert=op._upsert)
+            elif isinstance(op, UpdateMany):
+                self.update_many(op._filter, op._doc, upsert=op._upsert)
+            elif isinstance(op, ReplaceOne):
+                self.replace_one(op._filter, op._doc, upsert=op._upsert)
+            elif isinstance(op, DeleteOne):
+                self.delete_one(op._filter)
+            elif isinstance(op, DeleteMany):
+                self.delete_many(op._filter)
+            else:
+                raise TypeError(f"Unsupported bulk operation {op!r}")
+        except DuplicateKeyError as e:
+            errors.append({"index": i, "code": 11000, "errmsg": str(e)})
+            if ordered:
+                break
+    if errors:
+        raise BulkWriteError({"writeErrors": errors, "writeConcernErrors": [], "nInserted": 0, "nUpserted": 0,
+                              "nMatched": 0, "nModified": 0, "nRemoved": 0, "upserted": []})
+
+
+@pytest.fixture
+def mongo_db(monkeypatch):
+    """A fresh in-memory mongomock database in place of `db`, in every module that imported it."""
+    mongomock = pytest.importorskip("mongomock")
+    pytest.importorskip("pymongo")
+    from pymongo.database import Database
+    from backend.db import mongo
+
+    monkeypatch.setattr(mongomock.Collection, "bulk_write", bulk_write)
+    fake = mongomock.MongoClient().db
+    monkeypatch.setattr(mongo, "db", fake)  # modules imported during the test bind it too
+    for module in list(sys.modules.values()):
+        if getattr(module, "__name__", "").startswith("backend") and \
+                isinstance(getattr(module, "db", None), (Database, mongomock.Database)):
+            monkeypatch.setattr(module, "db", fake)
+    return fake
@@ -0,0 +1,188 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("pymongo")
+pytest.importorskip("pydantic")
+pytest.importorskip("dotenv")
+
+from backend.db import mongo
+from backend.db.compression import compress_text
+from backend.db.mongo import body_id, load_bodies, migrate_to_articles, upsert_doc
+from backend.services import reprocess
+
+
+def article(url: str, source: str, **fields) -> dict:
+    return {"url": url, "source": source, "title": "title", "author": None, "keywords": [],
+            "publishedAt": "2025-03-01T08:00:00Z", "saved_utc": "2025-03-01T09:00:00", **fields}
+
+
+def store(db, *docs, rebuild_id: str = None):
+    db.articles.bulk_write([upsert_doc("articles", d, rebuild_id) for d in docs])
+
+
+def test_first_source_stays_and_every_source_is_listed(mongo_db):
+    store(mongo_db, article("https://a.example/1", "newsapi"), article("https://a.example/1", "gnews"))
+
+    doc = mongo_db.articles.find_one({"url": "https://a.example/1"})
+    assert doc["source"] == "newsapi"
+    assert doc["sources"] == ["newsapi", "gnews"]
+
+
+def test_empty_fields_never_overwrite_filled_ones(mongo_db):
+    store(mongo_db, article("https://a.example/1", "newsapi", author="Ada", keywords=["llm"]))
+    store(mongo_db, article("https://a.example/1", "gnews", title="new title"))
+
+    doc = mongo_db.articles.find_one({"url": "https://a.example/1"})
+    assert doc["author"] == "Ada"
+    assert doc["keywords"] == ["llm"]
+    assert doc["title"] == "new title"
+
+
+def test_empty_fields_are_stored_on_insert(mongo_db):
+    store(mongo_db, article("https://a.example/1", "rss"))
+
+    doc = mongo_db.articles.find_one({"url": "https://a.example/1"})
+    assert doc["author"] is None
+    assert doc["keywords"] == []
+
+
+def test_migrated_document_keeps_its_id_on_insert_only(mongo_db):
+    store(mongo_db, {**article("https://a.example/1", "newsapi"), "_id": "legacy-1"})
+    store(mongo_db, {**article("https://a.example/1", "gnews"), "_id": "legacy-2"})
+
+    assert [d["_id"] for d in mongo_db.articles.find()] == ["legacy-1"]
+
+
+def test_rebuild_keeps_saved_utc_and_stamps_the_rebuild(mongo_db):
+    store(mongo_db, article("https://a.example/1", "gnews"))
+    store(mongo_db, article("https://a.example/1", "gnews", saved_utc="2025-06-01T00:00:00"),
+          article("https://a.example/2", "gnews", saved_utc="2025-06-01T00:00:00"), rebuild_id="r1")
+
+    old = mongo_db.articles.find_one({"url": "https://a.example/1"})
+    new = mongo_db.articles.find_one({"url": "https://a.example/2"})
+    assert (old["saved_utc"], old["rebuild_id"]) == ("2025-03-01T09:00:00", "r1")
+    assert (new["saved_utc"], new["rebuild_id"]) == ("2025-06-01T00:00:00", "r1")
+
+
+def legacy(db, name: str, i: int, url: str, saved_utc: str = "2025-03-01T09:00:00", **fields):
+    db[name].insert_one({"_id": i, "url": url, "title": f"{name} {i}", "author": None,
+                         "publishedAt": "2025-03-01T08:00:00Z", "saved_utc": saved_utc, **fields})
+
+
+def body(db, collection: str, key: str, bodies: str = "bodies", **fields):
+    db[bodies].insert_one({"_id": body_id(collection, key), "collection": collection, "key": key,
+                           **{f: dict(zip(("codec", "data"), compress_text(v))) for f, v in fields.items()}})
+
+
+def test_migration_merges_documents_bodies_and_links(mongo_db):
+    legacy(mongo_db, "newsapi_articles", 1, "https://a.example/1", author="Ada")
+    legacy(mongo_db, "gnews_articles", 2, "https://a.example/1")
+    legacy(mongo_db, "gnews_articles", 3, "https://a.example/2")
+    body(mongo_db, "newsapi_articles", "https://a.example/1", content="from newsapi")
+    body(mongo_db, "gnews_articles", "https://a.example/1", content="from gnews", expanded_content="full text")
+    mongo_db.reddit_article_links.insert_one({"_id": "p1", "canonical_url": "a.example/1",
+                                              "articles": ["newsapi_articles", "gnews_articles"]})
+
+    migrate_to_articles(drop_old=True)
+
+    doc = mongo_db.articles.find_one({"url": "https://a.example/1"})
+    assert (doc["_id"], doc["source"], doc["sources"], doc["author"]) == (1, "newsapi", ["newsapi", "gnews"], "Ada")
+    assert mongo_db.articles.count_documents({}) == 2
+    # the first source's body fields win, the others fill the gaps
+    assert load_bodies("articles", ["https://a.example/1"])["https://a.example/1"] == {
+        "content": "from newsapi", "expanded_content": "full text"}
+    assert sorted(mongo_db.reddit_article_links.find_one({"_id": "p1"})["articles"]) == ["gnews", "newsapi"]
+    assert "newsapi_articles" not in mongo_db.list_collection_names()
+    assert mongo_db.bodies.count_documents({"collection": {"$ne": "articles"}}) == 0
+
+
+def test_migration_merges_archive_collections(mongo_db, monkeypatch):
+    monkeypatch.setattr(mongo, "archive_collection", lambda name: mongo_db[name])  # no zstd option in mongomock
+    legacy(mongo_db, "newsapi_articles_archive", 1, "https://a.example/old")
+    legacy(mongo_db, "rss_articles_archive", 2, "https://a.example/old")
+    body(mongo_db, "rss_articles", "https://a.example/old", bodies="bodies_archive", content="archived")
+
+    migrate_to_articles()
+
+    doc = mongo_db.articles_archive.find_one({"url": "https://a.example/old"})
+    assert (doc["source"], doc["sources"]) == ("newsapi", ["newsapi", "rss"])
+    assert mongo_db.articles.count_documents({}) == 0
+    assert mongo_db.bodies_archive.find_one({"_id": body_id("articles", "https://a.example/old")})
+
+
+def export_mark(db, name: str, saved_utc: str, last_id: int):
+    db.scrape_meta.insert_one({"export": name, "watermark": {"saved_utc": saved_utc, "_id": last_id}})
+
+
+def test_cutover_resumes_after_the_most_advanced_export(mongo_db):
+    legacy(mongo_db, "newsapi_articles", 1, "https://a.example/1", "2025-03-01T09:00:00")
+    legacy(mongo_db, "gnews_articles", 2, "https://a.example/2", "2025-03-02T09:00:00")
+    export_mark(mongo_db, "newsapi_articles", "2025-03-01T09:00:00", 1)
+    export_mark(mongo_db, "gnews_articles", "2025-03-02T09:00:00", 2)
+
+    migrate_to_articles()
+
+    assert mongo_db.scrape_meta.find_one({"export": "articles"})["watermark"] == {
+        "saved_utc": "2025-03-02T09:00:00", "_id": 2}
+
+
+def test_cutover_goes_back_to_the_oldest_pending_export(mongo_db):
+    legacy(mongo_db, "newsapi_articles", 1, "https://a.example/1", "2025-03-01T09:00:00")
+    legacy(mongo_db, "newsapi_articles", 3, "https://a.example/3", "2025-03-01T10:00:00")
+    legacy(mongo_db, "gnews_articles", 2, "https://a.example/2", "2025-03-02T09:00:00")
+    export_mark(mongo_db, "newsapi_articles", "2025-03-01T09:00:00", 1)
+    export_mark(mongo_db, "gnews_articles", "2025-03-02T09:00:00", 2)
+
+    migrate_to_articles()
+
+    assert mongo_db.scrape_meta.find_one({"export": "articles"})["watermark"] == {
+        "saved_utc": "2025-03-01T09:00:00", "_id": 1}
+
+
+def test_cutover_never_exported_collection_exports_everything(mongo_db):
+    legacy(mongo_db, "newsapi_articles", 1, "https://a.example/1")
+    legacy(mongo_db, "rss_articles", 2, "https://a.example/2")
+    export_mark(mongo_db, "newsapi_articles", "2025-03-01T09:00:00", 1)
+
+    migrate_to_articles()
+
+    assert mongo_db.scrape_meta.find_one({"export": "articles"}) is None
+
+
+@pytest.fixture
+def articles_sweep(monkeypatch):
+    monkeypatch.setattr(reprocess, "get_source", lambda name: SimpleNamespace(collection="articles"))
+    return lambda name, rebuild_id: reprocess.sweep(name, ("2025-03-01", "2025-03-02"), rebuild_id)
+
+
+def test_rebuild_only_pulls_the_source_of_a_shared_article(mongo_db, articles_sweep):
+    store(mongo_db, article("https://a.example/1", "gnews", canonical_url="a.example/1"),
+          article("https://a.example/1", "rss", canonical_url="a.example/1"))
+    body(mongo_db, "articles", "https://a.example/1", content="text")
+
+    assert articles_sweep("gnews", "r1") == 0
+
+    doc = mongo_db.articles.find_one({"url": "https://a.example/1"})
+    assert (doc["source"], doc["sources"]) == ("rss", ["rss"])
+    assert mongo_db.bodies.count_documents({}) == 1
+
+
+def test_rebuild_deletes_articles_no_other_source_found(mongo_db, articles_sweep):
+    store(mongo_db, article("https://a.example/1", "gnews"), article("https://a.example/2", "gnews"))
+    store(mongo_db, article("https://a.example/2", "gnews"), rebuild_id="r1")  # the replay kept this one
+    body(mongo_db, "articles", "https://a.example/1", content="text")
+
+    assert articles_sweep("gnews", "r1") == 1
+
+    assert [d["url"] for d in mongo_db.articles.find()] == ["https://a.example/2"]
+    assert mongo_db.bodies.count_documents({}) == 0
+
+
+def test_rebuild_leaves_other_sources_and_days_alone(mongo_db, articles_sweep):
+    store(mongo_db, article("https://a.example/1", "rss"),
+          article("https://a.example/2", "gnews", saved_utc="2025-02-28T09:00:00"))
+
+    assert articles_sweep("gnews", "r1") == 0
+
+    assert mongo_db.articles.count_documents({}) == 2
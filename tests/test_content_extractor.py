@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("newspaper")
+pytest.importorskip("pymongo")
+pytest.importorskip("dotenv")
+
+from backend.services import ContentExtractor as content_extractor_module
+from backend.services.ContentExtractor import ContentExtractor, domain_of
+
+HOUR = 3600
+
+
+def test_domain_of():
+    assert domain_of("https://www.Example.com/a?b=1") == "example.com"
+    assert domain_of("not a url") == ""
+
+
+@pytest.fixture
+def extractor(mongo_db):
+    return ContentExtractor(failure_threshold=3, base_cooldown=HOUR, max_cooldown=3 * HOUR)
+
+
+def fail(extractor: ContentExtractor, times: int = 1, domain: str = "example.com"):
+    for _ in range(times):
+        extractor.record(domain, "error", 1.0, 0)
+
+
+def cooldown(extractor: ContentExtractor, domain: str = "example.com") -> float:
+    return (extractor.state(domain)["retry_at"] - datetime.utcnow()).total_seconds()
+
+
+def end_cooldown(extractor: ContentExtractor, domain: str = "example.com"):
+    extractor.state(domain)["retry_at"] = datetime.utcnow() - timedelta(seconds=1)
+
+
+def test_breaker_opens_at_the_failure_threshold(extractor):
+    fail(extractor, 2)
+    assert extractor.allowed("example.com")
+
+    fail(extractor)
+
+    assert not extractor.allowed("example.com")
+    assert HOUR - 5 < cooldown(extractor) <= HOUR
+
+
+def test_a_success_resets_the_consecutive_failures(extractor):
+    fail(extractor, 2)
+    extractor.record("example.com", "success", 1.0, 500)
+    fail(extractor, 2)
+
+    assert extractor.allowed("example.com")
+
+
+def test_failed_probe_reopens_with_a_doubled_cooldown_up_to_the_maximum(extractor):
+    fail(extractor, 3)
+    end_cooldown(extractor)
+    assert extractor.allowed("example.com")  # the probe
+
+    fail(extractor)
+    assert 2 * HOUR - 5 < cooldown(extractor) <= 2 * HOUR
+
+    end_cooldown(extractor)
+    fail(extractor)
+    assert 3 * HOUR - 5 < cooldown(extractor) <= 3 * HOUR
+
+
+def test_successful_probe_closes_the_breaker(extractor):
+    fail(extractor, 3)
+    end_cooldown(extractor)
+
+    extractor.record("example.com", "success", 1.0, 500)
+
+    assert extractor.state("example.com") == {"consecutive_failures": 0, "opens": 0, "retry_at": None}
+    fail(extractor, 2)
+    assert extractor.allowed("example.com")
+
+
+def test_breaker_state_is_shared_through_domain_stats(extractor, mongo_db):
+    fail(extractor, 3)
+    extractor.record("example.com", "timeout", 10.0, 0)
+
+    assert not ContentExtractor().allowed("example.com")
+    stats = mongo_db.domain_stats.find_one({"_id": "example.com"})
+    assert (stats["attempts"], stats["errors"], stats["timeouts"], stats["opens"]) == (4, 3, 1, 2)
+
+
+def test_open_domains_are_skipped_without_a_download(extractor, mongo_db, monkeypatch):
+    def download(*args, **kwargs):
+        raise AssertionError("downloaded")
+
+    monkeypatch.setattr(content_extractor_module, "Article", download)
+    fail(extractor, 3)
+
+    assert extractor.extract("https://www.example.com/story") is None
+    assert mongo_db.domain_stats.find_one({"_id": "example.com"})["skipped"] == 1
@@ -0,0 +1,81 @@
+import gzip
+import json
+import os
+
+from backend.services.RawArchive import RawArchive, list_segments, read_segment, recover_parts
+
+
+def part_files(directory) -> list[str]:
+    return [os.path.join(d, f) for d, _, files in os.walk(directory) for f in files if ".part" in f]
+
+
+def test_segments_are_published_on_flush(tmp_path):
+    archive = RawArchive(str(tmp_path))
+    archive.append("reddit", "MachineLearning", {"id": "p1"})
+    archive.append("gnews", "ai", {"url": "https://a.example/1"})
+
+    assert list_segments(str(tmp_path)) == []
+    archive.flush()
+
+    segments = list_segments(str(tmp_path))
+    assert len(segments) == 2
+    assert part_files(tmp_path) == []
+    records = [r for s in segments for r in read_segment(s)]
+    assert sorted(r["source"] for r in records) == ["gnews", "reddit"]
+    assert {"id": "p1"} in [r["raw"] for r in records]
+
+
+def test_list_segments_filters_on_source_and_day(tmp_path):
+    for source, day in (("reddit", "2025-03-01"), ("reddit", "2025-03-02"), ("rss", "2025-03-01")):
+        path = tmp_path / f"source={source}" / f"date={day}" / "part-x.jsonl.gz"
+        path.parent.mkdir(parents=True)
+        with gzip.open(path, "wt") as f:
+            f.write("{}\n")
+
+    selected = list_segments(str(tmp_path), sources=["reddit"], since="2025-03-02")
+
+    assert [os.path.basename(os.path.dirname(p)) for p in selected] == ["date=2025-03-02"]
+
+
+def orphan(tmp_path, lines: list[str], truncate: int = 0) -> str:
+    """A .part segment left by a writer that died, optionally cut `truncate` bytes short."""
+    path = tmp_path / "source=reddit" / "date=2025-03-01" / "part-dead.jsonl.gz.part"
+    path.parent.mkdir(parents=True)
+    with gzip.open(path, "wt") as f:
+        f.writelines(lines)
+    if truncate:
+        data = path.read_bytes()
+        path.write_bytes(data[:-truncate])
+    os.utime(path, (0, 0))
+    return str(path)
+
+
+def test_recover_publishes_orphaned_parts(tmp_path):
+    records = [json.dumps({"source": "reddit", "raw": {"id": f"p{i}"}}) + "\n" for i in range(3)]
+    orphan(tmp_path, records)
+
+    assert recover_parts(str(tmp_path), min_age=60) == 3
+
+    assert part_files(tmp_path) == []
+    [segment] = list_segments(str(tmp_path))
+    assert [r["raw"]["id"] for r in read_segment(segment)] == ["p0", "p1", "p2"]
+
+
+def test_recover_keeps_the_complete_records_of_a_truncated_part(tmp_path):
+    records = [json.dumps({"source": "reddit", "raw": {"id": f"p{i}", "text": "x" * 50}}) + "\n" for i in range(50)]
+    orphan(tmp_path, records, truncate=40)
+
+    recovered = recover_parts(str(tmp_path), min_age=60)
+
+    assert 0 < recovered < 50
+    [segment] = list_segments(str(tmp_path))
+    assert len(list(read_segment(segment))) == recovered
+
+
+def test_recover_skips_parts_still_being_written(tmp_path):
+    archive = RawArchive(str(tmp_path))
+    archive.append("reddit", "MachineLearning", {"id": "p1"})
+
+    assert recover_parts(str(tmp_path), min_age=60) == 0
+    assert len(part_files(tmp_path)) == 1
+    archive.close()
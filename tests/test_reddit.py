@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+praw = pytest.importorskip("praw")
+pytest.importorskip("newsapi")
+pytest.importorskip("pymongo")
+pytest.importorskip("pydantic_settings")
+pytest.importorskip("dotenv")
+
+from praw.models import Submission
+
+from backend.services.RedditScraper import RedditScraper
+
+DATA = {
+    "id": "abc", "title": "New LLM beats GPT on reasoning", "author": "ada", "subreddit": "LocalLLaMA",
+    "score": 42, "upvote_ratio": 0.97, "num_comments": 7, "created_utc": 1740819600.0,
+    "url": "https://example.com/llm", "permalink": "/r/LocalLLaMA/comments/abc/", "selftext": "",
+    "link_flair_text": "News", "poll_data": {"options": [{"id": "1", "text": "yes"}], "total_vote_count": 3},
+}
+
+
+@pytest.fixture
+def scraper():
+    return RedditScraper()
+
+
+@pytest.fixture
+def submission(scraper):
+    return Submission(scraper.praw, _data=dict(DATA))
+
+
+def test_raw_post_keeps_every_submission_attribute(scraper, submission):
+    raw = scraper.raw_post(submission)
+
+    assert json.loads(json.dumps(raw)) == raw  # archived as is, with no PRAW object left
+    assert (raw["author"], raw["subreddit"], raw["link_flair_text"]) == ("ada", "LocalLLaMA", "News")
+    assert raw["poll_data"]["options"] == [{"id": "1", "text": "yes"}]
+    assert not any(key.startswith("_") for key in raw)
+
+
+def test_archived_and_live_posts_give_the_same_document(scraper, submission):
+    live = scraper.extract_post_data(submission)
+    archived = scraper.to_doc(json.loads(json.dumps(scraper.raw_post(submission))))
+
+    assert {k: v for k, v in live.items() if k != "saved_utc"} == \
+        {k: v for k, v in archived.items() if k != "saved_utc"}
+    assert set(archived) == set(scraper.reddit_fields) | {"keywords", "saved_utc"}
+    assert archived["permalink"] == "https://reddit.com/r/LocalLLaMA/comments/abc/"
+
+
+def test_payloads_archived_with_the_stored_fields_only_still_replay(scraper):
+    doc = scraper.to_doc({field: DATA[field] for field in scraper.reddit_fields})
+
+    assert (doc["author"], sorted(doc["keywords"])) == ("ada", ["gpt", "llm"])
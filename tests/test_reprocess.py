@@ -0,0 +1,70 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("pymongo")
+pytest.importorskip("pydantic")
+pytest.importorskip("dotenv")
+
+from backend.db.mongo import body_id
+from backend.services import reprocess
+from backend.services.SearchIndex import SearchIndex
+
+
+def segment(source: str, day: str) -> str:
+    return os.path.join("raw_archive", f"source={source}", f"date={day}", "part-x.jsonl.zst")
+
+
+def test_replayed_window_spans_the_fetch_days_of_a_source():
+    segments = [segment("reddit", "2025-03-04"), segment("reddit", "2025-03-01"), segment("rss", "2025-02-01")]
+
+    assert reprocess.replayed_window(segments, "reddit") == ("2025-03-01", "2025-03-05")
+    assert reprocess.replayed_window(segments, "rss") == ("2025-02-01", "2025-02-02")
+    assert reprocess.replayed_window(segments, "gnews") is None
+
+
+def test_segment_path_parts():
+    path = segment("gnews", "2025-03-01")
+
+    assert (reprocess.segment_source(path), reprocess.segment_day(path)) == ("gnews", "2025-03-01")
+
+
+@pytest.fixture
+def posts(mongo_db, monkeypatch):
+    """Posts p1..p3 saved inside the replayed window, p0 before it; the replay wrote p2 again."""
+    monkeypatch.setattr(reprocess, "get_source", lambda name: SimpleNamespace(collection="reddit_posts"))
+    saved = {"p0": "2025-02-28T23:00:00", "p1": "2025-03-01T10:00:00", "p2": "2025-03-01T11:00:00",
+             "p3": "2025-03-02T10:00:00"}
+    for post_id, saved_utc in saved.items():
+        mongo_db.reddit_posts.insert_one({
+            "id": post_id, "title": f"agents {post_id}", "subreddit": "LocalLLaMA", "saved_utc": saved_utc,
+            "created_utc": saved_utc, "story_id": "s1", **({"rebuild_id": "r1"} if post_id == "p2" else {}),
+        })
+        mongo_db.bodies.insert_one({"_id": body_id("reddit_posts", post_id), "key": post_id})
+        mongo_db.reddit_article_links.insert_one({"_id": post_id, "canonical_url": f"a.example/{post_id}"})
+    mongo_db.stories.insert_one({"_id": "s1", "doc_count": 4, "sources": {"reddit": 4}})
+    return mongo_db
+
+
+def test_sweep_deletes_what_the_replay_no_longer_produces(posts, tmp_path):
+    index = SearchIndex(str(tmp_path))
+    for doc in posts.reddit_posts.find():
+        index.add("reddit_posts", doc)
+    index.flush()
+
+    deleted = reprocess.sweep("reddit", ("2025-03-01", "2025-03-03"), "r1", index)
+
+    assert deleted == 2
+    assert sorted(d["id"] for d in posts.reddit_posts.find()) == ["p0", "p2"]
+    assert sorted(b["key"] for b in posts.bodies.find()) == ["p0", "p2"]
+    assert sorted(link["_id"] for link in posts.reddit_article_links.find()) == ["p0", "p2"]
+    assert posts.stories.find_one({"_id": "s1"}) == {"_id": "s1", "doc_count": 2, "sources": {"reddit": 2}}
+    assert sorted(r["key"] for r in index.search("agents")) == ["p0", "p2"]
+    index.close()
+
+
+def test_sweep_is_limited_to_its_window(posts):
+    assert reprocess.sweep("reddit", ("2025-03-02", "2025-03-03"), "r1") == 1
+
+    assert sorted(d["id"] for d in posts.reddit_posts.find()) == ["p0", "p1", "p2"]
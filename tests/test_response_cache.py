@@ -0,0 +1,95 @@
+import pytest
+
+pytest.importorskip("pymongo")
+pytest.importorskip("pydantic_settings")
+pytest.importorskip("dotenv")
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.db.mongo import save_many
+from backend.routes import route
+from backend.services import ResponseCache as response_cache_module
+from backend.services.ResponseCache import ResponseCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = ResponseCache(max_entries=2)
+    cache.put("a", b"1", ())
+    cache.put("b", b"2", ())
+    cache.get("a", ())
+    cache.put("c", b"3", ())
+
+    assert list(cache.entries) == ["a", "c"]
+
+
+def test_entries_expire_after_their_own_ttl(clock):
+    cache = ResponseCache(ttl_seconds=600)
+    cache.put("window", b"1", (), ttl_seconds=30)
+    cache.put("latest", b"2", ())
+    clock[0] += 31
+
+    assert cache.get("window", ()) is None
+    assert cache.get("latest", ()).body == b"2"
+
+
+def test_a_new_generation_misses():
+    cache = ResponseCache()
+    cache.put("a", b"1", (("articles", 1),))
+
+    assert cache.get("a", (("articles", 2),)) is None
+    assert "a" not in cache.entries
+
+
+def article(url: str, title: str) -> dict:
+    return {"url": url, "source": "gnews", "title": title, "author": None, "description": None, "content": None,
+            "expanded_content": None, "source_id": None, "source_name": None, "keywords": [],
+            "publishedAt": "2025-03-01T08:00:00Z", "saved_utc": "2025-03-01T09:00:00"}
+
+
+@pytest.fixture
+def client(mongo_db, monkeypatch):
+    monkeypatch.setattr(route, "response_cache", ResponseCache())
+    app = FastAPI()
+    app.include_router(route.router)
+    return TestClient(app)
+
+
+def test_responses_are_cached_until_a_write(client, mongo_db):
+    save_many("articles", [article("https://a.example/1", "first")])
+    first = client.get("/articles/latest")
+    mongo_db.articles.update_one({}, {"$set": {"title": "unflushed"}})  # no generation bump yet
+
+    assert client.get("/articles/latest").json() == first.json()
+    assert route.response_cache.stats() == {"entries": 1, "hits": 1, "misses": 1}
+
+    save_many("articles", [article("https://a.example/2", "second")])
+    titles = [a["title"] for a in client.get("/articles/latest").json()]
+    assert sorted(titles) == ["second", "unflushed"]
+
+
+def test_matching_etag_answers_304_until_the_data_changes(client):
+    save_many("articles", [article("https://a.example/1", "first")])
+    etag = client.get("/articles/latest").headers["ETag"]
+
+    assert client.get("/articles/latest", headers={"If-None-Match": etag}).status_code == 304
+
+    save_many("articles", [article("https://a.example/2", "second")])
+    res = client.get("/articles/latest", headers={"If-None-Match": etag})
+    assert res.status_code == 200 and res.headers["ETag"] != etag
+
+
+def test_query_parameters_are_cached_separately(client):
+    save_many("articles", [article("https://a.example/1", "first")])
+
+    assert len(client.get("/articles/latest?source=gnews").json()) == 1
+    assert client.get("/articles/latest?source=rss").json() == []
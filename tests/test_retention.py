@@ -0,0 +1,57 @@
+import pytest
+
+pytest.importorskip("pymongo")
+pytest.importorskip("pydantic_settings")
+pytest.importorskip("dotenv")
+
+from backend.db import mongo
+from backend.db.mongo import body_id
+from backend.services import RetentionManager as retention_module
+from backend.services.RetentionManager import RetentionManager, parse_days
+from backend.services.worker import ScrapeWorker
+
+
+def test_parse_days():
+    assert parse_days("reddit_posts=90, articles=180,bad") == {"reddit_posts": 90, "articles": 180}
+
+
+@pytest.fixture
+def retention(mongo_db, monkeypatch):
+    monkeypatch.setattr(retention_module, "archive_collection", lambda name: mongo_db[name])  # no zstd in mongomock
+    return RetentionManager(retention_days={"reddit_posts": 30}, batch_size=2)
+
+
+def test_old_documents_and_bodies_move_to_the_archives(retention, mongo_db):
+    for post_id, created in (("old1", "2020-01-01T00:00:00"), ("old2", "2020-01-02T00:00:00"),
+                             ("old3", "2020-01-03T00:00:00"), ("new", "2999-01-01T00:00:00")):
+        mongo_db.reddit_posts.insert_one({"id": post_id, "created_utc": created})
+        mongo_db.bodies.insert_one({"_id": body_id("reddit_posts", post_id), "key": post_id})
+
+    assert retention.run() == 3
+
+    assert [d["id"] for d in mongo_db.reddit_posts.find()] == ["new"]
+    assert sorted(d["id"] for d in mongo_db.reddit_posts_archive.find()) == ["old1", "old2", "old3"]
+    assert [b["key"] for b in mongo_db.bodies.find()] == ["new"]
+    assert mongo_db.bodies_archive.count_documents({}) == 3
+
+
+def test_strip_bodies_drops_archived_bodies(retention, mongo_db):
+    retention.strip_bodies = True
+    mongo_db.reddit_posts.insert_one({"id": "old", "created_utc": "2020-01-01T00:00:00"})
+    mongo_db.bodies.insert_one({"_id": body_id("reddit_posts", "old"), "key": "old"})
+
+    retention.run()
+
+    assert mongo_db.bodies.count_documents({}) == 0
+    assert "bodies_archive" not in mongo_db.list_collection_names()
+
+
+def test_leases_never_expire(mongo_db, monkeypatch):
+    monkeypatch.setattr(retention_module, "SCRATCH_TTL_DAYS", {"scrape_leases": 1})
+    retention_module.ensure_scratch_ttl("scrape_leases")
+    mongo_db.scrape_leases.create_index("expires_at", expireAfterSeconds=0)  # left by an older release
+    mongo.connect_db()
+
+    ScrapeWorker([], worker_id="w1").register()
+
+    assert not any("expireAfterSeconds" in index for index in mongo_db.scrape_leases.list_indexes())
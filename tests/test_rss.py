@@ -0,0 +1,46 @@
+from datetime import datetime, timezone
+
+import pytest
+
+pytest.importorskip("feedparser")
+pytest.importorskip("requests")
+pytest.importorskip("pymongo")
+pytest.importorskip("pydantic_settings")
+pytest.importorskip("dotenv")
+
+from backend.models.ArticleModel import ArticleModel
+from backend.services.RssScraper import RssScraper
+
+UTC_9AM = datetime(2025, 10, 20, 13, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def rss():
+    return RssScraper(feeds=["https://feeds.example.com/ai.xml"])
+
+
+@pytest.mark.parametrize("value", [
+    "Mon, 20 Oct 2025 09:00:00 -0400",  # RSS
+    "Mon, 20 Oct 2025 13:00:00 GMT",
+    "Mon, 20 Oct 2025 13:00:00 -0000",  # no offset known, taken as UTC
+    "2025-10-20T09:00:00-04:00",  # Atom
+    "2025-10-20T13:00:00Z",
+])
+def test_dates_are_converted_to_utc(rss, value):
+    published = rss.parse_date(value)
+
+    assert published == UTC_9AM and published.utcoffset().total_seconds() == 0
+
+
+def test_unparseable_dates(rss):
+    assert rss.parse_date(None) is None
+    assert rss.parse_date("yesterday") is None
+
+
+def test_stored_dates_sort_with_the_other_sources(rss):
+    doc = rss.to_doc({"feed": "https://feeds.example.com/ai.xml", "link": "https://example.com/a",
+                      "title": "OpenAI ships a new model", "published": "Mon, 20 Oct 2025 09:00:00 -0400"})
+
+    stored = ArticleModel(**doc).model_dump(mode="json")["publishedAt"]
+    newsapi = ArticleModel(**{**doc, "publishedAt": "2025-10-20T12:00:00Z"}).model_dump(mode="json")["publishedAt"]
+    assert stored == "2025-10-20T13:00:00Z" > newsapi
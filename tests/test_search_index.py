@@ -0,0 +1,130 @@
+import pytest
+
+pytest.importorskip("pymongo")
+pytest.importorskip("pydantic")
+pytest.importorskip("dotenv")
+
+from backend.services import SearchIndex as search_index_module
+from backend.services.SearchIndex import MERGE_FACTOR, SearchIndex
+
+
+def post(post_id: str, title: str, subreddit: str = "MachineLearning") -> dict:
+    return {"id": post_id, "title": title, "subreddit": subreddit, "created_utc": "2025-03-01T10:00:00"}
+
+
+def article(url: str, title: str, source: str = "gnews") -> dict:
+    return {"url": url, "title": title, "source": source, "publishedAt": "2025-03-02T10:00:00Z"}
+
+
+@pytest.fixture
+def index(tmp_path):
+    idx = SearchIndex(str(tmp_path), flush_every=10_000, flush_seconds=10_000)
+    yield idx
+    idx.close()
+
+
+def keys(results: list[dict]) -> list[tuple[str, str]]:
+    return [(r["collection"], r["key"]) for r in results]
+
+
+def test_buffered_documents_are_searchable_before_flush(index):
+    index.add("reddit_posts", post("p1", "transformer inference on gpus"))
+    index.flush()
+    index.add("articles", article("https://a.example/1", "transformer chips"))
+
+    results = index.search("transformer")
+
+    assert set(keys(results)) == {("reddit_posts", "p1"), ("articles", "https://a.example/1")}
+    assert index.manifest["doc_count"] == 1
+
+
+def test_buffered_version_replaces_the_flushed_one(index):
+    index.add("reddit_posts", post("p1", "transformer inference"))
+    index.flush()
+    index.add("reddit_posts", post("p1", "transformer transformer transformer"))
+
+    results = index.search("transformer")
+
+    assert keys(results) == [("reddit_posts", "p1")]
+
+
+def test_buffer_respects_filters(index):
+    index.add("articles", article("https://a.example/1", "robotics funding", source="gnews"))
+    index.add("articles", article("https://a.example/2", "robotics funding", source="rss"))
+
+    assert keys(index.search("robotics", source="rss")) == [("articles", "https://a.example/2")]
+
+
+def test_reindexed_key_shadows_its_old_version(index):
+    index.add("reddit_posts", post("p1", "diffusion models"))
+    index.flush()
+    index.add("reddit_posts", post("p1", "diffusion models revisited"))
+    index.flush()
+
+    assert keys(index.search("diffusion")) == [("reddit_posts", "p1")]
+    assert keys(index.search("revisited")) == [("reddit_posts", "p1")]
+    assert len(index.deleted) == 1
+    # stored versions, shadowed ones included until merged: the average length stays consistent
+    assert index.manifest["doc_count"] == 2
+    assert index.manifest["total_length"] == 2 + 3
+
+
+def test_flush_merges_a_full_size_tier(index):
+    for i in range(MERGE_FACTOR):
+        index.add("reddit_posts", post(f"p{i}", f"agents benchmark {i}"))
+        index.flush()
+
+    assert len(index.manifest["segments"]) == 1
+    assert len(index.search("agents", limit=50)) == MERGE_FACTOR
+
+
+def test_merge_drops_shadowed_versions(index):
+    for i in range(MERGE_FACTOR):
+        index.add("reddit_posts", post("p1", f"agents benchmark version {i}"))
+        index.flush()
+
+    assert len(index.manifest["segments"]) == 1
+    assert index.deleted == set()
+    assert index.manifest["doc_count"] == 1
+    assert keys(index.search("agents")) == [("reddit_posts", "p1")]
+
+
+def test_compact_keeps_live_documents_and_clears_deletions(index, monkeypatch):
+    monkeypatch.setattr(search_index_module, "MERGE_FACTOR", 1000)
+    for i in range(5):
+        index.add("reddit_posts", post(f"p{i}", f"quantization {'llm ' * i}"))
+        index.flush()
+    index.add("reddit_posts", post("p0", "quantization pruning"))
+    index.flush()
+
+    index.compact()
+
+    assert len(index.manifest["segments"]) == 1
+    assert index.deleted == set()
+    assert index.manifest["doc_count"] == 5
+    assert index.manifest["total_length"] == 2 + 2 + 3 + 4 + 5
+    assert sorted(keys(index.search("quantization", limit=10))) == [("reddit_posts", f"p{i}") for i in range(5)]
+    assert keys(index.search("pruning")) == [("reddit_posts", "p0")]
+    # merged postings keep their term frequencies: p1 mentions llm once, the others more
+    assert keys(index.search("llm", limit=10))[-1] == ("reddit_posts", "p1")
+
+
+def test_delete_removes_flushed_and_buffered_documents(index):
+    index.add("reddit_posts", post("p1", "robot arm"))
+    index.flush()
+    index.add("reddit_posts", post("p2", "robot hand"))
+
+    removed = index.delete([("reddit_posts", "p1"), ("reddit_posts", "p2")])
+
+    assert removed == 1
+    assert index.search("robot") == []
+
+
+def test_other_processes_see_flushed_segments(index, tmp_path):
+    index.add("reddit_posts", post("p1", "speculative decoding"))
+    index.flush()
+    reader = SearchIndex(str(tmp_path))
+    try:
+        assert keys(reader.search("speculative")) == [("reddit_posts", "p1")]
+    finally:
+        reader.close()
@@ -0,0 +1,78 @@
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("pymongo")
+pytest.importorskip("pydantic")
+pytest.importorskip("dotenv")
+pytest.importorskip("scipy")
+
+from backend.db.mongo import get_cluster_watermark
+from backend.services.StoryClusterer import StoryClusterer
+
+GPU = "nvidia unveils blackwell gpu accelerator for datacenter inference"
+LLAMA = "meta releases llama open weights model with longer context window"
+
+
+def post(post_id: str, title: str, **fields) -> dict:
+    now = datetime.now().isoformat()
+    return {"_id": post_id, "id": post_id, "title": title, "subreddit": "LocalLLaMA", "created_utc": now,
+            "saved_utc": f"2025-03-01T10:00:{post_id[-1]}0", **fields}
+
+
+def story_of(db, post_id: str) -> str:
+    return db.reddit_posts.find_one({"_id": post_id})["story_id"]
+
+
+def test_similar_documents_share_a_story(mongo_db):
+    mongo_db.reddit_posts.insert_many([post("p1", GPU), post("p2", GPU + " chips"), post("p3", LLAMA)])
+
+    assert StoryClusterer().run() == 3
+
+    assert story_of(mongo_db, "p1") == story_of(mongo_db, "p2") != story_of(mongo_db, "p3")
+    story = mongo_db.stories.find_one({"_id": story_of(mongo_db, "p1")})
+    assert (story["doc_count"], story["sources"], story["headline"]) == (2, {"reddit": 2}, GPU)
+
+
+def test_a_later_document_joins_an_existing_story_above_the_threshold(mongo_db):
+    mongo_db.reddit_posts.insert_one(post("p1", GPU))
+    StoryClusterer(threshold=0.99).run()
+    mongo_db.reddit_posts.insert_one(post("p2", GPU))
+
+    StoryClusterer(threshold=0.99).run()
+
+    assert story_of(mongo_db, "p2") == story_of(mongo_db, "p1")
+    assert mongo_db.stories.count_documents({}) == 1
+
+
+def test_a_later_document_opens_a_story_below_the_threshold(mongo_db):
+    mongo_db.reddit_posts.insert_one(post("p1", GPU))
+    StoryClusterer(threshold=1.01).run()
+    mongo_db.reddit_posts.insert_one(post("p2", GPU))
+
+    StoryClusterer(threshold=1.01).run()
+
+    assert story_of(mongo_db, "p2") != story_of(mongo_db, "p1")
+    assert mongo_db.stories.count_documents({}) == 2
+
+
+def test_documents_with_a_story_are_skipped(mongo_db):
+    mongo_db.reddit_posts.insert_many([post("p1", GPU, story_id="s0"), post("p2", LLAMA)])
+
+    assert StoryClusterer().run() == 1
+
+    assert story_of(mongo_db, "p1") == "s0"
+    assert mongo_db.stories.count_documents({}) == 1
+    assert get_cluster_watermark("reddit_posts")["_id"] == "p2"
+
+
+def test_runs_resume_from_the_watermark(mongo_db):
+    mongo_db.reddit_posts.insert_one(post("p1", GPU))
+    clusterer = StoryClusterer(batch_size=1)
+    assert clusterer.run() == 1
+    assert clusterer.run() == 0
+
+    mongo_db.reddit_posts.insert_one(post("p2", LLAMA))
+
+    assert StoryClusterer().run() == 1
+    assert mongo_db.story_meta.find_one({"_id": "idf"})["n_docs"] == 2
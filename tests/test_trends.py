@@ -0,0 +1,140 @@
+import pytest
+
+pytest.importorskip("pymongo")
+pytest.importorskip("pydantic_settings")
+pytest.importorskip("dotenv")
+
+from backend.services.TrendDetector import MAX_GAP_BUCKETS, TrendDetector
+
+HOUR = 3600
+
+
+def detector(**params) -> TrendDetector:
+    """A detector folding each bucket into the baseline as soon as the next one opens, unless overridden."""
+    return TrendDetector(**{"warmup_buckets": 3, "min_count": 3, "z_threshold": 3.0, "capacity": 16,
+                            "open_buckets": 1, **params})
+
+
+def observe_hours(d: TrendDetector, counts: list[int], start: int = 1000, newest_first: bool = False):
+    hours = list(enumerate(counts, start))
+    for hour, n in reversed(hours) if newest_first else hours:
+        for _ in range(n):
+            d.observe("llm", "LocalLLaMA", hour * HOUR + 60)
+
+
+def test_burst_fires_once_per_bucket_after_warmup():
+    d = detector()
+    observe_hours(d, [1, 1, 1, 1, 8])
+
+    [burst] = d.bursts
+    assert (burst["keyword"], burst["channel"], burst["bucket_start"].timestamp()) == ("llm", "LocalLLaMA", 1004 * HOUR)
+    assert burst["count"] >= 3 and burst["z"] >= 3.0
+
+
+def test_no_burst_before_warmup():
+    d = detector(warmup_buckets=10)
+    observe_hours(d, [1, 1, 8])
+
+    assert d.bursts == []
+
+
+def test_late_mentions_are_ignored():
+    d = detector(open_buckets=2)
+    observe_hours(d, [1, 2, 3])
+    slot = d.slots[("llm", "LocalLLaMA")]
+
+    d.observe("llm", "LocalLLaMA", 1000 * HOUR)
+    d.observe("llm", "LocalLLaMA", 1001 * HOUR)
+
+    assert d.bucket[slot] == 1002
+    assert (d.count[d.cell(slot, 1001)], d.count[d.cell(slot, 1002)]) == (3, 3)
+    assert d.history[slot] == 2
+
+
+def test_mentions_in_open_buckets_count_in_any_order():
+    in_order, newest_first = detector(open_buckets=4), detector(open_buckets=4)
+    observe_hours(in_order, [1, 2, 3, 4])
+    observe_hours(newest_first, [1, 2, 3, 4], newest_first=True)
+
+    slot = in_order.slots[("llm", "LocalLLaMA")]
+    assert [newest_first.count[newest_first.cell(slot, h)] for h in range(1000, 1004)] == [1, 2, 3, 4]
+    assert [in_order.count[in_order.cell(slot, h)] for h in range(1000, 1004)] == [1, 2, 3, 4]
+
+
+def test_empty_buckets_decay_the_baseline():
+    d = detector()
+    observe_hours(d, [5, 5, 5])
+    slot = d.slots[("llm", "LocalLLaMA")]
+    mean = d.mean[slot]
+
+    d.observe("llm", "LocalLLaMA", 1010 * HOUR)
+
+    # two closed buckets, then the one before the gap and its seven empty ones
+    assert d.history[slot] == 2 + 8
+    assert d.mean[slot] < mean
+
+
+def test_long_gaps_fold_at_most_max_gap_buckets():
+    d, capped = detector(), detector()
+    for det, gap in ((d, MAX_GAP_BUCKETS), (capped, 10 * MAX_GAP_BUCKETS)):
+        observe_hours(det, [5])
+        det.observe("llm", "LocalLLaMA", (1000 + gap) * HOUR)
+
+    slot = d.slots[("llm", "LocalLLaMA")]
+    assert capped.history[slot] == d.history[slot] == MAX_GAP_BUCKETS
+    assert capped.mean[slot] == d.mean[slot]
+    assert capped.var[slot] == d.var[slot]
+
+
+def test_keys_beyond_capacity_are_dropped():
+    d = detector(capacity=1)
+    d.observe("llm", "a", 1000 * HOUR)
+    d.observe("llm", "b", 1000 * HOUR)
+
+    assert list(d.slots) == [("llm", "a")]
+
+
+def test_observe_doc_uses_subreddit_or_source_as_channel():
+    d = detector()
+    d.observe_doc("reddit_posts", {"subreddit": "LocalLLaMA", "keywords": ["llm"],
+                                   "created_utc": "2025-03-01T10:00:00"})
+    d.observe_doc("articles", {"source": "gnews", "keywords": ["llm"], "publishedAt": "2025-03-01T10:00:00Z"})
+
+    assert set(d.slots) == {("llm", "LocalLLaMA"), ("llm", "gnews")}
+
+
+def test_state_round_trips_through_trend_state(mongo_db):
+    d = detector()
+    observe_hours(d, [2, 3])
+    d.flush()
+
+    reloaded = detector()
+    reloaded.load_state()
+
+    slot, other = d.slots[("llm", "LocalLLaMA")], reloaded.slots[("llm", "LocalLLaMA")]
+    assert (reloaded.mean[other], reloaded.count[reloaded.cell(other, 1001)], reloaded.bucket[other],
+            reloaded.history[other]) == (d.mean[slot], d.count[d.cell(slot, 1001)], d.bucket[slot], d.history[slot])
+
+
+def test_open_buckets_round_trip_through_trend_state(mongo_db):
+    d = detector(open_buckets=3)
+    observe_hours(d, [2, 3, 4])
+    d.flush()
+
+    reloaded = detector(open_buckets=3)
+    reloaded.load_state()
+    reloaded.observe("llm", "LocalLLaMA", 1000 * HOUR)
+
+    slot = reloaded.slots[("llm", "LocalLLaMA")]
+    assert [reloaded.count[reloaded.cell(slot, h)] for h in range(1000, 1003)] == [3, 3, 4]
+
+
+def test_states_stored_before_open_buckets_load(mongo_db):
+    mongo_db.trend_state.insert_one({"_id": "llm|LocalLLaMA", "keyword": "llm", "channel": "LocalLLaMA",
+                                     "mean": 1.5, "var": 0.5, "count": 7, "bucket": 1001, "alerted": 1001,
+                                     "history": 30})
+    d = detector(open_buckets=3)
+    d.load_state()
+
+    slot = d.slots[("llm", "LocalLLaMA")]
+    assert (d.count[d.cell(slot, 1001)], d.alerted[d.cell(slot, 1001)], d.count[d.cell(slot, 1000)]) == (7, 1001, 0)
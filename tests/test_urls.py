@@ -0,0 +1,37 @@
+from backend.urls import canonicalize_url, is_shortened
+
+
+def test_variants_of_one_article_compare_equal():
+    variants = [
+        "https://www.example.com/news/story-1/?utm_source=x&fbclid=abc#comments",
+        "http://m.example.com/news/story-1",
+        "example.com/news//story-1/amp/",
+        "https://amp.example.com/news/story-1?utm_medium=social",
+    ]
+
+    assert {canonicalize_url(url) for url in variants} == {"https://example.com/news/story-1"}
+
+
+def test_query_is_kept_sorted_without_tracking_parameters():
+    assert canonicalize_url("https://example.com/a?b=2&utm_campaign=x&a=1&ref=home") == "https://example.com/a?a=1&b=2"
+
+
+def test_amp_cache_urls_are_unwrapped():
+    assert canonicalize_url("https://example-com.cdn.ampproject.org/c/s/example.com/news/story-1.amp.html") == \
+        "https://example.com/news/story-1.html"
+
+
+def test_empty_or_hostless_urls():
+    assert canonicalize_url(None) is None
+    assert canonicalize_url("   ") is None
+    assert canonicalize_url("https:///path") is None
+
+
+def test_shorteners_resolve_only_through_the_resolver():
+    targets = {"https://bit.ly/abc": "https://www.example.com/news/story-1?utm_source=tw"}
+
+    assert canonicalize_url("http://bit.ly/abc") == "https://bit.ly/abc"
+    assert is_shortened(canonicalize_url("http://bit.ly/abc"))
+    assert canonicalize_url("http://bit.ly/abc", targets.get) == "https://example.com/news/story-1"
+    assert canonicalize_url("http://bit.ly/unknown", targets.get) == "https://bit.ly/unknown"
+    assert not is_shortened("https://example.com/news/story-1")
@@ -0,0 +1,80 @@
+import pytest
+
+pytest.importorskip("pymongo")
+pytest.importorskip("pydantic")
+pytest.importorskip("dotenv")
+
+from backend.db.mongo import changed_since, get_export_watermark, update_export_watermark
+
+
+def test_no_watermark_matches_everything():
+    assert changed_since(None) == {}
+
+
+def test_watermark_breaks_ties_on_id():
+    query = changed_since({"saved_utc": "2025-03-01T10:00:00", "_id": 2})
+
+    assert query == {"$or": [
+        {"saved_utc": {"$gt": "2025-03-01T10:00:00"}},
+        {"saved_utc": "2025-03-01T10:00:00", "_id": {"$gt": 2}},
+    ]}
+
+
+def test_watermark_on_another_field():
+    query = changed_since({"refreshed_utc": "2025-03-01", "_id": 7}, "refreshed_utc")
+
+    assert query["$or"][1] == {"refreshed_utc": "2025-03-01", "_id": {"$gt": 7}}
+
+
+def test_documents_saved_in_the_same_instant_are_read_once(mongo_db):
+    mongo_db.articles.insert_many([
+        {"_id": i, "url": f"https://a.example/{i}", "saved_utc": "2025-03-01T10:00:00"} for i in range(1, 5)
+    ] + [{"_id": 0, "url": "https://a.example/0", "saved_utc": "2025-03-01T11:00:00"}])
+
+    found = [d["_id"] for d in mongo_db.articles.find(changed_since({"saved_utc": "2025-03-01T10:00:00", "_id": 2}))]
+
+    assert sorted(found) == [0, 3, 4]
+
+
+def test_export_watermarks_are_kept_per_field(mongo_db):
+    update_export_watermark("reddit_posts", "2025-03-01", "a")
+    update_export_watermark("reddit_posts", "2025-03-02", "b", "refreshed_utc")
+    update_export_watermark("reddit_posts", "2025-03-03", "c")
+
+    assert get_export_watermark("reddit_posts") == {"saved_utc": "2025-03-03", "_id": "c"}
+    assert get_export_watermark("reddit_posts", "refreshed_utc") == {"refreshed_utc": "2025-03-02", "_id": "b"}
+    assert get_export_watermark("articles") is None
+
+
+def test_incremental_export_resumes_inside_a_tie(mongo_db, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    from backend.services.ParquetExporter import ParquetExporter
+
+    def article(i: int, saved_utc: str) -> dict:
+        return {"_id": i, "url": f"https://a.example/{i}", "title": f"t{i}", "source": "gnews",
+                "sources": ["gnews"], "publishedAt": "2025-03-01T08:00:00Z", "saved_utc": saved_utc}
+
+    mongo_db.articles.insert_many([article(i, "2025-03-01T10:00:00") for i in range(5)])
+    # batches of 2 leave the watermark between documents saved in the same instant
+    assert ParquetExporter(str(tmp_path), batch_size=2).export_collection("articles") == 5
+    mongo_db.articles.insert_many([article(i, "2025-03-01T10:00:00") for i in range(5, 7)])
+    assert ParquetExporter(str(tmp_path), batch_size=2).export_collection("articles") == 2
+    assert ParquetExporter(str(tmp_path), batch_size=2).export_collection("articles") == 0
+
+    urls = pq.read_table(str(tmp_path / "source=articles"), columns=["url"]).column("url").to_pylist()
+    assert sorted(urls) == sorted(f"https://a.example/{i}" for i in range(7))
+
+
+def test_refreshed_posts_are_exported_again(mongo_db, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    from backend.services.ParquetExporter import ParquetExporter
+
+    mongo_db.reddit_posts.insert_one({"_id": 1, "id": "p1", "title": "t", "score": 1,
+                                      "created_utc": "2025-03-01T08:00:00", "saved_utc": "2025-03-01T09:00:00"})
+    assert ParquetExporter(str(tmp_path)).export_collection("reddit_posts") == 1
+    mongo_db.reddit_posts.update_one({"_id": 1}, {"$set": {"score": 42, "refreshed_utc": "2025-03-02T09:00:00"}})
+    assert ParquetExporter(str(tmp_path)).export_collection("reddit_posts") == 1
+    assert ParquetExporter(str(tmp_path)).export_collection("reddit_posts") == 0
+
+    scores = pq.read_table(str(tmp_path / "source=reddit_posts"), columns=["score"]).column("score").to_pylist()
+    assert sorted(scores) == [1, 42]
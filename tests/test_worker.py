@@ -0,0 +1,167 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("pymongo")
+pytest.importorskip("pydantic_settings")
+pytest.importorskip("dotenv")
+
+from backend.db import mongo
+from backend.services import SearchIndex as search_index_module
+from backend.services import TrendDetector as trend_detector_module
+from backend.services import indexer
+from backend.services.worker import ScrapeWorker, rendezvous_owner
+
+
+def test_rendezvous_moves_only_the_leases_of_a_leaving_worker():
+    leases = [f"reddit:sub{i}" for i in range(200)]
+    workers = ["w1", "w2", "w3"]
+    before = {lease: rendezvous_owner(lease, workers) for lease in leases}
+    after = {lease: rendezvous_owner(lease, ["w1", "w3"]) for lease in leases}
+
+    assert set(before.values()) == set(workers)
+    assert all(after[lease] == owner for lease, owner in before.items() if owner != "w2")
+
+
+@pytest.fixture
+def workers(mongo_db):
+    mongo.connect_db()
+    return ScrapeWorker([], worker_id="w1"), ScrapeWorker([], worker_id="w2")
+
+
+def test_live_lease_is_not_taken(workers):
+    w1, w2 = workers
+
+    assert w1.acquire("reddit", "LocalLLaMA")
+    assert not w2.acquire("reddit", "LocalLLaMA")
+
+
+def test_expired_lease_is_taken_with_a_higher_fence(workers, mongo_db):
+    w1, w2 = workers
+    w1.acquire("reddit", "LocalLLaMA")
+    mongo_db.scrape_leases.update_one({"_id": "reddit:LocalLLaMA"},
+                                      {"$set": {"expires_at": datetime.utcnow() - timedelta(seconds=1)}})
+
+    assert w2.acquire("reddit", "LocalLLaMA")
+    assert w2.leases["reddit:LocalLLaMA"] == w1.leases["reddit:LocalLLaMA"] + 1
+    w1.beat()
+    assert "reddit:LocalLLaMA" not in w1.leases
+
+
+def test_released_lease_keeps_its_fence(workers, mongo_db):
+    w1, w2 = workers
+    w1.acquire("reddit", "LocalLLaMA")
+    w1.release("reddit:LocalLLaMA")
+
+    assert w2.acquire("reddit", "LocalLLaMA")
+    assert mongo_db.scrape_leases.find_one({"_id": "reddit:LocalLLaMA"})["fence"] == 2
+
+
+def test_stale_owner_cannot_move_the_watermark(workers):
+    assert mongo.update_last_reddit_timestamp("LocalLLaMA", 200.0, fence=2)
+    assert not mongo.update_last_reddit_timestamp("LocalLLaMA", 100.0, fence=1)
+    assert mongo.get_last_reddit_timestamp("LocalLLaMA") == 200.0
+
+
+@pytest.fixture
+def consumers(mongo_db, monkeypatch, tmp_path):
+    """Two ingest consumers sharing one search index directory and a fresh set of ingest hooks."""
+    mongo.connect_db()
+    monkeypatch.setenv("SEARCH_INDEX_DIR", str(tmp_path))
+    monkeypatch.setattr(mongo, "ingest_hooks", [])
+    monkeypatch.setattr(search_index_module, "_ingest_index", None)
+    monkeypatch.setattr(trend_detector_module, "_ingest_detector", None)
+    first = indexer.IngestConsumer(worker_id="i1")
+    yield first, indexer.IngestConsumer(worker_id="i2")
+    first.search_index.close()
+
+
+def post(post_id: str, saved_utc: str) -> dict:
+    return {"id": post_id, "title": f"agents {post_id}", "subreddit": "LocalLLaMA", "keywords": ["agents"],
+            "created_utc": saved_utc, "saved_utc": saved_utc}
+
+
+def test_only_one_consumer_holds_the_ingest_lease(consumers):
+    i1, i2 = consumers
+
+    assert i1.acquire()
+    assert not i2.acquire()
+    assert i1.trend_detector.fence == i1.fence
+
+
+def test_consumer_starts_at_the_first_document_then_follows(consumers, mongo_db):
+    i1, _ = consumers
+    mongo_db.reddit_posts.insert_one(post("p0", "2025-03-01T09:00:00"))
+    i1.acquire()
+
+    assert i1.catch_up() == 1
+    mongo_db.reddit_posts.insert_many([post("p1", "2025-03-01T10:00:00"), post("p2", "2025-03-01T10:00:00")])
+    assert i1.catch_up() == 2
+    assert i1.catch_up() == 0
+
+    assert sorted(r["key"] for r in i1.search_index.search("agents")) == ["p0", "p1", "p2"]
+    assert mongo_db.trend_state.find_one({"_id": "agents|LocalLLaMA"})["fence"] == i1.fence
+
+
+def test_documents_landing_after_a_later_stamped_batch_are_not_skipped(consumers, mongo_db):
+    i1, _ = consumers
+    now = datetime.utcnow()
+    ago = lambda seconds: (now - timedelta(seconds=seconds)).isoformat()
+    mongo_db.reddit_posts.insert_many([post("settled", ago(300)), post("later", ago(5))])
+    i1.acquire()
+
+    assert i1.catch_up() == 1
+    # a slower replica's batch, stamped before "later", lands after it
+    mongo_db.reddit_posts.insert_one(post("earlier", ago(10)))
+    i1.safety_lag_seconds = 0  # a minute later
+
+    assert i1.catch_up() == 2
+    assert sorted(r["key"] for r in i1.search_index.search("agents")) == ["earlier", "later", "settled"]
+
+
+def test_mentions_stored_newest_first_are_counted_in_time_order(consumers, mongo_db):
+    i1, _ = consumers
+    mongo_db.reddit_posts.insert_one(post("seed", "2025-03-01T00:00:00"))
+    i1.acquire()
+    i1.catch_up()
+    # one scrape of the last 24 hours: the newest post is stored first
+    mongo_db.reddit_posts.insert_many([
+        {**post(f"p{hour}", f"2025-03-02T00:00:{59 - hour:02d}"), "created_utc": f"2025-03-01T{hour:02d}:10:00"}
+        for hour in range(24)
+    ])
+
+    assert i1.catch_up() == 24
+
+    state = mongo_db.trend_state.find_one({"_id": "agents|LocalLLaMA"})
+    assert state["history"] == 23  # the three empty buckets before the first post, then 00:00-19:00
+    assert state["counts"] == [1, 1, 1, 1]
+
+
+def test_consumer_that_lost_the_lease_stops_writing(consumers, mongo_db):
+    i1, i2 = consumers
+    mongo_db.reddit_posts.insert_one(post("p0", "2025-03-01T09:00:00"))
+    i1.acquire()
+    i1.catch_up()
+    mongo_db.scrape_leases.update_one({"_id": indexer.LEASE},
+                                      {"$set": {"expires_at": datetime.utcnow() - timedelta(seconds=1)}})
+    assert i2.acquire()
+    mongo_db.reddit_posts.insert_one(post("p1", "2025-03-01T10:00:00"))
+
+    assert i1.catch_up() == 0
+    assert i1.fence is None
+    assert i2.catch_up() == 1
+
+
+def test_stale_trend_state_writes_are_rejected(consumers, mongo_db):
+    i1, _ = consumers
+    detector = i1.trend_detector
+    detector.fence = 2
+    detector.observe("agents", "LocalLLaMA", 3600 * 1000)
+    detector.flush()
+
+    detector.fence = 1
+    detector.observe("agents", "LocalLLaMA", 3600 * 1000)
+    detector.flush()
+
+    state = mongo_db.trend_state.find_one({"_id": "agents|LocalLLaMA"})
+    assert (state["fence"], state["counts"][-1]) == (2, 1)